@@ -0,0 +1,80 @@
+"""
+Small background worker used for cache revalidation and prefetching
+"""
+import logging
+import queue
+import threading
+from typing import Callable, Dict, Hashable, Set
+
+logger = logging.getLogger("mtg_agent.background")
+
+
+class BackgroundWorker:
+    """Daemon thread running queued tasks one by one, deduplicated by key"""
+
+    def __init__(self, name: str, max_pending: int = 1000):
+        self.name = name
+        self.max_pending = max_pending
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._pending: Set[Hashable] = set()
+        self._lock = threading.Lock()
+        # Signalled whenever the last pending task finishes
+        self._idle = threading.Condition(self._lock)
+        self._thread = None
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def submit(self, key: Hashable, task: Callable[[], object]) -> bool:
+        """Queue a task unless one with the same key is already pending; False if not queued"""
+        with self._lock:
+            if key in self._pending:
+                return False
+            try:
+                self._queue.put_nowait((key, task))
+            except queue.Full:
+                self.dropped += 1
+                logger.warning(f"⚠️ {self.name}: queue full, dropping {key}")
+                return False
+            self._pending.add(key)
+            self._ensure_started()
+        return True
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            key, task = self._queue.get()
+            try:
+                task()
+                with self._lock:
+                    self.completed += 1
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                logger.warning(f"⚠️ {self.name}: task {key} failed: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+                    if not self._pending:
+                        self._idle.notify_all()
+                self._queue.task_done()
+
+    def join(self, timeout: float = None) -> bool:
+        """Wait until the queue is drained, returning False if the timeout expired first"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """Return queue depth and task counters"""
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'max_pending': self.max_pending,
+                'completed': self.completed,
+                'failed': self.failed,
+                'dropped': self.dropped,
+            }
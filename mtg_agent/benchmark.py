@@ -0,0 +1,143 @@
+"""
+Throughput and tail-latency measurements of the Scryfall fetch paths against the local stand-in
+"""
+import asyncio
+import logging
+import math
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .rate_limit import TokenBucketRateLimiter
+from .scryfall_integration import ScryfallCache
+from .scryfall_stub import ScryfallStub, ScryfallStubServer
+
+logger = logging.getLogger("mtg_agent.benchmark")
+
+# Fetch paths that can be measured: name -> what one timed call does
+FETCH_PATHS = {
+    'named': "get_card_info per card (GET /cards/named), from a thread pool",
+    'collection': "get_cards_info for the whole card list (POST /cards/collection)",
+    'async': "aget_card_info per card, gathered on one event loop",
+}
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of samples (fraction between 0 and 1)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, min(len(ordered), math.ceil(fraction * len(ordered))))
+    return ordered[rank - 1]
+
+
+def summarize_latencies(samples: List[float], seconds: float) -> Dict:
+    """Call count, throughput and latency distribution (milliseconds) of one run"""
+    return {
+        'calls': len(samples),
+        'seconds': round(seconds, 3),
+        'calls_per_second': round(len(samples) / seconds, 1) if seconds else 0.0,
+        'mean_ms': round(statistics.fmean(samples) * 1000, 2) if samples else 0.0,
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(samples, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 2),
+        'max_ms': round(max(samples, default=0.0) * 1000, 2),
+    }
+
+
+def _timed(fn: Callable[[], object], samples: List[float]):
+    started_at = time.perf_counter()
+    try:
+        fn()
+    finally:
+        samples.append(time.perf_counter() - started_at)
+
+
+def _run_named(cache: ScryfallCache, names: List[str], concurrency: int, samples: List[float]):
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="benchmark") as pool:
+        list(pool.map(lambda card_name: _timed(lambda: cache.get_card_info(card_name), samples), names))
+
+
+def _run_collection(cache: ScryfallCache, names: List[str], concurrency: int, samples: List[float]):
+    _timed(lambda: cache.get_cards_info(names), samples)
+
+
+def _run_async(cache: ScryfallCache, names: List[str], concurrency: int, samples: List[float]):
+    async def _main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _one(card_name: str):
+            async with semaphore:
+                started_at = time.perf_counter()
+                try:
+                    await cache.aget_card_info(card_name)
+                finally:
+                    samples.append(time.perf_counter() - started_at)
+
+        try:
+            await asyncio.gather(*(_one(card_name) for card_name in names))
+        finally:
+            await cache.aclose()
+
+    asyncio.run(_main())
+
+
+_RUNNERS = {'named': _run_named, 'collection': _run_collection, 'async': _run_async}
+
+
+def benchmark_fetch_paths(cards: List[Dict], paths: Iterable[str] = tuple(FETCH_PATHS), rounds: int = 3,
+                          concurrency: int = 8, rate: float = 10.0, burst: int = 1,
+                          stub_options: Optional[Dict] = None) -> Dict:
+    """Measure each fetch path against a ScryfallStubServer serving `cards`
+
+    Every round starts from an empty cache directory so all lookups go to the stub.
+    The stub's latency and failures are seeded (see ScryfallStub), so runs with the same
+    options are comparable. `rate`/`burst` configure a private token bucket (Scryfall's
+    limit by default; raise it to measure the client rather than the limiter).
+    Returns {path: summary} plus the stub's request counters under 'stub'.
+    """
+    names = [card['name'] for card in cards]
+    stub = ScryfallStub(cards, **(stub_options or {}))
+    report = {}
+    # Per-request logs would drown the measurements
+    quieted = {name: logging.getLogger(name).level for name in ("mtg_agent.scryfall", "httpx")}
+    for name in quieted:
+        logging.getLogger(name).setLevel(logging.WARNING)
+    try:
+        with ScryfallStubServer(stub) as server:
+            for path in paths:
+                if path not in _RUNNERS:
+                    raise ValueError(f"Unknown fetch path {path!r} (known: {', '.join(FETCH_PATHS)})")
+                samples: List[float] = []
+                seconds = 0.0
+                for _ in range(rounds):
+                    with tempfile.TemporaryDirectory(prefix="mtg-benchmark-") as cache_dir:
+                        cache = ScryfallCache(cache_dir=cache_dir, api_url=server.url,
+                                              rate_limiter=TokenBucketRateLimiter(rate=rate, burst=burst))
+                        started_at = time.perf_counter()
+                        _RUNNERS[path](cache, names, concurrency, samples)
+                        seconds += time.perf_counter() - started_at
+                        cache.close()
+                report[path] = summarize_latencies(samples, seconds)
+                logger.info(f"⏱️ {path}: {report[path]}")
+    finally:
+        for name, level in quieted.items():
+            logging.getLogger(name).setLevel(level)
+    report['stub'] = stub.stats()
+    return report
+
+
+def format_benchmark_report(report: Dict) -> str:
+    """Render benchmark_fetch_paths output as a table"""
+    lines = [f"{'path':<12}{'calls':>7}{'calls/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+    for path, summary in report.items():
+        if path == 'stub':
+            continue
+        lines.append(f"{path:<12}{summary['calls']:>7}{summary['calls_per_second']:>10}{summary['p50_ms']:>10}"
+                     f"{summary['p95_ms']:>10}{summary['p99_ms']:>10}{summary['max_ms']:>10}")
+    stub = report.get('stub', {})
+    lines.append(f"stub requests: {stub.get('requests', {})}, injected errors: {stub.get('injected_errors', 0)}, "
+                 f"injected 429s: {stub.get('injected_rate_limits', 0)}")
+    return "\n".join(lines)
@@ -0,0 +1,88 @@
+"""
+Offline ingestion of Scryfall bulk-data files (oracle_cards, default_cards, ...)
+"""
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterator
+
+from .card_store import CardStore
+
+logger = logging.getLogger("mtg_agent.bulk_import")
+
+# Characters read from the file per step; cards are a few KB each
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def iter_bulk_cards(path: Path, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Dict]:
+    """Yield the cards of a bulk-data JSON array one by one, in constant memory"""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ""
+        pos = 0
+        started = False
+        eof = False
+
+        while True:
+            # Skip whitespace and array punctuation between items
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if not started and pos < len(buffer):
+                if buffer[pos] != '[':
+                    raise ValueError(f"{path} is not a JSON array of cards")
+                started = True
+                pos += 1
+                continue
+            if started and pos < len(buffer) and buffer[pos] == ']':
+                return
+
+            if pos < len(buffer):
+                try:
+                    card, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    pos = end
+                    yield card
+                    continue
+
+            if eof:
+                if started:
+                    raise ValueError(f"Unexpected end of file in {path}")
+                return
+
+            # Need more data: drop what was consumed and read the next chunk
+            buffer = buffer[pos:]
+            pos = 0
+            chunk = f.read(chunk_size)
+            if chunk:
+                buffer += chunk
+            else:
+                eof = True
+
+
+def import_bulk_file(path: Path, store: CardStore, batch_size: int = 1000) -> int:
+    """Load every card of a bulk-data file into the store, returning how many were written"""
+    path = Path(path)
+    started_at = time.time()
+    imported = 0
+    batch = []
+
+    for card_data in iter_bulk_cards(path):
+        if not isinstance(card_data, dict) or not card_data.get('name'):
+            continue
+        # Tokens, art cards and other non-playable objects share names with real cards
+        if card_data.get('layout') in ('art_series', 'token', 'double_faced_token', 'emblem'):
+            continue
+        batch.append((card_data['name'], card_data))
+        if len(batch) >= batch_size:
+            imported += store.put_many(batch)
+            batch = []
+            logger.info(f"📦 Importadas {imported} cartas desde {path.name}...")
+    if batch:
+        imported += store.put_many(batch)
+
+    logger.info(f"✅ Bulk import finished: {imported} cards from {path} in {time.time() - started_at:.1f}s")
+    return imported
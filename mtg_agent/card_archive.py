@@ -0,0 +1,150 @@
+"""
+Packed, memory-mapped card archive for read-mostly deployments
+
+Layout (little endian):
+    header   magic "MTGPACK1", version u32, record count u32, index entry count u32, index offset u64
+    records  compact CardRecord JSON, one after another
+    index    entries sorted by key digest: blake2b-128(key), record offset u64, length u32, fetched_at f64
+
+Keys are "n:<normalized name>" for every name that resolves to a card and "i:<scryfall id>".
+Readers map the file and decode records only when they are looked up, so every worker
+process on a node shares the same page cache.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .card_record import CardRecord
+from .card_store import CardStore, card_aliases, normalize_card_name
+
+logger = logging.getLogger("mtg_agent.card_archive")
+
+MAGIC = b"MTGPACK1"
+# Bumped whenever normalize_card_name changes, since keys are stored as digests
+VERSION = 2
+HEADER = struct.Struct("<8sIIIQ")
+INDEX_ENTRY = struct.Struct("<16sQId")
+
+
+def _key_digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+
+
+def write_card_archive(path: Path, records: Iterable[Tuple[CardRecord, List[str]]]) -> int:
+    """Write (record, name keys) pairs to a packed archive, returning the number of records
+
+    The file is written next to its destination and renamed into place, so processes
+    that already mapped the previous archive keep reading a consistent file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    index = []
+    record_count = 0
+
+    with open(tmp_path, 'wb') as f:
+        f.write(b"\0" * HEADER.size)
+        offset = HEADER.size
+        for record, name_keys in records:
+            data = record.to_json().encode('utf-8')
+            f.write(data)
+            fetched_at = record.fetched_at or 0.0
+            keys = {f"n:{name_key}" for name_key in name_keys}
+            keys |= {f"n:{normalize_card_name(record.name)}", f"i:{record.id}"}
+            for key in keys:
+                index.append((_key_digest(key), 0, offset, len(data), fetched_at))
+            # Face names rank below real names so they never shadow another card
+            for alias in card_aliases(record):
+                index.append((_key_digest(f"n:{normalize_card_name(alias)}"), 1, offset, len(data), fetched_at))
+            offset += len(data)
+            record_count += 1
+
+        index.sort(key=lambda entry: entry[:2])
+        unique_index = []
+        for digest, _, *entry in index:
+            if not unique_index or unique_index[-1][0] != digest:
+                unique_index.append((digest, *entry))
+        index = unique_index
+        for entry in index:
+            f.write(INDEX_ENTRY.pack(*entry))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, record_count, len(index), offset))
+
+    os.replace(tmp_path, path)
+    logger.info(f"📦 Card archive written: {path} ({record_count} cards, {len(index)} keys)")
+    return record_count
+
+
+class PackedCardStore(CardStore):
+    """Read-only card store backed by a memory-mapped archive"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._record_count, self._entry_count, self._index_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a card archive (version {VERSION})")
+
+    def _find(self, key: str) -> Optional[CardRecord]:
+        """Binary search the index for a key and decode its record"""
+        digest = _key_digest(key)
+        lo, hi = 0, self._entry_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry_digest, offset, length, fetched_at = INDEX_ENTRY.unpack_from(
+                self._mm, self._index_offset + mid * INDEX_ENTRY.size
+            )
+            if entry_digest == digest:
+                return CardRecord.from_json(self._mm[offset:offset + length].decode('utf-8'), fetched_at)
+            if entry_digest < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def get(self, card_name: str) -> Optional[CardRecord]:
+        return self._find(f"n:{normalize_card_name(card_name)}")
+
+    def get_by_id(self, card_id: str) -> Optional[CardRecord]:
+        return self._find(f"i:{card_id}")
+
+    def iter_records(self) -> Iterator[Tuple[CardRecord, List[str]]]:
+        """Yield every archived card once, in file order
+
+        Only the card's own name is known: the index keeps key digests, not names.
+        """
+        records = {}
+        for position in range(self._entry_count):
+            _, offset, length, fetched_at = INDEX_ENTRY.unpack_from(
+                self._mm, self._index_offset + position * INDEX_ENTRY.size
+            )
+            records[offset] = (length, fetched_at)
+        for offset in sorted(records):
+            length, fetched_at = records[offset]
+            record = CardRecord.from_json(self._mm[offset:offset + length].decode('utf-8'), fetched_at)
+            yield record, [normalize_card_name(record.name)]
+
+    def put_many(self, items) -> int:
+        raise IOError(f"Card archive {self.path} is read-only")
+
+    def delete(self, card_name: str) -> bool:
+        raise IOError(f"Card archive {self.path} is read-only")
+
+    def mark_stale(self, card_name: str) -> bool:
+        raise IOError(f"Card archive {self.path} is read-only")
+
+    def count(self) -> int:
+        return self._record_count
+
+    def get_miss(self, card_name: str) -> None:
+        return None
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
@@ -0,0 +1,104 @@
+"""
+Compact card record holding only the Scryfall fields the agent uses
+"""
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+# Per-face fields kept for multi-faced cards (split, flip, transform, MDFC...)
+FACE_FIELDS = ('name', 'mana_cost', 'type_line', 'oracle_text', 'power', 'toughness', 'image_uris')
+
+
+class CardRecord:
+    """Slim, read-only view of a Scryfall card with a dict-like interface"""
+
+    # Fields serialized by to_dict, in slot order
+    FIELDS = ('id', 'name', 'layout', 'mana_cost', 'cmc', 'type_line', 'oracle_text',
+              'flavor_text', 'power', 'toughness', 'image_uris', 'card_faces')
+
+    # fetched_at is cache metadata filled in by the store, not part of the card
+    __slots__ = FIELDS + ('fetched_at',)
+
+    def __init__(self, id: str, name: str, layout: Optional[str] = None, mana_cost: Optional[str] = None,
+                 cmc: float = 0, type_line: Optional[str] = None, oracle_text: Optional[str] = None,
+                 flavor_text: Optional[str] = None, power: Optional[str] = None,
+                 toughness: Optional[str] = None, image_uris: Optional[Dict[str, str]] = None,
+                 card_faces: Optional[List[Dict]] = None, fetched_at: Optional[float] = None):
+        self.id = id
+        self.name = name
+        self.layout = layout
+        self.mana_cost = mana_cost
+        self.cmc = cmc
+        self.type_line = type_line
+        self.oracle_text = oracle_text
+        self.flavor_text = flavor_text
+        self.power = power
+        self.toughness = toughness
+        self.image_uris = image_uris
+        self.card_faces = card_faces
+        self.fetched_at = fetched_at
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CardRecord":
+        """Project a full Scryfall payload (or a stored slim dict) onto a record"""
+        faces = data.get('card_faces')
+        if isinstance(faces, list):
+            faces = [{key: face[key] for key in FACE_FIELDS if face.get(key) is not None}
+                     for face in faces if isinstance(face, dict)]
+        else:
+            faces = None
+
+        return cls(
+            id=data['id'],
+            name=data['name'],
+            layout=data.get('layout'),
+            mana_cost=data.get('mana_cost'),
+            cmc=data.get('cmc', 0),
+            type_line=data.get('type_line'),
+            oracle_text=data.get('oracle_text'),
+            flavor_text=data.get('flavor_text'),
+            power=data.get('power'),
+            toughness=data.get('toughness'),
+            image_uris=data.get('image_uris') if isinstance(data.get('image_uris'), dict) else None,
+            card_faces=faces,
+        )
+
+    @classmethod
+    def from_json(cls, text: str, fetched_at: Optional[float] = None) -> "CardRecord":
+        """Decode a record serialized with to_json"""
+        record = cls.from_dict(json.loads(text))
+        record.fetched_at = fetched_at
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the non-empty fields as a plain dict"""
+        return {field: getattr(self, field) for field in self.FIELDS if getattr(self, field) is not None}
+
+    def to_json(self) -> str:
+        """Serialize the record compactly for storage"""
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':'))
+
+    # Dict-style access so callers written against raw Scryfall payloads keep working
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in self.FIELDS else None
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CardRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"CardRecord(id={self.id!r}, name={self.name!r})"
@@ -0,0 +1,676 @@
+"""
+Storage backends for cached Scryfall card data
+"""
+import json
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .card_record import CardRecord
+
+logger = logging.getLogger("mtg_agent.card_store")
+
+
+# Typographic variants that decks, Scryfall and LLM output use interchangeably
+_PUNCTUATION = str.maketrans({
+    "\u2018": "'", "\u2019": "'", "\u02bc": "'", "`": "'", "\u00b4": "'",
+    "\u201c": '"', "\u201d": '"',
+    "\u2010": "-", "\u2011": "-", "\u2012": "-", "\u2013": "-", "\u2014": "-", "\u2212": "-",
+    "\u00e6": "ae", "\u00c6": "ae",
+})
+# "Fire/Ice", "Fire//Ice" and "Fire // Ice" all name the same split card
+_FACE_SEPARATOR = re.compile(r"\s*/{1,2}\s*")
+
+
+def normalize_card_name(card_name: str) -> str:
+    """Return the lookup key used for a card name
+
+    Case, accents ("Lim-Dûl" / "Lim-Dul"), typographic quotes and dashes, "Æ" and the
+    spacing of split-card separators are folded so every spelling maps to one key.
+    """
+    text = unicodedata.normalize("NFKD", card_name)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.translate(_PUNCTUATION).casefold()
+    text = _FACE_SEPARATOR.sub(" // ", text)
+    return " ".join(text.split())
+
+
+def card_aliases(card_data: Union[CardRecord, Dict]) -> List[str]:
+    """Return the extra names a card answers to: each face of split, adventure and DFC cards"""
+    faces = card_data.get('card_faces') or []
+    return [face['name'] for face in faces if isinstance(face, dict) and face.get('name')]
+
+
+def to_card_record(card_data: Union[CardRecord, Dict]) -> CardRecord:
+    """Project a raw Scryfall payload onto a CardRecord (records pass through)"""
+    if isinstance(card_data, CardRecord):
+        return card_data
+    return CardRecord.from_dict(card_data)
+
+
+class CardStore:
+    """Base class for card storage backends used by ScryfallCache"""
+
+    def get(self, card_name: str) -> Optional[CardRecord]:
+        """Return the cached card for a name, or None"""
+        raise NotImplementedError
+
+    def get_by_id(self, card_id: str) -> Optional[CardRecord]:
+        """Return the cached card for a Scryfall id, or None"""
+        raise NotImplementedError
+
+    def get_raw(self, card_id: str) -> Optional[Dict]:
+        """Return the full Scryfall payload kept in cold storage, if any"""
+        return None
+
+    def resolve_name(self, card_name: str) -> Optional[str]:
+        """Return the Scryfall id a spelling of a card name resolves to, or None"""
+        card_data = self.get(card_name)
+        return card_data.id if card_data else None
+
+    def put(self, card_name: str, card_data: Union[CardRecord, Dict]):
+        """Store a card under the requested name (and its canonical name)"""
+        self.put_many([(card_name, card_data)])
+
+    def put_many(self, items: Iterable[Tuple[str, Union[CardRecord, Dict]]]) -> int:
+        """Store several (requested name, card) pairs, returning how many were written
+
+        Cards may be full Scryfall payloads or CardRecords; payloads are projected
+        onto a CardRecord before being stored. The canonical name, the requested name
+        and the face names (see card_aliases) all resolve to the stored card.
+        """
+        raise NotImplementedError
+
+    def get_many(self, card_names: Iterable[str]) -> Dict[str, CardRecord]:
+        """Return a mapping of requested name -> card for the names that are cached"""
+        result = {}
+        for card_name in card_names:
+            card_data = self.get(card_name)
+            if card_data is not None:
+                result[card_name] = card_data
+        return result
+
+    def delete(self, card_name: str) -> bool:
+        """Remove a card from the store, returning True if something was deleted"""
+        raise NotImplementedError
+
+    def mark_stale(self, card_name: str) -> bool:
+        """Make a cached card look expired so it gets revalidated, True if it was cached"""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        """Return the number of cards in the store"""
+        raise NotImplementedError
+
+    def iter_records(self) -> Iterator[Tuple[CardRecord, List[str]]]:
+        """Yield every stored card with the normalized names that resolve to it"""
+        raise NotImplementedError
+
+    def get_miss(self, card_name: str) -> Optional[Dict]:
+        """Return the negative-cache entry for a name Scryfall could not resolve, or None"""
+        raise NotImplementedError
+
+    def record_miss(self, card_name: str) -> Dict:
+        """Record (or bump the count of) an unresolved name and return its entry"""
+        raise NotImplementedError
+
+    def list_misses(self) -> List[Dict]:
+        """Return every negative-cache entry, most recently checked first"""
+        raise NotImplementedError
+
+    def count_misses(self) -> int:
+        """Return the number of negative-cache entries"""
+        return len(self.list_misses())
+
+    def clear_misses(self, card_names: Optional[Iterable[str]] = None) -> int:
+        """Forget unresolved names (all of them when card_names is None), returning how many"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the store"""
+
+
+class JsonFileCardStore(CardStore):
+    """Legacy backend: one JSON file per card in a directory"""
+
+    # Files starting with an underscore hold store metadata, not cards
+    CARD_GLOB = "[!_]*.json"
+    MISSES_FILENAME = "_missing_cards.json"
+    ALIASES_FILENAME = "_aliases.json"
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._misses_file = self.cache_dir / self.MISSES_FILENAME
+        self._misses: Optional[Dict[str, Dict]] = None
+        self._misses_lock = threading.Lock()
+        # alias name key -> canonical name key (cards are filed under their canonical name)
+        self._aliases_file = self.cache_dir / self.ALIASES_FILENAME
+        self._aliases: Optional[Dict[str, str]] = None
+        self._aliases_lock = threading.Lock()
+
+    def _get_cache_filename(self, card_name: str) -> Path:
+        """Generate a safe filename for cache"""
+        # Both the visible prefix and the hash come from the normalized name,
+        # so every spelling of a card maps to the same file
+        name_key = normalize_card_name(card_name)
+        name_hash = hashlib.md5(name_key.encode()).hexdigest()
+        safe_name = "".join(c for c in name_key if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        return self.cache_dir / f"{safe_name}_{name_hash}.json"
+
+    def _get_legacy_cache_filename(self, card_name: str) -> Path:
+        """Filename used before names were normalized (original-case prefix)"""
+        name_hash = hashlib.md5(card_name.lower().encode()).hexdigest()
+        safe_name = "".join(c for c in card_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        return self.cache_dir / f"{safe_name}_{name_hash}.json"
+
+    def _load_aliases(self) -> Dict[str, str]:
+        if self._aliases is None:
+            self._aliases = {}
+            if self._aliases_file.exists():
+                try:
+                    with open(self._aliases_file, 'r', encoding='utf-8') as f:
+                        self._aliases = json.load(f)
+                except Exception as e:
+                    logger.warning(f"⚠️ Error reading alias index {self._aliases_file}: {e}")
+        return self._aliases
+
+    def _resolve_file(self, card_name: str) -> Optional[Path]:
+        """Find the file holding a card, following aliases and legacy filenames"""
+        cache_file = self._get_cache_filename(card_name)
+        if cache_file.exists():
+            return cache_file
+        with self._aliases_lock:
+            canonical_key = self._load_aliases().get(normalize_card_name(card_name))
+        if canonical_key:
+            cache_file = self._get_cache_filename(canonical_key)
+            if cache_file.exists():
+                return cache_file
+        legacy_file = self._get_legacy_cache_filename(card_name)
+        if legacy_file.exists():
+            # Move files written before normalization to their canonical name
+            new_file = self._get_cache_filename(card_name)
+            try:
+                legacy_file.replace(new_file)
+                return new_file
+            except OSError:
+                return legacy_file
+        return None
+
+    def get(self, card_name: str) -> Optional[CardRecord]:
+        cache_file = self._resolve_file(card_name)
+        if cache_file is None:
+            return None
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return CardRecord.from_json(f.read(), fetched_at=cache_file.stat().st_mtime)
+        except Exception as e:
+            logger.warning(f"⚠️ Error reading cache for {card_name}: {e}")
+            return None
+
+    def get_by_id(self, card_id: str) -> Optional[CardRecord]:
+        for card_data in self.iter_cards():
+            if card_data.get('id') == card_id:
+                return CardRecord.from_dict(card_data)
+        return None
+
+    def put_many(self, items: Iterable[Tuple[str, Union[CardRecord, Dict]]]) -> int:
+        written = 0
+        new_aliases = {}
+        face_aliases = {}
+        for card_name, card_data in items:
+            record = to_card_record(card_data)
+            canonical_key = normalize_card_name(record.name or card_name)
+            cache_file = self._get_cache_filename(canonical_key)
+            try:
+                with open(cache_file, 'w', encoding='utf-8') as f:
+                    f.write(record.to_json())
+                written += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Error guardando caché para {card_name}: {e}")
+                continue
+            if normalize_card_name(card_name) != canonical_key:
+                new_aliases[normalize_card_name(card_name)] = canonical_key
+            for alias in card_aliases(record):
+                if normalize_card_name(alias) != canonical_key:
+                    face_aliases.setdefault(normalize_card_name(alias), canonical_key)
+
+        if new_aliases or face_aliases:
+            with self._aliases_lock:
+                aliases = self._load_aliases()
+                # Face names never take over a name that already belongs to another card
+                for key, value in face_aliases.items():
+                    if key not in new_aliases:
+                        new_aliases[key] = aliases.get(key, value)
+                if any(aliases.get(key) != value for key, value in new_aliases.items()):
+                    aliases.update(new_aliases)
+                    with open(self._aliases_file, 'w', encoding='utf-8') as f:
+                        json.dump(aliases, f, ensure_ascii=False)
+        return written
+
+    def delete(self, card_name: str) -> bool:
+        cache_file = self._resolve_file(card_name)
+        if cache_file is not None:
+            cache_file.unlink()
+            return True
+        return False
+
+    def mark_stale(self, card_name: str) -> bool:
+        # The file modification time doubles as the fetch timestamp
+        cache_file = self._resolve_file(card_name)
+        if cache_file is not None:
+            os.utime(cache_file, (0, 0))
+            return True
+        return False
+
+    def count(self) -> int:
+        return sum(1 for _ in self.cache_dir.glob(self.CARD_GLOB))
+
+    def _load_misses(self) -> Dict[str, Dict]:
+        """Load the negative cache file on first use"""
+        if self._misses is None:
+            self._misses = {}
+            if self._misses_file.exists():
+                try:
+                    with open(self._misses_file, 'r', encoding='utf-8') as f:
+                        self._misses = json.load(f)
+                except Exception as e:
+                    logger.warning(f"⚠️ Error reading negative cache {self._misses_file}: {e}")
+        return self._misses
+
+    def _save_misses(self):
+        with open(self._misses_file, 'w', encoding='utf-8') as f:
+            json.dump(self._misses, f, indent=2, ensure_ascii=False)
+
+    def get_miss(self, card_name: str) -> Optional[Dict]:
+        with self._misses_lock:
+            return self._load_misses().get(normalize_card_name(card_name))
+
+    def record_miss(self, card_name: str) -> Dict:
+        now = time.time()
+        with self._misses_lock:
+            misses = self._load_misses()
+            entry = misses.get(normalize_card_name(card_name))
+            if entry is None:
+                entry = {'name': card_name, 'first_seen': now, 'last_checked': now, 'count': 0}
+                misses[normalize_card_name(card_name)] = entry
+            entry['last_checked'] = now
+            entry['count'] += 1
+            self._save_misses()
+            return dict(entry)
+
+    def list_misses(self) -> List[Dict]:
+        with self._misses_lock:
+            entries = [dict(entry) for entry in self._load_misses().values()]
+        return sorted(entries, key=lambda entry: entry['last_checked'], reverse=True)
+
+    def count_misses(self) -> int:
+        with self._misses_lock:
+            return len(self._load_misses())
+
+    def clear_misses(self, card_names: Optional[Iterable[str]] = None) -> int:
+        with self._misses_lock:
+            misses = self._load_misses()
+            if card_names is None:
+                cleared = len(misses)
+                misses.clear()
+            else:
+                cleared = 0
+                for card_name in card_names:
+                    if misses.pop(normalize_card_name(card_name), None) is not None:
+                        cleared += 1
+            if cleared:
+                self._save_misses()
+            return cleared
+
+    def iter_records(self) -> Iterator[Tuple[CardRecord, List[str]]]:
+        with self._aliases_lock:
+            aliases = dict(self._load_aliases())
+        aliases_by_card: Dict[str, List[str]] = {}
+        for alias_key, canonical_key in aliases.items():
+            aliases_by_card.setdefault(canonical_key, []).append(alias_key)
+        for card_data in self.iter_cards():
+            if isinstance(card_data, dict) and card_data.get('id') and card_data.get('name'):
+                canonical_key = normalize_card_name(card_data['name'])
+                yield CardRecord.from_dict(card_data), [canonical_key] + aliases_by_card.get(canonical_key, [])
+
+    def iter_cards(self) -> Iterable[Dict]:
+        """Yield every card stored in the directory"""
+        for path in self.cache_dir.glob(self.CARD_GLOB):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    yield json.load(f)
+            except Exception as e:
+                logger.warning(f"⚠️ Skipping unreadable cache file {path}: {e}")
+
+
+class SQLiteCardStore(CardStore):
+    """SQLite (WAL) backend keyed by normalized card name and Scryfall id"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cards (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        data TEXT NOT NULL,
+        fetched_at REAL NOT NULL,
+        raw BLOB
+    );
+    CREATE TABLE IF NOT EXISTS card_names (
+        name_key TEXT PRIMARY KEY,
+        card_id TEXT NOT NULL REFERENCES cards(id) ON DELETE CASCADE
+    );
+    CREATE INDEX IF NOT EXISTS idx_card_names_card_id ON card_names(card_id);
+    CREATE TABLE IF NOT EXISTS misses (
+        name_key TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        first_seen REAL NOT NULL,
+        last_checked REAL NOT NULL,
+        count INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """
+
+    def __init__(self, db_path: Path, keep_raw: bool = False):
+        self.db_path = Path(db_path)
+        # Keep the full Scryfall payload zlib-compressed next to the slim record
+        self.keep_raw = keep_raw
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # A single connection shared between threads, serialized by a lock
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+        self._upgrade_schema()
+
+    def _upgrade_schema(self):
+        """Bring databases created by older versions up to date"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cards)")}
+        if 'raw' not in columns:
+            with self._lock, self._conn:
+                self._conn.execute("ALTER TABLE cards ADD COLUMN raw BLOB")
+
+        # Older versions stored the full payload in `data`; rewrite it as a slim record once
+        if not self.get_meta("records_compacted_at"):
+            with self._lock, self._conn:
+                rows = self._conn.execute("SELECT id, data FROM cards").fetchall()
+                for card_id, data in rows:
+                    payload = json.loads(data)
+                    self._conn.execute(
+                        "UPDATE cards SET data = ?, raw = ? WHERE id = ?",
+                        (CardRecord.from_dict(payload).to_json(), self._compress_raw(payload), card_id),
+                    )
+            self.set_meta("records_compacted_at", str(time.time()))
+            if rows:
+                self._conn.execute("VACUUM")
+
+        # Name keys were plain lowercase before; re-key them and index face names
+        if self.get_meta("name_keys_version") != "2":
+            self._rebuild_name_index()
+            self.set_meta("name_keys_version", "2")
+
+    def _rebuild_name_index(self):
+        """Recompute every name key with the current normalize_card_name"""
+        with self._lock, self._conn:
+            rows = self._conn.execute("SELECT name_key, card_id FROM card_names").fetchall()
+            cards = self._conn.execute("SELECT id, name, data FROM cards").fetchall()
+            self._conn.execute("DELETE FROM card_names")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO card_names (name_key, card_id) VALUES (?, ?)",
+                [(normalize_card_name(name), card_id) for card_id, name, _ in cards]
+                + [(normalize_card_name(name_key), card_id) for name_key, card_id in rows]
+                + [(normalize_card_name(alias), card_id) for card_id, _, data in cards
+                   for alias in card_aliases(json.loads(data))],
+            )
+            misses = self._conn.execute("SELECT name_key FROM misses").fetchall()
+            self._conn.executemany(
+                "UPDATE OR IGNORE misses SET name_key = ? WHERE name_key = ?",
+                [(normalize_card_name(name_key), name_key) for (name_key,) in misses],
+            )
+
+    def _compress_raw(self, card_data: Union[CardRecord, Dict]) -> Optional[bytes]:
+        """Compress a full payload for cold storage (only when keep_raw is enabled)"""
+        if not self.keep_raw or isinstance(card_data, CardRecord):
+            return None
+        return zlib.compress(json.dumps(card_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    def get(self, card_name: str) -> Optional[CardRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT c.data, c.fetched_at FROM card_names n JOIN cards c ON c.id = n.card_id "
+                "WHERE n.name_key = ?",
+                (normalize_card_name(card_name),),
+            ).fetchone()
+        return CardRecord.from_json(*row) if row else None
+
+    def get_by_id(self, card_id: str) -> Optional[CardRecord]:
+        with self._lock:
+            row = self._conn.execute("SELECT data, fetched_at FROM cards WHERE id = ?", (card_id,)).fetchone()
+        return CardRecord.from_json(*row) if row else None
+
+    def resolve_name(self, card_name: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT card_id FROM card_names WHERE name_key = ?", (normalize_card_name(card_name),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_raw(self, card_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT raw FROM cards WHERE id = ?", (card_id,)).fetchone()
+        if not row or row[0] is None:
+            return None
+        return json.loads(zlib.decompress(row[0]).decode('utf-8'))
+
+    def get_many(self, card_names: Iterable[str]) -> Dict[str, CardRecord]:
+        keys: Dict[str, List[str]] = {}
+        for card_name in card_names:
+            keys.setdefault(normalize_card_name(card_name), []).append(card_name)
+        if not keys:
+            return {}
+
+        result = {}
+        key_list = list(keys)
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(key_list), 500):
+            chunk = key_list[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT n.name_key, c.data, c.fetched_at FROM card_names n JOIN cards c ON c.id = n.card_id "
+                    f"WHERE n.name_key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+            for name_key, data, fetched_at in rows:
+                card_data = CardRecord.from_json(data, fetched_at)
+                for card_name in keys[name_key]:
+                    result[card_name] = card_data
+        return result
+
+    def put_many(self, items: Iterable[Tuple[str, Union[CardRecord, Dict]]]) -> int:
+        now = time.time()
+        card_rows = []
+        name_rows = []
+        face_rows = []
+        for card_name, card_data in items:
+            if not card_data.get('id'):
+                logger.warning(f"⚠️ Card without Scryfall id not stored: {card_name}")
+                continue
+            record = to_card_record(card_data)
+            card_id = record.id
+            canonical_name = record.name or card_name
+            card_rows.append((card_id, canonical_name, record.to_json(), now, self._compress_raw(card_data)))
+            name_rows.append((normalize_card_name(canonical_name), card_id))
+            if card_name != canonical_name:
+                name_rows.append((normalize_card_name(card_name), card_id))
+            # Face names never take over a name that already belongs to another card
+            face_rows.extend((normalize_card_name(alias), card_id) for alias in card_aliases(record))
+
+        if not card_rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO cards (id, name, data, fetched_at, raw) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET name = excluded.name, data = excluded.data, "
+                "fetched_at = excluded.fetched_at, raw = COALESCE(excluded.raw, cards.raw)",
+                card_rows,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO card_names (name_key, card_id) VALUES (?, ?)",
+                name_rows,
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO card_names (name_key, card_id) VALUES (?, ?)",
+                face_rows,
+            )
+        return len(card_rows)
+
+    def delete(self, card_name: str) -> bool:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT card_id FROM card_names WHERE name_key = ?",
+                (normalize_card_name(card_name),),
+            ).fetchone()
+            if not row:
+                return False
+            # Cascades to every name pointing at this card
+            self._conn.execute("DELETE FROM cards WHERE id = ?", (row[0],))
+        return True
+
+    def mark_stale(self, card_name: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE cards SET fetched_at = 0 WHERE id = (SELECT card_id FROM card_names WHERE name_key = ?)",
+                (normalize_card_name(card_name),),
+            )
+        return cursor.rowcount > 0
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+    def iter_records(self, page_size: int = 1000) -> Iterator[Tuple[CardRecord, List[str]]]:
+        last_id = ""
+        while True:
+            # Page by id so the shared connection is never held across yields
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT c.id, c.data, c.fetched_at, group_concat(n.name_key, char(31)) "
+                    "FROM cards c LEFT JOIN card_names n ON n.card_id = c.id "
+                    "WHERE c.id > ? GROUP BY c.id ORDER BY c.id LIMIT ?",
+                    (last_id, page_size),
+                ).fetchall()
+            if not rows:
+                return
+            for card_id, data, fetched_at, name_keys in rows:
+                yield CardRecord.from_json(data, fetched_at), name_keys.split("\x1f") if name_keys else []
+            last_id = rows[-1][0]
+
+    def get_miss(self, card_name: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, first_seen, last_checked, count FROM misses WHERE name_key = ?",
+                (normalize_card_name(card_name),),
+            ).fetchone()
+        return self._miss_entry(row) if row else None
+
+    def record_miss(self, card_name: str) -> Dict:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO misses (name_key, name, first_seen, last_checked, count) VALUES (?, ?, ?, ?, 1) "
+                "ON CONFLICT(name_key) DO UPDATE SET last_checked = excluded.last_checked, count = count + 1",
+                (normalize_card_name(card_name), card_name, now, now),
+            )
+        return self.get_miss(card_name)
+
+    def list_misses(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, first_seen, last_checked, count FROM misses ORDER BY last_checked DESC"
+            ).fetchall()
+        return [self._miss_entry(row) for row in rows]
+
+    def count_misses(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM misses").fetchone()[0]
+
+    def clear_misses(self, card_names: Optional[Iterable[str]] = None) -> int:
+        with self._lock, self._conn:
+            if card_names is None:
+                return self._conn.execute("DELETE FROM misses").rowcount
+            return self._conn.executemany(
+                "DELETE FROM misses WHERE name_key = ?",
+                [(normalize_card_name(card_name),) for card_name in card_names],
+            ).rowcount
+
+    @staticmethod
+    def _miss_entry(row) -> Dict:
+        name, first_seen, last_checked, count = row
+        return {'name': name, 'first_seen': first_seen, 'last_checked': last_checked, 'count': count}
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """Read a value from the store metadata table"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        """Write a value to the store metadata table"""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def migrate_from_json_dir(self, json_dir: Path, batch_size: int = 500, force: bool = False) -> int:
+        """Import legacy `scryfall_cache/*.json` files once, returning how many cards were imported"""
+        if not force and self.get_meta("json_migrated_at"):
+            return 0
+
+        legacy = JsonFileCardStore(json_dir)
+        imported = 0
+        batch = []
+        for card_data in legacy.iter_cards():
+            if not isinstance(card_data, dict) or 'name' not in card_data:
+                continue
+            batch.append((card_data['name'], card_data))
+            if len(batch) >= batch_size:
+                imported += self.put_many(batch)
+                batch = []
+        if batch:
+            imported += self.put_many(batch)
+
+        self.set_meta("json_migrated_at", str(time.time()))
+        if imported:
+            logger.info(f"📦 Migrated {imported} cards from {json_dir} to {self.db_path}")
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_card_store(cache_dir: Path, backend: str = "sqlite", keep_raw: bool = False) -> CardStore:
+    """Build the card store for a cache directory ('sqlite' or 'json')
+
+    keep_raw only applies to SQLite; the JSON backend always stores slim records.
+    """
+    cache_dir = Path(cache_dir)
+    if backend == "json":
+        return JsonFileCardStore(cache_dir)
+    if backend == "sqlite":
+        store = SQLiteCardStore(cache_dir / "cards.sqlite3", keep_raw=keep_raw)
+        store.migrate_from_json_dir(cache_dir)
+        return store
+    raise ValueError(f"Unknown card store backend: {backend}")
@@ -3,7 +3,9 @@ Tools for manipulating Magic: The Gathering decks
 """
 from pathlib import Path
 from langchain_core.tools import tool
-from .scryfall_integration import scryfall_cache
+from .fuzzy import FuzzyNameIndex
+from .image_downloader import download_card_images, log_progress, summarize_outcomes
+from .scryfall_integration import IMAGE_CACHED, IMAGE_DOWNLOADED, IMAGE_FAILED, IMAGE_UNAVAILABLE, scryfall_cache
 import logging
 
 logger = logging.getLogger("mtg_agent.deck_tools")
@@ -60,7 +62,7 @@ def modify_deck_card(card_name: str, quantity_change: int) -> str:
     Modify the quantity of a card in the deck.
     
     Args:
-        card_name: Exact name of the card to modify
+        card_name: Name of the card to modify (near misses are matched, or suggestions returned)
         quantity_change: Amount to add (positive) or subtract (negative) from the card
         
     Returns:
@@ -72,8 +74,14 @@ def modify_deck_card(card_name: str, quantity_change: int) -> str:
         # Separate commander from the rest of the deck
         commander_line = lines[-1] if lines and lines[-1].strip() else None
         deck_lines = lines[:-2] if len(lines) > 1 else []
+
+        resolved_name, error_msg = _resolve_card_name(deck_lines, card_name, quantity_change)
+        if error_msg:
+            return error_msg
         
-        new_lines, result_msg = _process_deck_modification(deck_lines, card_name, quantity_change)
+        new_lines, result_msg = _process_deck_modification(deck_lines, resolved_name, quantity_change)
+        if resolved_name != card_name:
+            result_msg = f"🔤 '{card_name}' → {resolved_name}\n{result_msg}"
         
         # Add empty line and commander at the end
         if commander_line:
@@ -81,6 +89,10 @@ def modify_deck_card(card_name: str, quantity_change: int) -> str:
             new_lines.append(commander_line)
         
         _write_deck_lines(new_lines)
+
+        # Resolve an added card now, in the background, so the next turn finds it cached
+        if quantity_change > 0:
+            scryfall_cache.prefetch_card(resolved_name)
         return result_msg
         
     except FileNotFoundError as e:
@@ -89,6 +101,40 @@ def modify_deck_card(card_name: str, quantity_change: int) -> str:
         return f"❌ Error modifying deck: {str(e)}"
 
 
+def _resolve_card_name(deck_lines, card_name: str, quantity_change: int):
+    """Map a possibly misspelled name to a deck entry or a known card
+
+    Returns (name to use, None), or (None, message with suggestions) when the name is
+    only close to several cards.
+    """
+    deck_names = [parsed[1] for parsed in map(_parse_card_line, deck_lines) if parsed]
+    if any(name.lower() == card_name.lower() for name in deck_names):
+        return card_name, None
+
+    # A near miss of a card already in the deck
+    deck_match, deck_suggestions = FuzzyNameIndex(deck_names).best_match(card_name)
+    if deck_match:
+        return deck_match, None
+    if quantity_change <= 0:
+        if deck_suggestions:
+            return None, f"❌ Error: Card '{card_name}' not found in deck. Did you mean: {'; '.join(deck_suggestions)}?"
+        return card_name, None
+
+    # A new card: a confident local match is taken as is
+    match = scryfall_cache.match_card(card_name, fetch=False)
+    if match.card is not None:
+        return match.name, None
+    # Close to several cached names: Scryfall decides whether it is one of them
+    if match.suggestions:
+        match = scryfall_cache.match_card(card_name)
+        if match.card is not None:
+            return match.name, None
+        if match.suggestions:
+            return None, f"❓ Card '{card_name}' not found. Did you mean: {'; '.join(match.suggestions)}?"
+    # Nothing like it is cached: added as typed, the prefetcher looks it up in the background
+    return card_name, None
+
+
 def _process_deck_modification(deck_lines, card_name: str, quantity_change: int):
     """Process the modification of a card in the deck"""
     new_lines = []
@@ -199,16 +245,21 @@ def get_card_info(card_name: str) -> str:
     Get detailed information about a specific card from Scryfall.
     
     Args:
-        card_name: Exact name of the card
+        card_name: Name of the card (near misses are matched against known cards)
         
     Returns:
-        Detailed card information or error message
+        Detailed card information, suggested names, or error message
     """
     try:
         logger.info(f"🔎 Solicitando información de la carta: {card_name}")
-        card_info = scryfall_cache.get_card_info(card_name)
+        match = scryfall_cache.match_card(card_name)
+        card_info = match.card
         
         if not card_info:
+            if match.suggestions:
+                return f"❓ Card not found: {card_name}. Did you mean: {'; '.join(match.suggestions)}?"
+            if scryfall_cache.offline:
+                return f"📴 Offline mode: {card_name} is not in the local card cache"
             return f"❌ Card information not found: {card_name}"
         
         # Extract relevant information
@@ -221,6 +272,8 @@ def get_card_info(card_name: str) -> str:
         toughness = card_info.get('toughness', '')
         
         result = f"🃏 **{name}**\n"
+        if match.name != card_name:
+            result = f"🔤 Closest match for '{card_name}':\n" + result
         result += f"• Mana Cost: {mana_cost}\n"
         result += f"• CMC: {cmc}\n"
         result += f"• Type: {type_line}\n"
@@ -237,26 +290,28 @@ def get_card_info(card_name: str) -> str:
 
 
 @tool
-def refresh_card_cache(card_name: str) -> str:
+def refresh_card_cache(card_name: str, wait: bool = False) -> str:
     """
     Refresh cached information for a specific card from Scryfall.
     
     Args:
         card_name: Exact name of the card to refresh
+        wait: Wait for the updated information instead of refreshing in the background
         
     Returns:
         Message indicating the refresh result
     """
     try:
-        # Get cache file path
-        cache_file = scryfall_cache._get_cache_filename(card_name)
-        
-        # Delete cache file if it exists
-        if cache_file.exists():
-            cache_file.unlink()
+        if scryfall_cache.offline:
+            return f"📴 Offline mode: cannot refresh {card_name} from Scryfall"
+
+        if not wait:
+            # Mark the entry stale; it is refetched in the background
+            scryfall_cache.refresh_card(card_name)
+            return f"🔄 Refresh scheduled for: {card_name}"
         
         # Get updated information
-        card_info = scryfall_cache.get_card_info(card_name)
+        card_info = scryfall_cache.refresh_card(card_name, wait=True)
         
         if card_info:
             return f"✅ Information updated for: {card_name}"
@@ -347,32 +402,33 @@ def _format_deck_stats(stats):
 def download_deck_images(dest_dir: str | None = None) -> str:
     """
     Descargar las imágenes de todas las cartas del mazo al directorio de caché de imágenes.
-    Usa `scryfall_cache.download_card_image` (que ya registra cuando descarga/usa caché).
+    Las descargas se reparten en un pool de hilos acotado (MTG_AGENT_IMAGE_WORKERS).
     """
     try:
         lines = _read_deck_lines()
-        downloaded = 0
-        failed = []
-        seen = set()
-
-        for line in lines:
-            parsed = _parse_card_line(line)
-            if not parsed:
-                continue
-            _, card_name = parsed
-            if card_name in seen:
-                continue
-            seen.add(card_name)
-            # Intentamos descargar una vez por nombre (no por cantidad)
-            path = scryfall_cache.download_card_image(card_name, dest_dir)
-            if path:
-                downloaded += 1
-            else:
-                failed.append(card_name)
-
-        summary = f"✅ Imágenes procesadas: {downloaded}. Fallos: {len(failed)}"
+
+        # Resolve the card data for the whole deck in bulk before downloading
+        names = list(dict.fromkeys(parsed[1] for parsed in map(_parse_card_line, lines) if parsed))
+        unavailable = set(scryfall_cache.get_cards_info(names).unavailable)
+
+        # Una descarga por nombre (no por cantidad), en paralelo
+        outcomes = download_card_images([name for name in names if name not in unavailable], dest_dir,
+                                        progress=log_progress(), cache=scryfall_cache)
+        counts = summarize_outcomes(outcomes)
+        failed = [outcome.card_name for outcome in outcomes if outcome.status == IMAGE_FAILED]
+        not_cached = [outcome.card_name for outcome in outcomes if outcome.status == IMAGE_UNAVAILABLE]
+
+        summary = (f"✅ Imágenes procesadas: {counts[IMAGE_DOWNLOADED] + counts[IMAGE_CACHED]} "
+                   f"({counts[IMAGE_DOWNLOADED]} descargadas, {counts[IMAGE_CACHED]} en caché). "
+                   f"Fallos: {len(failed)}")
         if failed:
-            summary += "\nCartas fallidas: " + ", ".join(sorted(set(failed))[:10])
+            summary += "\nCartas fallidas: " + ", ".join(sorted(failed)[:10])
+        if not_cached:
+            summary += (f"\n📴 Imágenes no cacheadas (modo offline): {len(not_cached)} cartas: "
+                        + ", ".join(sorted(not_cached)[:10]))
+        if unavailable:
+            reason = "modo offline" if scryfall_cache.offline else "Scryfall no disponible"
+            summary += f"\n📴 Sin datos ({reason}): {len(unavailable)} cartas: " + ", ".join(sorted(unavailable)[:10])
         return summary
     except Exception as e:
         return f"❌ Error descargando imágenes del mazo: {e}"
@@ -0,0 +1,99 @@
+"""
+Trigram index over known card names for resolving near-miss spellings locally
+"""
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+from .card_store import normalize_card_name
+
+# Suggestions scoring below this are not considered candidates at all
+SUGGESTION_MIN_SCORE = 0.5
+# A best match at least this good, and this far ahead of the runner-up, is taken as the card
+AUTO_RESOLVE_SCORE = 0.75
+AUTO_RESOLVE_MARGIN = 0.1
+
+_NON_ALNUM = re.compile(r"[^0-9a-z/]+")
+
+
+def _match_key(card_name: str) -> str:
+    """Normalized name with punctuation folded to spaces ("Atraxa, Praetors' Voice" -> "atraxa praetors voice")"""
+    return " ".join(_NON_ALNUM.sub(" ", normalize_card_name(card_name)).split())
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyNameIndex:
+    """Ranks known card names by trigram similarity to a query
+
+    The score blends the Dice coefficient (how alike the two names are overall) with
+    how much of the query the name contains, so both typos ("Sol Rnig") and shortened
+    names ("Atraxa") find their card.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._lock = threading.Lock()
+        self._names: List[str] = []
+        self._sizes: List[int] = []
+        self._keys: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, card_name: str) -> bool:
+        """Index a name, returning False if it (or a spelling of it) is already indexed"""
+        key = _match_key(card_name)
+        if not key:
+            return False
+        with self._lock:
+            if key in self._keys:
+                return False
+            name_id = len(self._names)
+            grams = _trigrams(key)
+            self._names.append(card_name)
+            self._sizes.append(len(grams))
+            self._keys[key] = name_id
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(name_id)
+        return True
+
+    def suggest(self, query: str, limit: int = 5,
+                min_score: float = SUGGESTION_MIN_SCORE) -> List[Tuple[str, float]]:
+        """Return up to `limit` (name, score) pairs, best first; an exact spelling scores 1.0"""
+        key = _match_key(query)
+        if not key:
+            return []
+        with self._lock:
+            exact = self._keys.get(key)
+            if exact is not None:
+                return [(self._names[exact], 1.0)]
+            grams = _trigrams(key)
+            shared = Counter()
+            for gram in grams:
+                shared.update(self._postings.get(gram, ()))
+            scored = []
+            for name_id, common in shared.items():
+                dice = 2 * common / (len(grams) + self._sizes[name_id])
+                score = (dice + common / len(grams)) / 2
+                if score >= min_score:
+                    scored.append((score, self._names[name_id]))
+        scored.sort(key=lambda item: (-item[0], len(item[1]), item[1]))
+        return [(name, round(score, 3)) for score, name in scored[:limit]]
+
+    def best_match(self, query: str) -> Tuple[str, List[str]]:
+        """Return (confident match or "", ranked suggestions) for a query"""
+        suggestions = self.suggest(query)
+        if not suggestions:
+            return "", []
+        best_name, best_score = suggestions[0]
+        runner_up = suggestions[1][1] if len(suggestions) > 1 else 0.0
+        if best_score >= AUTO_RESOLVE_SCORE and best_score - runner_up >= AUTO_RESOLVE_MARGIN:
+            return best_name, [name for name, _ in suggestions]
+        return "", [name for name, _ in suggestions]
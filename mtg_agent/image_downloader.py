@@ -0,0 +1,66 @@
+"""
+Concurrent card image downloads with progress reporting
+"""
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .scryfall_integration import (IMAGE_CACHED, IMAGE_DOWNLOADED, IMAGE_FAILED, IMAGE_UNAVAILABLE,
+                                   ImageOutcome, ScryfallCache, scryfall_cache)
+
+logger = logging.getLogger("mtg_agent.image_downloader")
+
+# Called after every image with (images done, total images, outcome of this one)
+ProgressCallback = Callable[[int, int, ImageOutcome], None]
+
+
+def download_card_images(card_names: Iterable[str], dest_dir: Optional[str] = None,
+                         workers: Optional[int] = None, progress: Optional[ProgressCallback] = None,
+                         cache: Optional[ScryfallCache] = None) -> List[ImageOutcome]:
+    """Download the images of many cards on a bounded thread pool
+
+    Card data should already be cached (see ScryfallCache.get_cards_info), so workers
+    only talk to the image CDN, paced by the cache's image rate limiter. Returns one
+    outcome per unique name, in input order.
+    """
+    cache = cache or scryfall_cache
+    names = list(dict.fromkeys(card_names))
+    if workers is None:
+        workers = int(os.getenv("MTG_AGENT_IMAGE_WORKERS", 8))
+    workers = max(1, min(workers, len(names) or 1))
+
+    outcomes: Dict[str, ImageOutcome] = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-download") as pool:
+        futures = {pool.submit(cache.fetch_card_image, card_name, dest_dir): card_name for card_name in names}
+        for future in as_completed(futures):
+            card_name = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as e:
+                outcome = ImageOutcome(card_name, IMAGE_FAILED, None, str(e), 0.0)
+            outcomes[card_name] = outcome
+            if progress is not None:
+                progress(len(outcomes), len(names), outcome)
+    return [outcomes[card_name] for card_name in names]
+
+
+def summarize_outcomes(outcomes: List[ImageOutcome]) -> Dict:
+    """Count outcomes by status, with the slowest download time"""
+    summary = {status: 0 for status in (IMAGE_DOWNLOADED, IMAGE_CACHED, IMAGE_FAILED, IMAGE_UNAVAILABLE)}
+    for outcome in outcomes:
+        summary[outcome.status] = summary.get(outcome.status, 0) + 1
+    summary['slowest_seconds'] = max((outcome.seconds for outcome in outcomes), default=0.0)
+    return summary
+
+
+def log_progress(every: int = 10) -> ProgressCallback:
+    """Progress callback logging every `every` images and the last one"""
+    started_at = time.perf_counter()
+
+    def _report(done: int, total: int, outcome: ImageOutcome):
+        if done % every == 0 or done == total:
+            logger.info(f"🖼️ Imágenes: {done}/{total} ({time.perf_counter() - started_at:.1f}s)")
+
+    return _report
@@ -0,0 +1,163 @@
+"""
+SQLite manifest of the images held by the image store
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger("mtg_agent.image_manifest")
+
+# Bytes hashed per read when computing checksums
+_CHECKSUM_CHUNK_SIZE = 64 * 1024
+# Seconds before a lookup rewrites last_used again; garbage collection works in days
+TOUCH_INTERVAL = 3600.0
+
+
+def file_checksum(path: Path) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHECKSUM_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImageManifest:
+    """SQLite (WAL) index of stored images, keyed by image store key
+
+    Presence checks, missing-image reports and garbage collection are answered from
+    here instead of by stat-ing image files one at a time.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS images (
+        key TEXT PRIMARY KEY,
+        card_id TEXT NOT NULL,
+        image_uri TEXT NOT NULL,
+        path TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        checksum TEXT NOT NULL,
+        fetched_at REAL NOT NULL,
+        last_used REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_images_card_id ON images(card_id);
+    CREATE INDEX IF NOT EXISTS idx_images_last_used ON images(last_used);
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """
+
+    def __init__(self, db_path: Path, touch_interval: float = TOUCH_INTERVAL):
+        self.db_path = Path(db_path)
+        self.touch_interval = touch_interval
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # A single connection shared between threads, serialized by a lock
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def record(self, key: str, card_id: str, image_uri: str, path: Path) -> Dict:
+        """Add (or replace) the entry for a stored image, measuring and hashing the file"""
+        path = Path(path)
+        now = time.time()
+        entry = {
+            'key': key,
+            'card_id': card_id,
+            'image_uri': image_uri,
+            'path': str(path),
+            'size': path.stat().st_size,
+            'checksum': file_checksum(path),
+            'fetched_at': now,
+            'last_used': now,
+        }
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO images (key, card_id, image_uri, path, size, checksum, fetched_at, last_used) "
+                "VALUES (:key, :card_id, :image_uri, :path, :size, :checksum, :fetched_at, :last_used)",
+                entry,
+            )
+        return entry
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            self._conn.row_factory = sqlite3.Row
+            try:
+                row = self._conn.execute("SELECT * FROM images WHERE key = ?", (key,)).fetchone()
+            finally:
+                self._conn.row_factory = None
+        return dict(row) if row else None
+
+    def has(self, key: str) -> bool:
+        """True if the image is stored; marks it as used for garbage collection
+
+        last_used is written at most once per touch_interval, so repeated checks stay reads.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT last_used FROM images WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False
+            if now - row[0] >= self.touch_interval:
+                with self._conn:
+                    self._conn.execute("UPDATE images SET last_used = ? WHERE key = ?", (now, key))
+        return True
+
+    def card_ids_with_images(self, card_ids: Iterable[str]) -> Set[str]:
+        """Return the subset of card_ids that have at least one stored image"""
+        id_list = list(dict.fromkeys(card_ids))
+        found = set()
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(id_list), 500):
+            chunk = id_list[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT DISTINCT card_id FROM images WHERE card_id IN ({placeholders})", chunk
+                ).fetchall()
+            found.update(card_id for (card_id,) in rows)
+        return found
+
+    def unused_since(self, cutoff: float, keep_card_ids: Iterable[str] = ()) -> List[str]:
+        """Return the keys of images not used since `cutoff` (epoch seconds), except keep_card_ids"""
+        keep = set(keep_card_ids)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, card_id FROM images WHERE last_used < ? ORDER BY last_used", (cutoff,)
+            ).fetchall()
+        return [key for key, card_id in rows if card_id not in keep]
+
+    def remove(self, keys: Iterable[str]) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.executemany("DELETE FROM images WHERE key = ?", [(key,) for key in keys])
+        return cursor.rowcount
+
+    def keys(self) -> Set[str]:
+        with self._lock:
+            return {key for (key,) in self._conn.execute("SELECT key FROM images")}
+
+    def stats(self) -> Dict:
+        """Return the number and total size of stored images"""
+        with self._lock:
+            images, total_bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM images").fetchone()
+        return {'images': images, 'bytes': total_bytes}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,231 @@
+"""
+Content-addressed card image store with linked views into requested directories
+"""
+import asyncio
+import json
+import logging
+import os
+import shutil
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: downloads are only coordinated between threads
+    fcntl = None
+
+logger = logging.getLogger("mtg_agent.image_store")
+
+LINK_MODES = ("hardlink", "symlink", "copy")
+# Suffix of downloads in progress; they become blobs only once complete
+PARTIAL_SUFFIX = ".part"
+# Next to a partial: the lock held while writing it and the validator of the bytes in it
+PARTIAL_LOCK_SUFFIX = PARTIAL_SUFFIX + ".lock"
+PARTIAL_VALIDATOR_SUFFIX = PARTIAL_SUFFIX + ".json"
+# Seconds between attempts to take a partial's lock without blocking the event loop
+_LOCK_POLL_INTERVAL = 0.05
+# Marks resized variants stored next to a blob ("<key stem>@<size>-<w>x<h>-q<quality>.<format>")
+VARIANT_MARKER = "@"
+
+
+def image_key(card_id: str, face: int, variant: str, ext: str) -> str:
+    """Key of one Scryfall image: card id, face index and size variant ("large", "png"...)"""
+    return f"{card_id}-{face}-{variant}{ext}"
+
+
+def image_key_card_id(key: str) -> str:
+    """Card id an image key was built from (ids contain dashes, variants don't)"""
+    return key.rsplit("-", 2)[0]
+
+
+class ImageStore:
+    """Stores each image once, by key, and exposes it under any file name on request
+
+    Blobs live at <root>/<first two characters of the key>/<key>. Views are hard links
+    by default (no extra space, survive blob deletion), falling back to symbolic links
+    across filesystems and to copies where links are not supported.
+    """
+
+    def __init__(self, root: Path, link_mode: str = "hardlink"):
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"link_mode must be one of {', '.join(LINK_MODES)}")
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.link_mode = link_mode
+        self._lock = threading.Lock()
+        # Metrics
+        self.links = {mode: 0 for mode in LINK_MODES}
+
+    def path_for(self, key: str) -> Path:
+        """Return where the blob for key is (or will be) stored"""
+        return self.root / key[:2] / key
+
+    def has(self, key: str) -> bool:
+        return self.path_for(key).is_file()
+
+    def partial_path(self, key: str) -> Path:
+        """Return the file an in-progress download of key is written to"""
+        blob = self.path_for(key)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        return blob.with_name(blob.name + PARTIAL_SUFFIX)
+
+    def _partial_companion(self, key: str, suffix: str) -> Path:
+        blob = self.path_for(key)
+        return blob.with_name(blob.name + suffix)
+
+    def _open_partial_lock(self, key: str) -> Optional[int]:
+        if fcntl is None:
+            return None
+        self.path_for(key).parent.mkdir(parents=True, exist_ok=True)
+        return os.open(self._partial_companion(key, PARTIAL_LOCK_SUFFIX), os.O_RDWR | os.O_CREAT, 0o644)
+
+    @contextmanager
+    def partial_lock(self, key: str):
+        """Hold key's partial download exclusively, across processes (blocks until free)
+
+        SingleFlight only coalesces downloads within one process; this keeps two processes
+        from appending to the same partial file.
+        """
+        fd = self._open_partial_lock(key)
+        try:
+            if fd is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            if fd is not None:
+                # Closing the descriptor releases the lock
+                os.close(fd)
+
+    @asynccontextmanager
+    async def apartial_lock(self, key: str):
+        """partial_lock for coroutines: polls for the lock instead of blocking the loop"""
+        fd = self._open_partial_lock(key)
+        try:
+            while fd is not None:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(_LOCK_POLL_INTERVAL)
+            yield
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def partial_validator(self, key: str) -> Optional[Dict]:
+        """Return what identifies the bytes in key's partial file (URI, ETag, Last-Modified)"""
+        try:
+            with open(self._partial_companion(key, PARTIAL_VALIDATOR_SUFFIX), 'r', encoding='utf-8') as f:
+                validator = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return validator if isinstance(validator, dict) else None
+
+    def save_partial_validator(self, key: str, validator: Dict):
+        """Record what identifies the bytes being written to key's partial file"""
+        path = self._partial_companion(key, PARTIAL_VALIDATOR_SUFFIX)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(validator, f)
+
+    def discard_partial(self, key: str):
+        """Delete key's partial file and its validator"""
+        for path in (self.partial_path(key), self._partial_companion(key, PARTIAL_VALIDATOR_SUFFIX)):
+            path.unlink(missing_ok=True)
+
+    def commit(self, key: str, expected_size: Optional[int] = None) -> Path:
+        """Move a finished download into place atomically
+
+        Raises ValueError if the partial file is shorter or longer than expected_size. A
+        short file is kept so the download can resume; a long one is discarded.
+        """
+        partial = self.partial_path(key)
+        size = partial.stat().st_size
+        if size == 0 or (expected_size is not None and size != expected_size):
+            if size == 0 or (expected_size is not None and size > expected_size):
+                self.discard_partial(key)
+            raise ValueError(f"incomplete image {key}: {size} of {expected_size} bytes")
+        with open(partial, 'rb') as f:
+            os.fsync(f.fileno())
+        blob = self.path_for(key)
+        os.replace(partial, blob)
+        self._partial_companion(key, PARTIAL_VALIDATOR_SUFFIX).unlink(missing_ok=True)
+        # Variants rendered from a previous version of the image are stale now
+        for variant in self._variant_paths(blob):
+            variant.unlink(missing_ok=True)
+        return blob
+
+    def link(self, key: str, view_path: Path) -> Path:
+        """Expose the blob for key at view_path, replacing whatever view was there"""
+        blob = self.path_for(key)
+        if not blob.is_file():
+            # A symbolic link would happily point at nothing
+            raise FileNotFoundError(f"No stored image {key}")
+        view_path = Path(view_path)
+        view_path.parent.mkdir(parents=True, exist_ok=True)
+        if self._is_view_of(view_path, blob):
+            return view_path
+
+        # Build the new view next to the old one and swap it in atomically
+        tmp_path = view_path.with_name(f".{view_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        modes = LINK_MODES[LINK_MODES.index(self.link_mode):]
+        for mode in modes:
+            try:
+                if mode == "hardlink":
+                    os.link(blob, tmp_path)
+                elif mode == "symlink":
+                    os.symlink(blob.resolve(), tmp_path)
+                else:
+                    shutil.copyfile(blob, tmp_path)
+                os.replace(tmp_path, view_path)
+            except OSError as e:
+                logger.debug(f"{mode} view of {key} at {view_path} failed: {e}")
+                tmp_path.unlink(missing_ok=True)
+                continue
+            with self._lock:
+                self.links[mode] += 1
+            return view_path
+        raise OSError(f"Could not create a view of {key} at {view_path}")
+
+    @staticmethod
+    def _is_view_of(view_path: Path, blob: Path) -> bool:
+        try:
+            if view_path.is_symlink():
+                return view_path.resolve() == blob.resolve()
+            return os.path.samefile(view_path, blob)
+        except OSError:
+            return False
+
+    def remove(self, key: str) -> int:
+        """Delete a blob with its resized variants and partial download; returns bytes freed
+
+        Hard-linked views keep their data; symbolic-link views are left dangling.
+        """
+        blob = self.path_for(key)
+        freed = 0
+        companions = [blob.with_name(blob.name + suffix)
+                      for suffix in (PARTIAL_SUFFIX, PARTIAL_VALIDATOR_SUFFIX, PARTIAL_LOCK_SUFFIX)]
+        for path in [blob, *companions, *self._variant_paths(blob)]:
+            try:
+                freed += path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                continue
+        return freed
+
+    @staticmethod
+    def _variant_paths(blob: Path):
+        return list(blob.parent.glob(f"{blob.stem}{VARIANT_MARKER}*"))
+
+    def iter_keys(self) -> Iterator[str]:
+        """Walk the store for the keys of complete blobs (used to rebuild the manifest)"""
+        for entry in self.root.glob("*/*"):
+            if entry.is_file() and PARTIAL_SUFFIX not in entry.name and VARIANT_MARKER not in entry.name:
+                yield entry.name
+
+    def stats(self) -> Dict:
+        """Return the link mode and the views created (image counts live in the manifest)"""
+        with self._lock:
+            return {'link_mode': self.link_mode, 'views': dict(self.links)}
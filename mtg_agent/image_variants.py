@@ -0,0 +1,158 @@
+"""
+Resized variants (thumbnails, UI sizes) of stored card images, rendered once in a process pool
+
+Requires Pillow (pip install 'mtg-agent[images]'); without it only original images are served.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from .image_store import VARIANT_MARKER, ImageStore
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger("mtg_agent.image_variants")
+
+# Bounding boxes (width, height); the aspect ratio of the card is kept
+DEFAULT_SIZES = {
+    'thumb': (146, 204),
+    'small': (244, 340),
+    'medium': (488, 680),
+}
+FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG', 'png': 'PNG'}
+
+
+def parse_sizes(spec: str) -> Dict[str, Tuple[int, int]]:
+    """Parse "thumb:146x204,small:244x340" into {name: (width, height)}"""
+    sizes = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, box = item.partition(':')
+        width, _, height = box.partition('x')
+        sizes[name.strip()] = (int(width), int(height))
+    return sizes
+
+
+def render_variant(source: str, dest: str, width: int, height: int, fmt: str, quality: int) -> str:
+    """Resize source to fit width x height and write it to dest (runs in a worker process)"""
+    with Image.open(source) as img:
+        img.thumbnail((width, height), Image.LANCZOS)
+        if fmt == 'jpeg' and img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        tmp_path = f"{dest}.{os.getpid()}.tmp"
+        try:
+            img.save(tmp_path, FORMATS[fmt], quality=quality)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+    os.replace(tmp_path, dest)
+    return dest
+
+
+class ImageVariantPipeline:
+    """Renders the configured sizes of stored images next to the originals"""
+
+    def __init__(self, image_store: ImageStore, sizes: Optional[Dict[str, Tuple[int, int]]] = None,
+                 fmt: Optional[str] = None, quality: int = 85, max_workers: Optional[int] = None):
+        self.image_store = image_store
+        if sizes is None:
+            spec = os.getenv("MTG_AGENT_IMAGE_SIZES")
+            sizes = parse_sizes(spec) if spec else dict(DEFAULT_SIZES)
+        self.sizes = sizes
+        self.fmt = (fmt or os.getenv("MTG_AGENT_IMAGE_FORMAT", "webp")).lower()
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Image format must be one of {', '.join(FORMATS)}")
+        self.quality = quality
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Metrics
+        self.rendered = 0
+        self.failed = 0
+
+    @staticmethod
+    def available() -> bool:
+        return Image is not None
+
+    def variant_path(self, key: str, size: str) -> Path:
+        """Return where the `size` variant of an image is (or will be) stored
+
+        The name carries the box, format and quality it was rendered with, so changing
+        any of them renders new files instead of serving the old ones.
+        """
+        original = self.image_store.path_for(key)
+        width, height = self.sizes[size]
+        return original.with_name(f"{Path(key).stem}{VARIANT_MARKER}{size}-{width}x{height}-q{self.quality}.{self.fmt}")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: the parent has live threads and open SQLite connections
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def render(self, keys: Iterable[str], sizes: Optional[Iterable[str]] = None) -> Dict[Tuple[str, str], Path]:
+        """Render every missing variant of the given stored images; returns {(key, size): path}
+
+        Variants already on disk are returned without work; the rest are rendered in
+        parallel in the process pool.
+        """
+        if Image is None:
+            raise RuntimeError("Pillow is required for image variants: pip install 'mtg-agent[images]'")
+        sizes = list(sizes or self.sizes)
+        for size in sizes:
+            if size not in self.sizes:
+                raise ValueError(f"Unknown image size {size!r} (configured: {', '.join(self.sizes)})")
+
+        results: Dict[Tuple[str, str], Path] = {}
+        pending = {}
+        for key in dict.fromkeys(keys):
+            original = self.image_store.path_for(key)
+            if not original.is_file():
+                continue
+            for size in sizes:
+                path = self.variant_path(key, size)
+                if path.exists():
+                    results[(key, size)] = path
+                    continue
+                width, height = self.sizes[size]
+                future = self._get_executor().submit(render_variant, str(original), str(path),
+                                                     width, height, self.fmt, self.quality)
+                pending[future] = (key, size, path)
+
+        wait(pending)
+        for future, (key, size, path) in pending.items():
+            try:
+                future.result()
+                results[(key, size)] = path
+                with self._lock:
+                    self.rendered += 1
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                logger.error(f"❌ Error generando variante {size} de {key}: {e}")
+        return results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'available': self.available(),
+                'sizes': dict(self.sizes),
+                'format': self.fmt,
+                'rendered': self.rendered,
+                'failed': self.failed,
+            }
+
+    def close(self):
+        """Shut the worker processes down"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
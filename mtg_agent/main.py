@@ -1,5 +1,6 @@
 import os  
 from pathlib import Path
+import argparse
 import uuid
 import sys
 
@@ -44,8 +45,13 @@ def get_enhanced_deck_info():
         curve_text = mana_curve_calculator.format_mana_curve(curve_data)
 
         # Enrich each card line with mana cost and short oracle text (using cache)
+        names = [raw.strip().split(' ', 1)[1] for raw in lines if len(raw.strip().split(' ', 1)) == 2]
+        batch = scryfall_cache.get_cards_info(names)
+        cards = batch.found
+        unavailable = set(batch.unavailable)
         enriched_lines = []
         missing_cards = []
+        unavailable_cards = []
         for raw in lines:
             raw_strip = raw.strip()
             if not raw_strip:
@@ -57,9 +63,9 @@ def get_enhanced_deck_info():
             qty = parts[0]
             name = parts[1]
 
-            card_info = scryfall_cache.get_card_info(name)
+            card_info = cards.get(name)
             if not card_info:
-                missing_cards.append(name)
+                (unavailable_cards if name in unavailable else missing_cards).append(name)
                 enriched_lines.append(f"{qty} {name} (mana_cost: N/A) - Oracle: N/A")
                 continue
 
@@ -79,6 +85,9 @@ def get_enhanced_deck_info():
         header = "📋 **CURRENT DECK**"
         if missing_cards:
             header += f"\n\n⚠️ Cards not found in Scryfall (will show N/A): {len(missing_cards)}"
+        if unavailable_cards:
+            reason = "offline mode" if scryfall_cache.offline else "Scryfall unreachable"
+            header += f"\n\n📴 Cards unavailable ({reason}, will show N/A): {len(unavailable_cards)}"
         result = f"{header}\n{enriched_content}\n\n{curve_text}"
         return result
         
@@ -165,9 +174,205 @@ def _initialize_agent_resources():
         'conversation_id': conversation_id,
     }
   
-print("React Agent with Store - Type 'exit' to quit\n")  
+def import_bulk(bulk_file: str) -> int:
+    """Load a downloaded Scryfall bulk-data file into the local card store"""
+    from mtg_agent.bulk_import import import_bulk_file
+
+    path = Path(bulk_file)
+    if not path.exists():
+        print(f"❌ Bulk file not found: {path}")
+        return 1
+    imported = import_bulk_file(path, scryfall_cache.store)
+    print(f"✅ Imported {imported} cards into the local card store")
+    return 0
+
+
+def show_missing_cards(clear: bool = False) -> int:
+    """List (and optionally clear) the names Scryfall could not resolve"""
+    misses = scryfall_cache.list_missing_cards()
+    if not misses:
+        print("✅ No unresolved card names in the negative cache")
+        return 0
+    print(f"⚠️ Unresolved card names: {len(misses)}")
+    for miss in misses:
+        print(f"• {miss['name']} ({miss['count']} attempts)")
+    if clear:
+        cleared = scryfall_cache.clear_missing_cards()
+        print(f"🗑️ Cleared {cleared} entries")
+    return 0
+
+
+def export_archive(archive_file: str) -> int:
+    """Compact the local card store into a packed archive for read-only nodes"""
+    exported = scryfall_cache.export_archive(archive_file)
+    print(f"✅ Exported {exported} cards to {archive_file}")
+    print("   Point MTG_AGENT_CARD_ARCHIVE at this file to serve lookups from it")
+    return 0
+
+
+def warm(paths) -> int:
+    """Resolve every card of the given decks so the first prompt is served from cache"""
+    from mtg_agent.warmup import format_warm_report, warm_decks
+
+    report = warm_decks(paths)
+    print(format_warm_report(report))
+    return 0 if report['decks'] else 1
+
+
+def manage_images(deck_paths, gc_days=None) -> int:
+    """Report deck cards without a stored image and optionally collect unused images"""
+    from mtg_agent.warmup import collect_deck_files, read_deck_card_names
+
+    indexed = scryfall_cache.backfill_image_manifest()
+    if indexed:
+        print(f"🗂️ Indexed {indexed} images stored before the manifest existed")
+    stats = scryfall_cache.cache_stats()['image_store']
+    print(f"🖼️ Stored images: {stats['images']} ({stats['bytes'] / 1024 / 1024:.1f} MB)")
+
+    deck_cards = []
+    for deck_file in collect_deck_files(deck_paths):
+        names = read_deck_card_names(deck_file)
+        deck_cards.extend(names)
+        missing = scryfall_cache.missing_images(names)
+        print(f"• {deck_file.name}: {len(names) - len(missing)}/{len(names)} images stored")
+        for card_name in missing:
+            print(f"    ⚠️ {card_name}")
+
+    if gc_days is not None:
+        result = scryfall_cache.gc_images(gc_days, keep_card_names=deck_cards)
+        print(f"🗑️ Removed {result['removed']} images unused for {gc_days:g} days "
+              f"({result['bytes'] / 1024 / 1024:.1f} MB freed)")
+    return 0
+
+
+def _stub_cards(fixtures):
+    """Cards for a stand-in server: a fixture file, else the local card store, else the bundled set"""
+    from mtg_agent.scryfall_stub import load_fixture_cards
+
+    if fixtures:
+        return load_fixture_cards(fixtures)
+    cards = [record.to_dict() for record, _ in scryfall_cache.store.iter_records()]
+    return cards or load_fixture_cards()
+
+
+def run_stub_server(args) -> int:
+    """Serve a local Scryfall stand-in from fixtures (or the local card store)"""
+    from mtg_agent.scryfall_stub import ScryfallStub, ScryfallStubServer
+
+    cards = _stub_cards(args.fixtures)
+
+    stub = ScryfallStub(cards, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after, seed=args.seed)
+    server = ScryfallStubServer(stub, args.host, args.port)
+    print(f"🧪 Serving {len(cards)} cards at {server.url}")
+    print(f"   export MTG_AGENT_SCRYFALL_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    print(f"📊 {stub.stats()}")
+    return 0
+
+
+def run_benchmark(args) -> int:
+    """Time the card fetch paths against an in-process Scryfall stand-in"""
+    from mtg_agent.benchmark import benchmark_fetch_paths, format_benchmark_report
+    from mtg_agent.scryfall_stub import load_fixture_cards
+
+    report = benchmark_fetch_paths(
+        load_fixture_cards(args.fixtures), paths=args.paths, rounds=args.rounds,
+        concurrency=args.concurrency, rate=args.rate, burst=args.burst,
+        stub_options={'latency': args.latency, 'jitter': args.jitter, 'error_rate': args.error_rate,
+                      'rate_limit_rate': args.rate_limit_rate, 'retry_after': 0.1, 'seed': args.seed},
+    )
+    print(format_benchmark_report(report))
+    return 0
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    """Build the command line parser (no subcommand starts the chat agent)"""
+    parser = argparse.ArgumentParser(prog="mtg-agent", description="MTG Agent")
+    subparsers = parser.add_subparsers(dest="command")
+
+    import_parser = subparsers.add_parser(
+        "import-bulk", help="Import a Scryfall bulk-data file (e.g. oracle_cards.json) into the card store"
+    )
+    import_parser.add_argument("bulk_file", help="Path to the downloaded bulk-data JSON file")
+
+    warm_parser = subparsers.add_parser("warm", help="Prefetch every card of one or more decks")
+    warm_parser.add_argument("paths", nargs="+", help="Deck files or directories of *.txt decks")
+
+    archive_parser = subparsers.add_parser(
+        "export-archive", help="Compact the card store into a packed, memory-mapped archive file"
+    )
+    archive_parser.add_argument("archive_file", help="Destination path of the archive")
+
+    misses_parser = subparsers.add_parser("misses", help="List card names Scryfall could not resolve")
+    misses_parser.add_argument("--clear", action="store_true", help="Clear the listed entries")
+
+    images_parser = subparsers.add_parser(
+        "images", help="Show stored card images, report the ones decks are missing and collect unused ones"
+    )
+    images_parser.add_argument("paths", nargs="*", help="Deck files or directories of *.txt decks to check")
+    images_parser.add_argument("--gc-days", type=float,
+                               help="Delete images unused for this many days (cards of the listed decks are kept)")
+
+    stub_parser = subparsers.add_parser(
+        "stub-server", help="Run a local Scryfall stand-in for benchmarks and offline tests"
+    )
+    stub_parser.add_argument("--fixtures",
+                             help="JSON array of Scryfall cards (default: the local card store, else the bundled set)")
+    stub_parser.add_argument("--host", default="127.0.0.1")
+    stub_parser.add_argument("--port", type=int, default=8765)
+    stub_parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    stub_parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    stub_parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 503")
+    stub_parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered 429")
+    stub_parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of injected 429s")
+    stub_parser.add_argument("--seed", type=int, default=0, help="Seed for injected latency and failures")
+
+    bench_parser = subparsers.add_parser(
+        "benchmark", help="Measure throughput and tail latency of the fetch paths against a local stand-in"
+    )
+    bench_parser.add_argument("--fixtures", help="JSON array of Scryfall cards (default: the bundled set)")
+    bench_parser.add_argument("--paths", nargs="+", default=["named", "collection", "async"],
+                              help="Fetch paths to measure: named, collection, async")
+    bench_parser.add_argument("--rounds", type=int, default=3, help="Cold-cache runs per path")
+    bench_parser.add_argument("--concurrency", type=int, default=8, help="Concurrent lookups (named, async)")
+    bench_parser.add_argument("--rate", type=float, default=10.0, help="Client rate limit in requests per second")
+    bench_parser.add_argument("--burst", type=int, default=1, help="Client rate limit burst")
+    bench_parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every stub response")
+    bench_parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    bench_parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 503")
+    bench_parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered 429")
+    bench_parser.add_argument("--seed", type=int, default=0, help="Seed for injected latency and failures")
+    return parser
+
+
+def main(argv=None):
+    args = _build_arg_parser().parse_args(argv)
+    if args.command == "import-bulk":
+        sys.exit(import_bulk(args.bulk_file))
+    if args.command == "warm":
+        sys.exit(warm(args.paths))
+    if args.command == "export-archive":
+        sys.exit(export_archive(args.archive_file))
+    if args.command == "misses":
+        sys.exit(show_missing_cards(args.clear))
+    if args.command == "images":
+        sys.exit(manage_images(args.paths, args.gc_days))
+    if args.command == "stub-server":
+        sys.exit(run_stub_server(args))
+    if args.command == "benchmark":
+        sys.exit(run_benchmark(args))
+    run_chat()
+
+
+def run_chat():
+    print("React Agent with Store - Type 'exit' to quit\n")
 
-def main():
     # Initialize heavy resources for CLI agent
     resources = _initialize_agent_resources()
     store = resources['store']
@@ -0,0 +1,115 @@
+"""
+Token-bucket rate limiter shared by threads and, through a locked state file, processes
+"""
+import asyncio
+import logging
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: the bucket is only shared between threads
+    fcntl = None
+
+logger = logging.getLogger("mtg_agent.rate_limit")
+
+# tokens available, timestamp of the last update
+_STATE = struct.Struct("<dd")
+
+
+class TokenBucketRateLimiter:
+    """Token bucket with a steady rate (tokens/s) and a burst capacity
+
+    Callers reserve a token and are told how long to wait for it, so the bucket can go
+    negative: waiting callers queue up in reservation order instead of racing. With a
+    state_file every process on the host that uses the same file shares one bucket.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 1, state_file: Optional[Path] = None):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.state_file = Path(state_file) if state_file else None
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated_at = time.time()
+        self._fd = None
+        if self.state_file is not None:
+            if fcntl is None:
+                logger.warning("⚠️ fcntl unavailable: rate limit is not shared between processes")
+            else:
+                self.state_file.parent.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT, 0o644)
+        # Metrics
+        self.acquired = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _reserve_locked(self, now: float, tokens: float, updated_at: float):
+        """Refill, take one token and return (delay, tokens left, timestamp)"""
+        tokens = min(float(self.burst), tokens + max(0.0, now - updated_at) * self.rate)
+        tokens -= 1.0
+        delay = -tokens / self.rate if tokens < 0 else 0.0
+        return delay, tokens, now
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds the caller must wait before using it"""
+        with self._lock:
+            now = time.time()
+            if self._fd is None:
+                delay, self._tokens, self._updated_at = self._reserve_locked(now, self._tokens, self._updated_at)
+            else:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+                try:
+                    raw = os.pread(self._fd, _STATE.size, 0)
+                    tokens, updated_at = _STATE.unpack(raw) if len(raw) == _STATE.size else (float(self.burst), now)
+                    delay, tokens, updated_at = self._reserve_locked(now, tokens, updated_at)
+                    os.pwrite(self._fd, _STATE.pack(tokens, updated_at), 0)
+                finally:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+            self.acquired += 1
+            if delay > 0:
+                self.delayed += 1
+                self.total_wait += delay
+                self.max_wait = max(self.max_wait, delay)
+            return delay
+
+    def acquire(self):
+        """Block until a token is available"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self):
+        """Wait for a token without blocking the event loop"""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict:
+        """Return configuration and wait-time metrics"""
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'shared': self._fd is not None,
+                'acquired': self.acquired,
+                'delayed': self.delayed,
+                'total_wait': self.total_wait,
+                'max_wait': self.max_wait,
+                'average_wait': self.total_wait / self.acquired if self.acquired else 0.0,
+            }
+
+    def close(self):
+        """Release the state file"""
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
@@ -0,0 +1,151 @@
+"""
+Retry policy and circuit breaker for calls to Scryfall
+"""
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger("mtg_agent.resilience")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a request while the circuit breaker is open"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the delay of a Retry-After header (seconds or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for transient failures (429, 5xx, connection errors)"""
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 8.0,
+                 max_retry_after: float = 60.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # A Retry-After longer than this is not waited for: the request fails instead
+        self.max_retry_after = max_retry_after
+
+    def should_retry_status(self, status_code: int) -> bool:
+        return status_code in self.RETRY_STATUSES
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to wait before retry number `attempt` (1-based), or None to give up"""
+        if attempt >= self.max_attempts:
+            return None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+        # Full jitter: uniform between 0 and the capped exponential step
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Stops calling a failing service for a cool-down window
+
+    closed: requests flow and consecutive failures are counted. After failure_threshold
+    failures the breaker opens and every request fails fast until `cooldown` seconds have
+    passed; then one trial request is let through (half-open) and its outcome closes or
+    re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        # Metrics
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at < self.cooldown:
+            return "open"
+        return "half-open"
+
+    def _admit(self) -> Optional[str]:
+        """Return "closed" or "trial" if a request may be made now, None if it is rejected"""
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return "closed"
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return "trial"
+            self.rejected += 1
+            return None
+
+    def allow(self) -> bool:
+        """True if a request may be made now"""
+        return self._admit() is not None
+
+    def check(self) -> bool:
+        """Raise CircuitOpenError unless a request may be made now
+
+        Returns True if the request is the half-open trial: the caller must then hand the
+        slot back with release_trial() should it end without an outcome (cancelled,
+        interrupted), or no other trial would ever be let through.
+        """
+        admitted = self._admit()
+        if admitted is None:
+            raise CircuitOpenError("Scryfall circuit breaker is open")
+        return admitted == "trial"
+
+    def release_trial(self):
+        """Free the half-open trial slot (a no-op once its outcome was recorded)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("✅ Scryfall reachable again, closing circuit breaker")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            reopen = self._trial_in_flight
+            self._trial_in_flight = False
+            if reopen or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self.opened += 1
+                logger.warning(f"⚠️ Scryfall failing, circuit breaker open for {self.cooldown:.0f}s")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'state': self._state(time.monotonic()),
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'cooldown': self.cooldown,
+                'opened': self.opened,
+                'rejected': self.rejected,
+            }
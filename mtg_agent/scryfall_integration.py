@@ -1,99 +1,933 @@
 """
 Scryfall API integration for getting Magic: The Gathering card information
 """
+import asyncio
 import json
+import os
+import httpx
 import requests
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Optional, List, Union
+from typing import Dict, NamedTuple, Optional, List, Tuple, Union
 import hashlib
 import logging
+import re
+import threading
+import weakref
+
+from .background import BackgroundWorker
+from .card_archive import PackedCardStore, write_card_archive
+from .card_record import CardRecord
+from .card_store import CardStore, card_aliases, create_card_store, normalize_card_name
+from .fuzzy import FuzzyNameIndex
+from .image_manifest import ImageManifest
+from .image_store import LINK_MODES, ImageStore, image_key, image_key_card_id
+from .image_variants import ImageVariantPipeline
+from .memory_cache import MemoryCache
+from .rate_limit import TokenBucketRateLimiter
+from .resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, parse_retry_after
+from .singleflight import SingleFlight
+from .transport import TransportConfig
 
 # Configure basic logging for the package so INFO messages are visible by default
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("mtg_agent.scryfall")
 
+# Maximum identifiers accepted by one POST to /cards/collection
+COLLECTION_BATCH_SIZE = 75
+# Bytes written per step when streaming an image to disk
+IMAGE_CHUNK_SIZE = 64 * 1024
+# Seconds a stale card that failed to revalidate is served before trying again
+REVALIDATION_BACKOFF = 15 * 60
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-\d+/(\d+|\*)")
+
+# Outcomes of an image download
+IMAGE_DOWNLOADED = "downloaded"
+IMAGE_CACHED = "cached"
+IMAGE_FAILED = "failed"
+IMAGE_UNAVAILABLE = "unavailable"
+
+
+class CardBatchResult(NamedTuple):
+    """Result of a bulk lookup: requested name -> card, the names Scryfall doesn't know and
+    the names that could not be looked up (offline mode, or Scryfall unreachable)"""
+    found: Dict[str, CardRecord]
+    not_found: List[str]
+    unavailable: List[str]
+
+
+class CardMatch(NamedTuple):
+    """Result of match_card: the card and the name it was resolved by (if any), plus
+    ranked suggestions for near misses"""
+    card: Optional[CardRecord]
+    name: Optional[str]
+    suggestions: List[str]
+
+
+class ImageOutcome(NamedTuple):
+    """What happened to one image request"""
+    card_name: str
+    status: str
+    path: Optional[Path]
+    error: Optional[str]
+    seconds: float
+
+
+class OfflineError(Exception):
+    """Raised if a network request is attempted in offline mode"""
+
 
 class ScryfallCache:
     """Manages Scryfall card cache"""
     
-    def __init__(self, cache_dir: str = "scryfall_cache"):
+    def __init__(self, cache_dir: str = "scryfall_cache", store: Optional[CardStore] = None,
+                 memory_max_entries: int = 4096, memory_max_bytes: int = 32 * 1024 * 1024,
+                 negative_ttl: Optional[float] = None, keep_raw: Optional[bool] = None,
+                 ttl: Optional[float] = None, archive_path: Optional[str] = None,
+                 rate_limiter: Optional[TokenBucketRateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 api_url: Optional[str] = None, offline: Optional[bool] = None,
+                 transport: Optional[TransportConfig] = None):
         self.cache_dir = Path(__file__).parent.parent / cache_dir
         self.cache_dir.mkdir(exist_ok=True)
-        self.session = requests.Session()
-        # Scryfall recommends waiting at least 50-100ms between requests
-        self.request_delay = 0.1
-        self.last_request_time = 0
-    
-    def _get_cache_filename(self, card_name: str) -> Path:
-        """Generate a safe filename for cache"""
-        # Create hash of name to avoid issues with special characters
-        name_hash = hashlib.md5(card_name.lower().encode()).hexdigest()
-        safe_name = "".join(c for c in card_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        return self.cache_dir / f"{safe_name}_{name_hash}.json"
+        # Storage backend for card data (SQLite by default, legacy JSON files on request)
+        if store is None:
+            if keep_raw is None:
+                keep_raw = os.getenv("MTG_AGENT_KEEP_RAW_CARDS", "0") == "1"
+            store = create_card_store(self.cache_dir, os.getenv("MTG_AGENT_CARD_STORE", "sqlite"), keep_raw)
+        self.store = store
+        # In-process tier so repeated lookups of a card never touch the store again
+        self.memory = MemoryCache(memory_max_entries, memory_max_bytes)
+        # Trigram index over known names for near-miss spellings, built on first use
+        self._name_index: Optional[FuzzyNameIndex] = None
+        self._name_index_lock = threading.Lock()
+        # Optional read-only snapshot consulted before the store (see load_archive)
+        self.archive: Optional[PackedCardStore] = None
+        archive_path = archive_path or os.getenv("MTG_AGENT_CARD_ARCHIVE")
+        if archive_path:
+            self.load_archive(archive_path)
+        # Seconds a "not found in Scryfall" answer is trusted before asking again
+        if negative_ttl is None:
+            negative_ttl = float(os.getenv("MTG_AGENT_NEGATIVE_TTL", 24 * 60 * 60))
+        self.negative_ttl = negative_ttl
+        # Seconds before cached card data is revalidated (0 disables expiry)
+        if ttl is None:
+            ttl = float(os.getenv("MTG_AGENT_CARD_TTL", 30 * 24 * 60 * 60))
+        self.ttl = ttl
+        # Stale entries are served immediately and refreshed here
+        self.revalidator = BackgroundWorker("scryfall-revalidate")
+        # normalized name -> time before which a failed revalidation is not retried
+        self._revalidation_retry_at: Dict[str, float] = {}
+        self._revalidation_lock = threading.Lock()
+        # Cards added to a deck are resolved here ahead of the next lookup
+        self.prefetcher = BackgroundWorker(
+            "scryfall-prefetch", max_pending=int(os.getenv("MTG_AGENT_PREFETCH_QUEUE", 256))
+        )
+        self.prefetch_images = os.getenv("MTG_AGENT_PREFETCH_IMAGES", "0") == "1"
+        # Offline mode: answer from the local tiers only and never open a socket
+        if offline is None:
+            offline = os.getenv("MTG_AGENT_OFFLINE", "0") == "1"
+        self.offline = offline
+        # Base URL (a local stand-in such as scryfall_stub for benchmarks and tests), pools,
+        # timeouts and headers; one session serves both card lookups and image downloads
+        if transport is None:
+            transport = TransportConfig.from_env(base_url=api_url)
+        elif api_url:
+            transport.base_url = api_url.rstrip("/")
+        self.transport = transport
+        self.api_url = transport.base_url
+        self.session = transport.build_session()
+        # Async clients for the a* methods, created lazily, one per event loop
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._async_clients_lock = threading.Lock()
+        # Scryfall recommends waiting at least 50-100ms between requests (10 req/s).
+        # The bucket state lives in the cache directory so every process on the host shares it.
+        if rate_limiter is None:
+            rate_limiter = TokenBucketRateLimiter(
+                rate=float(os.getenv("MTG_AGENT_SCRYFALL_RATE", 10)),
+                burst=int(os.getenv("MTG_AGENT_SCRYFALL_BURST", 1)),
+                state_file=self.cache_dir / ".rate_limit",
+            )
+        self.rate_limiter = rate_limiter
+        # Downloaded images, stored once by card id and variant and linked where requested
+        link_mode = os.getenv("MTG_AGENT_IMAGE_LINK_MODE", "hardlink")
+        if link_mode not in LINK_MODES:
+            logger.warning(f"⚠️ MTG_AGENT_IMAGE_LINK_MODE={link_mode!r} no es válido "
+                           f"({', '.join(LINK_MODES)}), usando hardlink")
+            link_mode = "hardlink"
+        self.image_store = ImageStore(self.cache_dir / "images", link_mode=link_mode)
+        # Index of stored images, so presence checks and reports don't stat every file
+        # (images stored before it existed are indexed by backfill_image_manifest, or as they are asked for)
+        self.image_manifest = ImageManifest(self.cache_dir / "images.db")
+        # Resized copies (MTG_AGENT_IMAGE_SIZES) rendered once next to each stored image
+        self.image_variants = ImageVariantPipeline(self.image_store)
+        # Images come from Scryfall's CDN, which has no documented limit; a separate, more
+        # generous bucket keeps concurrent downloads polite without consuming API tokens
+        self.image_rate_limiter = TokenBucketRateLimiter(
+            rate=float(os.getenv("MTG_AGENT_IMAGE_RATE", 20)),
+            burst=int(os.getenv("MTG_AGENT_IMAGE_BURST", 4)),
+            state_file=self.cache_dir / ".image_rate_limit",
+        )
+        # Transient failures are retried; sustained ones open the breaker and lookups
+        # are answered from the cache alone until the cool-down expires
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            failure_threshold=int(os.getenv("MTG_AGENT_BREAKER_THRESHOLD", 5)),
+            cooldown=float(os.getenv("MTG_AGENT_BREAKER_COOLDOWN", 30)),
+        )
+        self.retries = 0
+        # Guards the counters above, updated from request threads and background workers
+        self._stats_lock = threading.Lock()
+        # Concurrent misses for the same card (or image file) share one fetch
+        self.flights = SingleFlight()
     
     def _wait_for_rate_limit(self):
         """Respect Scryfall rate limit"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.request_delay:
-            time.sleep(self.request_delay - time_since_last)
-        self.last_request_time = time.time()
+        self.rate_limiter.acquire()
+
+    async def _await_rate_limit(self):
+        """Respect Scryfall rate limit without blocking the event loop"""
+        await self.rate_limiter.aacquire()
+
+    def _retry_delay(self, attempt: int, response=None) -> Optional[float]:
+        """Delay before the next attempt, or None if the request should not be retried"""
+        if response is not None:
+            if not self.retry_policy.should_retry_status(response.status_code):
+                return None
+            delay = self.retry_policy.delay(attempt, parse_retry_after(response.headers.get('Retry-After')))
+        else:
+            delay = self.retry_policy.delay(attempt)
+        if delay is not None:
+            with self._stats_lock:
+                self.retries += 1
+        return delay
+
+    def _retry_count(self) -> int:
+        with self._stats_lock:
+            return self.retries
+
+    def _request(self, method: str, path: str, **kwargs):
+        """Rate-limited Scryfall API request with timeouts, retries and the circuit breaker
+
+        Returns the final response (which may still be an error status) and raises
+        CircuitOpenError without touching the network while the breaker is open.
+        """
+        self._check_online(path)
+        trial = self.circuit_breaker.check()
+        try:
+            return self._request_with_retries(method, path, **kwargs)
+        finally:
+            if trial:
+                self.circuit_breaker.release_trial()
+
+    def _request_with_retries(self, method: str, path: str, **kwargs):
+        attempt = 1
+        while True:
+            self._wait_for_rate_limit()
+            try:
+                response = self.session.request(method, f"{self.api_url}{path}",
+                                                timeout=self.transport.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                delay = self._retry_delay(attempt)
+                if delay is None:
+                    self.circuit_breaker.record_failure()
+                    raise
+                logger.warning(f"⚠️ {method} {path} failed ({e}), retrying in {delay:.1f}s")
+            except Exception:
+                self.circuit_breaker.record_failure()
+                raise
+            else:
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    self._record_outcome(response)
+                    return response
+                logger.warning(f"⚠️ {method} {path} returned {response.status_code}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    async def _arequest(self, method: str, path: str, **kwargs):
+        """Async counterpart of _request"""
+        self._check_online(path)
+        trial = self.circuit_breaker.check()
+        try:
+            return await self._arequest_with_retries(method, path, **kwargs)
+        finally:
+            # A cancelled trial (wait_for, gather) records no outcome
+            if trial:
+                self.circuit_breaker.release_trial()
+
+    async def _arequest_with_retries(self, method: str, path: str, **kwargs):
+        attempt = 1
+        while True:
+            await self._await_rate_limit()
+            try:
+                response = await self._get_async_client().request(method, f"{self.api_url}{path}", **kwargs)
+            except httpx.TransportError as e:
+                delay = self._retry_delay(attempt)
+                if delay is None:
+                    self.circuit_breaker.record_failure()
+                    raise
+                logger.warning(f"⚠️ {method} {path} failed ({e}), retrying in {delay:.1f}s")
+            except Exception:
+                self.circuit_breaker.record_failure()
+                raise
+            else:
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    self._record_outcome(response)
+                    return response
+                logger.warning(f"⚠️ {method} {path} returned {response.status_code}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _check_online(self, target: str):
+        """Refuse network access in offline mode"""
+        if self.offline:
+            raise OfflineError(f"Offline mode: not requesting {target}")
+
+    def _record_outcome(self, response):
+        """Feed the final status of a request to the circuit breaker"""
+        if self.retry_policy.should_retry_status(response.status_code):
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Return the async HTTP client of the running event loop
+
+        Connections can't move between loops, so each loop gets its own client. A
+        client is dropped with its loop; call aclose() before the loop ends to close
+        its connections cleanly.
+        """
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                # Loops that were closed without aclose() can't use their clients any more
+                for closed_loop in [other for other in self._async_clients if other.is_closed()]:
+                    del self._async_clients[closed_loop]
+                client = self._async_clients[loop] = self.transport.build_async_client()
+            return client
+
+    def close(self):
+        """Release the image worker processes, HTTP session and open databases"""
+        self.image_variants.close()
+        self.session.close()
+        self.image_manifest.close()
+        self.store.close()
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+    async def aclose(self):
+        """Close the async HTTP client of the running event loop"""
+        with self._async_clients_lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
     
-    def get_card_info(self, card_name: str) -> Optional[Dict]:
+    @staticmethod
+    def _memory_keys(card_name: str, card_data: Optional[CardRecord]) -> set:
+        """Normalized names a card is kept under in the memory tier"""
+        names = [card_name]
+        if card_data is not None:
+            names += [card_data.name] + card_aliases(card_data)
+        return {normalize_card_name(name) for name in names if name}
+
+    def _remember(self, card_name: str, card_data: CardRecord):
+        """Keep a card in the memory tier under the requested, canonical and face names"""
+        size = len(card_data.to_json())
+        for key in self._memory_keys(card_name, card_data):
+            self.memory.put(key, card_data, size)
+
+    def _forget(self, card_name: str):
+        """Drop a card from the memory tier under every name it was kept under"""
+        cached = self.memory.get(normalize_card_name(card_name))
+        for key in self._memory_keys(card_name, cached):
+            self.memory.invalidate(key)
+
+    def get_card_info(self, card_name: str) -> Optional[CardRecord]:
         """Get card information, using cache if available"""
-        cache_file = self._get_cache_filename(card_name)
-        
+        data = self._lookup_local(card_name)
+        if data is not None:
+            return data
+
+        # Names Scryfall recently answered 404 for are not requested again
+        if self._is_known_missing(card_name):
+            return None
+
+        if self.offline:
+            logger.info(f"📴 Offline: {card_name} is not in the local cache")
+            return None
+
+        # If not in cache, make request to Scryfall (once, however many callers are waiting)
+        return self.flights.do(("card", normalize_card_name(card_name)), lambda: self._fetch_card(card_name))
+
+    async def aget_card_info(self, card_name: str) -> Optional[CardRecord]:
+        """Async get_card_info: same local tiers, network through the async client"""
+        data = self._lookup_local(card_name)
+        if data is not None:
+            return data
+        if self._is_known_missing(card_name):
+            return None
+        if self.offline:
+            logger.info(f"📴 Offline: {card_name} is not in the local cache")
+            return None
+        return await self.flights.ado(("card", normalize_card_name(card_name)), lambda: self._afetch_card(card_name))
+
+    def _fetch_card(self, card_name: str) -> Optional[CardRecord]:
+        """Fetch a card unless a call that just finished already cached it"""
+        data = self._lookup_local(card_name)
+        return data if data is not None else self._fetch_from_scryfall(card_name)
+
+    async def _afetch_card(self, card_name: str) -> Optional[CardRecord]:
+        """Async counterpart of _fetch_card"""
+        data = self._lookup_local(card_name)
+        return data if data is not None else await self._afetch_from_scryfall(card_name)
+
+    def _lookup_local(self, card_name: str) -> Optional[CardRecord]:
+        """Look a card up in memory, the archive and the store (never the network)"""
+        data = self.memory.get(normalize_card_name(card_name))
+        if data is not None:
+            self._revalidate_if_stale(card_name, data)
+            return data
+
+        # The packed archive is an immutable snapshot: its records are decoded straight
+        # from the shared mapping and never revalidated (re-export it to update)
+        if self.archive is not None:
+            data = self.archive.get(card_name)
+            if data is not None:
+                return data
+
         # Try to load from cache
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                logger.info(f"📥 Cargado desde caché: {card_name} -> {cache_file}")
+        try:
+            data = self.store.get(card_name)
+            if data is not None:
+                logger.info(f"📥 Cargado desde caché: {card_name}")
+                self._remember(card_name, data)
+                self._revalidate_if_stale(card_name, data)
                 return data
+        except Exception as e:
+            logger.warning(f"⚠️ Error reading cache for {card_name}: {e}")
+        return None
+
+    def export_archive(self, path: str) -> int:
+        """Compact every stored card into a packed archive file, returning the card count"""
+        return write_card_archive(Path(path), self.store.iter_records())
+
+    def load_archive(self, path: str):
+        """Serve lookups from a packed archive (memory-mapped, shared between processes)"""
+        archive = PackedCardStore(Path(path))
+        if self.archive is not None:
+            self.archive.close()
+        self.archive = archive
+        # Drop copies parsed from the store so the snapshot takes effect
+        self.memory.clear()
+        with self._name_index_lock:
+            self._name_index = None
+        logger.info(f"📦 Card archive loaded: {path} ({archive.count()} cards)")
+
+    def _get_name_index(self) -> FuzzyNameIndex:
+        """Return the fuzzy name index, building it from the archive and store the first time"""
+        with self._name_index_lock:
+            if self._name_index is None:
+                index = FuzzyNameIndex()
+                for source in (self.archive, self.store):
+                    if source is None:
+                        continue
+                    try:
+                        for record, _ in source.iter_records():
+                            index.add(record.name)
+                            for alias in card_aliases(record):
+                                index.add(alias)
+                    except NotImplementedError:
+                        pass
+                logger.info(f"🔤 Fuzzy name index built: {len(index)} names")
+                self._name_index = index
+            return self._name_index
+
+    def suggest_card_names(self, card_name: str, limit: int = 5) -> List[str]:
+        """Return known card names close to card_name, best first (never the network)"""
+        return [name for name, _ in self._get_name_index().suggest(card_name, limit)]
+
+    def match_card(self, card_name: str, fetch: bool = True) -> CardMatch:
+        """Resolve a possibly misspelled name: local exact, local fuzzy, then Scryfall
+
+        A confident local match is returned without touching the network. Scryfall's
+        fuzzy search (which also answers exact names) is asked only when the local index
+        has no candidate or several close ones, so real cards that are not cached yet are
+        not mistaken for a cached neighbour. Weaker local candidates come back as
+        suggestions when Scryfall cannot settle it (offline, unavailable, or fetch=False).
+        """
+        data = self._lookup_local(card_name)
+        if data is not None:
+            return CardMatch(data, card_name, [])
+
+        match, suggestions = self._get_name_index().best_match(card_name)
+        if match:
+            data = self._lookup_local(match)
+            if data is not None:
+                logger.info(f"🔤 {card_name} resolved locally to {match}")
+                return CardMatch(data, match, suggestions)
+
+        if fetch and not self.offline and not self._is_known_missing(card_name):
+            data = self.flights.do(("fuzzy", normalize_card_name(card_name)),
+                                   lambda: self._fetch_fuzzy_from_scryfall(card_name))
+            if data is not None:
+                return CardMatch(data, data.name, [])
+        return CardMatch(None, None, suggestions)
+
+    def get_local_cards(self, card_names: List[str]) -> Dict[str, CardRecord]:
+        """Resolve several names from local tiers only (memory, archive, one store query)"""
+        found: Dict[str, CardRecord] = {}
+        pending = []
+        for card_name in dict.fromkeys(card_names):
+            data = self.memory.get(normalize_card_name(card_name))
+            if data is not None:
+                self._revalidate_if_stale(card_name, data)
+            elif self.archive is not None:
+                data = self.archive.get(card_name)
+            if data is not None:
+                found[card_name] = data
+            else:
+                pending.append(card_name)
+
+        if pending:
+            try:
+                stored = self.store.get_many(pending)
             except Exception as e:
-                logger.warning(f"⚠️ Error reading cache for {card_name}: {e}")
+                logger.warning(f"⚠️ Error reading cache for {len(pending)} cards: {e}")
+                stored = {}
+            for card_name, data in stored.items():
+                self._remember(card_name, data)
+                self._revalidate_if_stale(card_name, data)
+                found[card_name] = data
+        return found
+
+    def _is_stale(self, card_data: CardRecord) -> bool:
+        """Check whether a cached card is older than the TTL"""
+        if self.ttl <= 0 or card_data.fetched_at is None:
+            return False
+        return time.time() - card_data.fetched_at >= self.ttl
+
+    def _revalidate_if_stale(self, card_name: str, card_data: CardRecord):
+        """Schedule a background refetch for a stale card (the stale data is still served)"""
+        # While Scryfall is unreachable the stale copy is all there is; don't queue refetches
+        if not self._is_stale(card_data) or self.offline or self.circuit_breaker.state == "open":
+            return
+        with self._revalidation_lock:
+            retry_at = self._revalidation_retry_at.get(normalize_card_name(card_name), 0.0)
+        if time.time() < retry_at or self._is_known_missing(card_name):
+            return
+        self._schedule_revalidation(card_name)
+
+    def _schedule_revalidation(self, card_name: str) -> bool:
+        """Queue a background refetch of a card through the normal rate-limited path"""
+        key = normalize_card_name(card_name)
+        # A foreground fetch of the same card, if any, is joined rather than repeated
+        queued = self.revalidator.submit(key, lambda: self.flights.do(("card", key),
+                                                                      lambda: self._revalidate(card_name)))
+        if queued:
+            logger.info(f"🔄 Revalidación programada: {card_name}")
+        return queued
+
+    def _revalidate(self, card_name: str) -> Optional[CardRecord]:
+        """Refetch a stale card; on failure keep serving the stale copy and back off
+
+        A 404 is not recorded in the negative cache: the card is still being served.
+        """
+        key = normalize_card_name(card_name)
+        try:
+            response = self._request("GET", "/cards/named", params={"exact": card_name})
+        except Exception as e:
+            logger.warning(f"⚠️ Revalidation of {card_name} failed: {e}")
+            response = None
+        if response is not None and response.status_code == 200:
+            with self._revalidation_lock:
+                self._revalidation_retry_at.pop(key, None)
+            return self._handle_named_response(card_name, response)
+
+        if response is not None:
+            logger.warning(f"⚠️ Revalidation of {card_name} returned {response.status_code}, keeping the cached copy")
+        with self._revalidation_lock:
+            self._revalidation_retry_at[key] = time.time() + REVALIDATION_BACKOFF
+        return None
+
+    def prefetch_card(self, card_name: str, image: Optional[bool] = None) -> bool:
+        """Resolve a card (and its image) on the prefetch worker; True if it was queued
+
+        Cards already cached are skipped, as is everything in offline mode. When the queue
+        is full the request is dropped and counted; the card is then fetched on first use.
+        """
+        if image is None:
+            image = self.prefetch_images
+        if self.offline or (not image and self._lookup_local(card_name) is not None):
+            return False
+        if image:
+            task = lambda: self.download_card_image(card_name)
+        else:
+            task = lambda: self.get_card_info(card_name)
+        queued = self.prefetcher.submit((normalize_card_name(card_name), image), task)
+        if queued:
+            logger.info(f"📥 Precarga programada: {card_name}{' (con imagen)' if image else ''}")
+        return queued
+
+    def refresh_card(self, card_name: str, wait: bool = False) -> Optional[CardRecord]:
+        """Mark a card stale and revalidate it
+
+        By default the refetch happens in the background and None is returned right
+        away; with wait=True the call blocks and returns the refreshed card.
+        In offline mode nothing is invalidated and None is returned.
+        """
+        if self.offline:
+            logger.warning(f"📴 Offline: not refreshing {card_name}")
+            return None
+        self._forget(card_name)
+        self.store.clear_misses([card_name])
+        with self._revalidation_lock:
+            self._revalidation_retry_at.pop(normalize_card_name(card_name), None)
+        if wait:
+            return self.flights.do(("card", normalize_card_name(card_name)),
+                                   lambda: self._fetch_from_scryfall(card_name))
+        self.store.mark_stale(card_name)
+        self._schedule_revalidation(card_name)
+        return None
+
+    def _is_known_missing(self, card_name: str) -> bool:
+        """Check the negative cache for a fresh "not found" entry"""
+        try:
+            miss = self.store.get_miss(card_name)
+        except Exception as e:
+            logger.warning(f"⚠️ Error reading negative cache for {card_name}: {e}")
+            return False
+        if miss and time.time() - miss['last_checked'] < self.negative_ttl:
+            logger.info(f"🚫 Carta sin resultados en caché negativa: {card_name} ({miss['count']} intentos)")
+            return True
+        return False
 
-        # If not in cache, make request to Scryfall
-        return self._fetch_from_scryfall(card_name, cache_file)
+    def list_missing_cards(self) -> List[Dict]:
+        """Return the names Scryfall could not resolve, with their attempt counts"""
+        return self.store.list_misses()
+
+    def clear_missing_cards(self, card_names: Optional[List[str]] = None) -> int:
+        """Forget unresolved names so they are requested again (all of them by default)"""
+        return self.store.clear_misses(card_names)
+
+    def invalidate(self, card_name: str) -> bool:
+        """Drop a card from the cache, returning True if it was cached"""
+        self._forget(card_name)
+        self.store.clear_misses([card_name])
+        with self._revalidation_lock:
+            self._revalidation_retry_at.pop(normalize_card_name(card_name), None)
+        return self.store.delete(card_name)
+
+    def cache_stats(self) -> Dict:
+        """Return memory-tier counters and the number of stored cards"""
+        return {
+            'memory': self.memory.stats(),
+            'stored_cards': self.store.count(),
+            'archived_cards': self.archive.count() if self.archive is not None else 0,
+            'missing_cards': self.store.count_misses(),
+            'revalidation': self.revalidator.stats(),
+            'prefetch': self.prefetcher.stats(),
+            'rate_limit': self.rate_limiter.stats(),
+            'image_rate_limit': self.image_rate_limiter.stats(),
+            'image_store': {**self.image_manifest.stats(), **self.image_store.stats()},
+            'image_variants': self.image_variants.stats(),
+            'retries': self._retry_count(),
+            'circuit_breaker': self.circuit_breaker.stats(),
+            'single_flight': self.flights.stats(),
+            'transport': self.transport.describe(),
+        }
     
-    def _fetch_from_scryfall(self, card_name: str, cache_file: Path) -> Optional[Dict]:
+    def get_raw_card_info(self, card_name: str) -> Optional[Dict]:
+        """Return the full Scryfall payload from cold storage (requires keep_raw)"""
+        card_data = self.get_card_info(card_name)
+        return self.store.get_raw(card_data.id) if card_data else None
+
+    def _fetch_from_scryfall(self, card_name: str) -> Optional[CardRecord]:
         """Make request to Scryfall and save to cache"""
         try:
-            self._wait_for_rate_limit()
-            
             # Use Scryfall exact search API
-            url = "https://api.scryfall.com/cards/named"
-            params = {"exact": card_name}
-            
-            response = self.session.get(url, params=params)
-            
-            if response.status_code == 200:
-                card_data = response.json()
-                
-                # Save to cache
-                try:
-                    with open(cache_file, 'w', encoding='utf-8') as f:
-                        json.dump(card_data, f, indent=2, ensure_ascii=False)
-                    logger.info(f"💾 Guardado en caché: {cache_file}")
-                except Exception as e:
-                    logger.warning(f"⚠️ Error guardando caché para {card_name}: {e}")
+            response = self._request("GET", "/cards/named", params={"exact": card_name})
+            return self._handle_named_response(card_name, response)
+
+        except CircuitOpenError:
+            logger.warning(f"⚠️ Scryfall unavailable, answering from cache only: {card_name}")
+            return None
+        except Exception as e:
+            logger.error(f"❌ Connection error getting {card_name}: {e}")
+            return None
+
+    async def _afetch_from_scryfall(self, card_name: str) -> Optional[CardRecord]:
+        """Async counterpart of _fetch_from_scryfall"""
+        try:
+            response = await self._arequest("GET", "/cards/named", params={"exact": card_name})
+            return self._handle_named_response(card_name, response)
+        except CircuitOpenError:
+            logger.warning(f"⚠️ Scryfall unavailable, answering from cache only: {card_name}")
+            return None
+        except Exception as e:
+            logger.error(f"❌ Connection error getting {card_name}: {e}")
+            return None
 
-                logger.info(f"✅ Retrieved information from Scryfall: {card_name} (cached: {cache_file})")
+    def _fetch_fuzzy_from_scryfall(self, card_name: str) -> Optional[CardRecord]:
+        """Ask Scryfall's fuzzy name search; the card is cached under its real name"""
+        try:
+            response = self._request("GET", "/cards/named", params={"fuzzy": card_name})
+            if response.status_code == 200:
+                payload = response.json()
+                card_data = self._store_fetched([(payload.get('name', card_name), payload)])[0]
+                logger.info(f"🔤 {card_name} resolved by Scryfall to {card_data.name}")
                 return card_data
-            
-            elif response.status_code == 404:
-                logger.warning(f"⚠️ Card not found in Scryfall: {card_name}")
-                return None
-            
+            if response.status_code == 404:
+                # Nothing even close: don't ask again until the negative cache expires
+                self._record_not_found(card_name)
             else:
-                logger.error(f"❌ Error {response.status_code} getting {card_name}: {response.text}")
-                return None
-                
+                logger.error(f"❌ Error {response.status_code} matching {card_name}: {response.text}")
+            return None
+        except CircuitOpenError:
+            logger.warning(f"⚠️ Scryfall unavailable, matching from cache only: {card_name}")
+            return None
         except Exception as e:
-            logger.error(f"❌ Connection error getting {card_name}: {e}")
+            logger.error(f"❌ Connection error matching {card_name}: {e}")
+            return None
+
+    def _handle_named_response(self, card_name: str, response) -> Optional[CardRecord]:
+        """Turn a /cards/named response (requests or httpx) into a cached card"""
+        if response.status_code == 200:
+            card_data = self._store_fetched([(card_name, response.json())])[0]
+            logger.info(f"✅ Retrieved information from Scryfall: {card_name}")
+            return card_data
+        
+        elif response.status_code == 404:
+            logger.warning(f"⚠️ Card not found in Scryfall: {card_name}")
+            self._record_not_found(card_name)
             return None
+        
+        else:
+            logger.error(f"❌ Error {response.status_code} getting {card_name}: {response.text}")
+            return None
+
+    def _store_fetched(self, items: List) -> List[CardRecord]:
+        """Save fetched (requested name, payload) pairs to the store and memory tier"""
+        now = time.time()
+        records = []
+        for card_name, payload in items:
+            card_data = CardRecord.from_dict(payload)
+            card_data.fetched_at = now
+            self._remember(card_name, card_data)
+            records.append(card_data)
+            if self._name_index is not None:
+                self._name_index.add(card_data.name)
+                for alias in card_aliases(card_data):
+                    self._name_index.add(alias)
+
+        # Save to cache (the store keeps the raw payload only if configured to)
+        try:
+            self.store.put_many(items)
+            self.store.clear_misses([card_name for card_name, _ in items])
+            logger.info(f"💾 Guardado en caché: {', '.join(card_name for card_name, _ in items)}")
+        except Exception as e:
+            logger.warning(f"⚠️ Error guardando caché para {len(items)} cartas: {e}")
+        return records
+
+    def _record_not_found(self, card_name: str):
+        """Remember that Scryfall does not know a name (negative cache)"""
+        try:
+            self.store.record_miss(card_name)
+        except Exception as e:
+            logger.warning(f"⚠️ Error saving negative cache for {card_name}: {e}")
+
+    def _split_cached_and_missing(self, card_names: List[str]):
+        """Return (local hits, names known to be missing, names to fetch) for a bulk lookup"""
+        unique_names = list(dict.fromkeys(card_names))
+        found = self.get_local_cards(unique_names)
+        not_found = []
+        missing = []
+        for card_name in unique_names:
+            if card_name in found:
+                continue
+            if self._is_known_missing(card_name):
+                not_found.append(card_name)
+            else:
+                missing.append(card_name)
+        return found, not_found, missing
     
+    def get_cards_info(self, card_names: List[str]) -> CardBatchResult:
+        """Get several cards at once: cache hits locally, misses in /cards/collection batches"""
+        found, not_found, missing = self._split_cached_and_missing(card_names)
+        if self.offline:
+            return CardBatchResult(found, not_found, missing)
+
+        names_by_key = self._card_flight_keys(missing)
+        not_found_names = set()
+
+        def fetch(keys):
+            # Names already being fetched elsewhere are joined, the rest go out in batches
+            names = [names_by_key[key][0] for key in keys]
+            records = {}
+            for start in range(0, len(names), COLLECTION_BATCH_SIZE):
+                batch_found, batch_not_found, _ = self._fetch_collection(names[start:start + COLLECTION_BATCH_SIZE])
+                records.update(batch_found)
+                not_found_names.update(batch_not_found)
+            return {key: records.get(names_by_key[key][0]) for key in keys}
+
+        results = self.flights.do_many(names_by_key, fetch)
+        return self._batch_result(found, not_found, names_by_key, results, not_found_names)
+
+    async def aget_cards_info(self, card_names: List[str]) -> CardBatchResult:
+        """Async get_cards_info; collection batches run concurrently within the rate limit"""
+        found, not_found, missing = self._split_cached_and_missing(card_names)
+        if self.offline:
+            return CardBatchResult(found, not_found, missing)
+
+        names_by_key = self._card_flight_keys(missing)
+        not_found_names = set()
+
+        async def fetch(keys):
+            names = [names_by_key[key][0] for key in keys]
+            records = {}
+            batches = [names[start:start + COLLECTION_BATCH_SIZE]
+                       for start in range(0, len(names), COLLECTION_BATCH_SIZE)]
+            for batch_found, batch_not_found, _ in await asyncio.gather(
+                *(self._afetch_collection(batch) for batch in batches)
+            ):
+                records.update(batch_found)
+                not_found_names.update(batch_not_found)
+            return {key: records.get(names_by_key[key][0]) for key in keys}
+
+        results = await self.flights.ado_many(names_by_key, fetch)
+        return self._batch_result(found, not_found, names_by_key, results, not_found_names)
+
+    @staticmethod
+    def _card_flight_keys(card_names: List[str]) -> Dict[Tuple[str, str], List[str]]:
+        """Group names by the single-flight key get_card_info uses for them"""
+        names_by_key: Dict[Tuple[str, str], List[str]] = {}
+        for card_name in card_names:
+            names_by_key.setdefault(("card", normalize_card_name(card_name)), []).append(card_name)
+        return names_by_key
+
+    def _batch_result(self, found: Dict[str, CardRecord], not_found: List[str],
+                      names_by_key: Dict[Tuple[str, str], List[str]], results: Dict, not_found_names: set):
+        """Sort fetched (or joined) names into found, not found and unavailable
+
+        A name that came back empty is "not found" when Scryfall said so (to this call or
+        to the one it joined, which leaves a negative-cache entry), otherwise unavailable.
+        """
+        unavailable = []
+        for key, names in names_by_key.items():
+            card_data = results.get(key)
+            for card_name in names:
+                if card_data is not None:
+                    found[card_name] = card_data
+                elif names[0] in not_found_names or self._is_known_missing(card_name):
+                    not_found.append(card_name)
+                else:
+                    unavailable.append(card_name)
+        return CardBatchResult(found, not_found, unavailable)
+
+    @staticmethod
+    def _collection_request(card_names: List[str]) -> Dict:
+        return {"identifiers": [{"name": card_name} for card_name in card_names]}
+
+    def _fetch_collection(self, card_names: List[str]):
+        """Resolve up to 75 names with one /cards/collection request
+
+        Returns (found, not_found, unavailable). A failed request (breaker open, retries
+        exhausted, connection error) leaves the whole batch unavailable: retrying it card
+        by card would only add load while Scryfall is struggling.
+        """
+        try:
+            response = self._request("POST", "/cards/collection", json=self._collection_request(card_names))
+            if response.status_code != 200:
+                raise RuntimeError(f"status {response.status_code}: {response.text[:200]}")
+            found, not_found, unresolved = self._handle_collection_body(card_names, response.json())
+        except CircuitOpenError:
+            logger.warning(f"⚠️ Scryfall unavailable, {len(card_names)} cards not resolved")
+            return {}, [], list(card_names)
+        except Exception as e:
+            logger.error(f"❌ Error in collection request for {len(card_names)} cards: {e}")
+            return {}, [], list(card_names)
+
+        # Names neither returned nor reported missing are asked for on their own
+        # (a 404 there lands in the negative cache, anything else leaves them unavailable)
+        unavailable = []
+        for card_name in unresolved:
+            card_data = self._fetch_from_scryfall(card_name)
+            if card_data is not None:
+                found[card_name] = card_data
+            elif self._is_known_missing(card_name):
+                not_found.append(card_name)
+            else:
+                unavailable.append(card_name)
+        return found, not_found, unavailable
+
+    async def _afetch_collection(self, card_names: List[str]):
+        """Async counterpart of _fetch_collection"""
+        try:
+            response = await self._arequest("POST", "/cards/collection", json=self._collection_request(card_names))
+            if response.status_code != 200:
+                raise RuntimeError(f"status {response.status_code}: {response.text[:200]}")
+            found, not_found, unresolved = self._handle_collection_body(card_names, response.json())
+        except CircuitOpenError:
+            logger.warning(f"⚠️ Scryfall unavailable, {len(card_names)} cards not resolved")
+            return {}, [], list(card_names)
+        except Exception as e:
+            logger.error(f"❌ Error in collection request for {len(card_names)} cards: {e}")
+            return {}, [], list(card_names)
+
+        unavailable = []
+        results = await asyncio.gather(*(self._afetch_from_scryfall(card_name) for card_name in unresolved))
+        for card_name, card_data in zip(unresolved, results):
+            if card_data is not None:
+                found[card_name] = card_data
+            elif self._is_known_missing(card_name):
+                not_found.append(card_name)
+            else:
+                unavailable.append(card_name)
+        return found, not_found, unavailable
+
+    def _handle_collection_body(self, card_names: List[str], body: Dict):
+        """Map a /cards/collection response back to the requested names
+
+        Returns (found, not_found, unresolved); unresolved names were neither returned
+        nor reported missing and need a request of their own.
+        """
+        # Scryfall answers in its own spelling; map cards back to the requested names
+        requested: Dict[str, List[str]] = {}
+        for card_name in card_names:
+            requested.setdefault(normalize_card_name(card_name), []).append(card_name)
+
+        fetched = []
+        for payload in body.get('data', []):
+            card_data = CardRecord.from_dict(payload)
+            for key in self._memory_keys(card_data.name, card_data):
+                for card_name in requested.pop(key, []):
+                    fetched.append((card_name, payload))
+        found = dict(zip((card_name for card_name, _ in fetched), self._store_fetched(fetched))) if fetched else {}
+
+        not_found = []
+        unresolved = []
+        reported_missing = {normalize_card_name(identifier.get('name', ''))
+                            for identifier in body.get('not_found', [])}
+        for key, names in requested.items():
+            for card_name in names:
+                if key in reported_missing:
+                    logger.warning(f"⚠️ Card not found in Scryfall: {card_name}")
+                    self._record_not_found(card_name)
+                    not_found.append(card_name)
+                else:
+                    unresolved.append(card_name)
+
+        logger.info(f"✅ Retrieved {len(found)} cards from Scryfall in one collection request")
+        return found, not_found, unresolved
+
     def get_mana_cost(self, card_name: str) -> Optional[str]:
         """Get the mana cost of a card"""
         card_info = self.get_card_info(card_name)
@@ -122,67 +956,356 @@ class ScryfallCache:
         and attempt to download the first available image. It will not overwrite existing files.
         Returns the Path to the saved image or None on failure.
         """
+        return self.fetch_card_image(card_name, dest_dir).path
+
+    def fetch_card_image(self, card_name: str, dest_dir: str | None = None) -> "ImageOutcome":
+        """download_card_image, reporting what happened (downloaded, cached, failed, unavailable)"""
+        started_at = time.perf_counter()
         card_info = self.get_card_info(card_name)
+        target = self._image_target(card_name, card_info, dest_dir)
+        if target is None:
+            status = IMAGE_UNAVAILABLE if self.offline and card_info is None else IMAGE_FAILED
+            return ImageOutcome(card_name, status, None, "no card data or image URI",
+                                time.perf_counter() - started_at)
+        image_uri, key, view_path = target
+        # Each image is downloaded once per node, whatever names and directories ask for it
+        status, error = self.flights.do(("image", key), lambda: self._download_image(card_name, image_uri, key))
+        status, error = self._link_image_view(key, view_path, status, error)
+        return ImageOutcome(card_name, status, view_path if error is None else None, error,
+                            time.perf_counter() - started_at)
+
+    def get_card_image(self, card_name: str, size: str = "original") -> Optional[Path]:
+        """Return the stored image of a card at `size`, downloading or rendering it only once
+
+        `size` is "original" (the image as downloaded) or one of the sizes configured in
+        MTG_AGENT_IMAGE_SIZES. Returns None if the image can't be obtained.
+        """
+        if size != "original" and size not in self.image_variants.sizes:
+            raise ValueError(f"Unknown image size {size!r} (configured: {', '.join(self.image_variants.sizes)})")
+        key = self._stored_image_key(card_name)
+        if key is None:
+            return None
+        if size == "original":
+            path = self.image_store.path_for(key)
+            return path if path.is_file() else None
+        variant = self.image_variants.variant_path(key, size)
+        if variant.exists():
+            return variant
+        return self.image_variants.render([key], [size]).get((key, size))
+
+    def render_image_variants(self, card_names: List[str], sizes: Optional[List[str]] = None) -> Dict[str, Dict[str, Path]]:
+        """Render the configured sizes for many cards in one pass over the process pool
+
+        Returns {card name: {size: path}} for the cards whose image could be obtained.
+        """
+        keys = {}
+        for card_name in dict.fromkeys(card_names):
+            key = self._stored_image_key(card_name)
+            if key is not None:
+                keys[card_name] = key
+        rendered = self.image_variants.render(keys.values(), sizes)
+        return {
+            card_name: {size: path for (variant_key, size), path in rendered.items() if variant_key == key}
+            for card_name, key in keys.items()
+        }
+
+    def _stored_image_key(self, card_name: str) -> Optional[str]:
+        """Make sure a card's image is in the image store and return its key"""
+        target = self._image_target(card_name, self.get_card_info(card_name), None)
+        if target is None:
+            return None
+        image_uri, key, _ = target
+        stored = self._image_stored(key, image_uri)
+        if stored and not self.image_store.has(key):
+            # Deleted behind the manifest's back: forget it and download it again
+            self.image_manifest.remove([key])
+            stored = False
+        if not stored:
+            _, error = self.flights.do(("image", key), lambda: self._download_image(card_name, image_uri, key))
+            if error is not None:
+                return None
+        return key
+
+    def _link_image_view(self, key: str, view_path: Path, status: str, error: Optional[str]):
+        """Expose a stored image in the requested directory"""
+        if error is not None:
+            return status, error
+        try:
+            self.image_store.link(key, view_path)
+        except FileNotFoundError as e:
+            # Deleted behind the manifest's back: forget it so the next call downloads it again
+            self.image_manifest.remove([key])
+            logger.error(f"❌ Imagen {key} ausente del almacén: {e}")
+            return IMAGE_FAILED, str(e)
+        except OSError as e:
+            logger.error(f"❌ No se pudo enlazar la imagen {key} en {view_path}: {e}")
+            return IMAGE_FAILED, str(e)
+        return status, None
+
+    def _download_image(self, card_name: str, image_uri: str, key: str) -> Tuple[str, Optional[str]]:
+        """Download an image into the image store unless it is already there; returns (status, error)"""
+        filename = self.image_store.path_for(key)
+        if self._image_stored(key, image_uri):
+            logger.info(f"🖼️ Imagen ya en caché: {filename}")
+            return IMAGE_CACHED, None
+        if self.offline:
+            logger.info(f"📴 Offline: image of {card_name} is not cached")
+            return IMAGE_UNAVAILABLE, "offline mode"
+
+        try:
+            with self.image_store.partial_lock(key):
+                # Another process may have finished it while we waited for the lock
+                if self._image_stored(key, image_uri):
+                    logger.info(f"🖼️ Imagen ya en caché: {filename}")
+                    return IMAGE_CACHED, None
+                partial = self.image_store.partial_path(key)
+                offset, headers = self._image_request_headers(partial, image_uri, self.image_store.partial_validator(key))
+                self.image_rate_limiter.acquire()
+                logger.info(f"⬇️ Descargando imagen: {card_name} -> {filename}" + (f" (desde {offset} B)" if offset else ""))
+                with self.session.get(image_uri, stream=True, headers=headers,
+                                      timeout=self.transport.image_timeout) as resp:
+                    mode, expected_size = self._check_image_response(resp.status_code, resp.headers, offset, partial)
+                    with open(partial, mode) as f:
+                        if mode == 'wb':
+                            self.image_store.save_partial_validator(key, self._image_validator(image_uri, resp.headers))
+                        for chunk in resp.iter_content(IMAGE_CHUNK_SIZE):
+                            f.write(chunk)
+                self.image_store.commit(key, expected_size)
+                self.image_manifest.record(key, image_key_card_id(key), image_uri, filename)
+            logger.info(f"💾 Imagen guardada: {filename}")
+            return IMAGE_DOWNLOADED, None
+        except Exception as e:
+            # An interrupted transfer keeps its partial file and resumes on the next call
+            logger.error(f"❌ Excepción descargando imagen {card_name}: {e}")
+            return IMAGE_FAILED, str(e)
+
+    async def adownload_card_image(self, card_name: str, dest_dir: str | None = None) -> Optional[Path]:
+        """Async download_card_image, streaming through the async client"""
+        card_info = await self.aget_card_info(card_name)
+        target = self._image_target(card_name, card_info, dest_dir)
+        if target is None:
+            return None
+        image_uri, key, view_path = target
+        status, error = await self.flights.ado(("image", key),
+                                               lambda: self._adownload_image(card_name, image_uri, key))
+        _, error = self._link_image_view(key, view_path, status, error)
+        return view_path if error is None else None
+
+    async def _adownload_image(self, card_name: str, image_uri: str, key: str) -> Tuple[str, Optional[str]]:
+        """Async counterpart of _download_image"""
+        filename = self.image_store.path_for(key)
+        if self._image_stored(key, image_uri):
+            logger.info(f"🖼️ Imagen ya en caché: {filename}")
+            return IMAGE_CACHED, None
+        if self.offline:
+            logger.info(f"📴 Offline: image of {card_name} is not cached")
+            return IMAGE_UNAVAILABLE, "offline mode"
+
+        try:
+            async with self.image_store.apartial_lock(key):
+                if self._image_stored(key, image_uri):
+                    logger.info(f"🖼️ Imagen ya en caché: {filename}")
+                    return IMAGE_CACHED, None
+                partial = self.image_store.partial_path(key)
+                offset, headers = self._image_request_headers(partial, image_uri, self.image_store.partial_validator(key))
+                await self.image_rate_limiter.aacquire()
+                logger.info(f"⬇️ Descargando imagen: {card_name} -> {filename}" + (f" (desde {offset} B)" if offset else ""))
+                async with self._get_async_client().stream(
+                    "GET", image_uri, headers=headers,
+                    timeout=self.transport.httpx_timeout(self.transport.image_read_timeout)
+                ) as resp:
+                    mode, expected_size = self._check_image_response(resp.status_code, resp.headers, offset, partial)
+                    with open(partial, mode) as f:
+                        if mode == 'wb':
+                            self.image_store.save_partial_validator(key, self._image_validator(image_uri, resp.headers))
+                        async for chunk in resp.aiter_bytes(IMAGE_CHUNK_SIZE):
+                            f.write(chunk)
+                self.image_store.commit(key, expected_size)
+                self.image_manifest.record(key, image_key_card_id(key), image_uri, filename)
+            logger.info(f"💾 Imagen guardada: {filename}")
+            return IMAGE_DOWNLOADED, None
+        except Exception as e:
+            logger.error(f"❌ Excepción descargando imagen {card_name}: {e}")
+            return IMAGE_FAILED, str(e)
+
+    def _image_stored(self, key: str, image_uri: str) -> bool:
+        """Check the manifest for the current version of an image, adopting a blob it doesn't know about yet
+
+        Scryfall versions image URIs (the ?<timestamp> query), so a stored image whose
+        URI differs from the card's is stale and counts as missing.
+        """
+        entry = self.image_manifest.get(key)
+        if entry is not None:
+            # Images indexed from disk have no URI: the first request tells which one they are
+            if entry['image_uri'] not in ("", image_uri):
+                logger.info(f"🔄 Imagen actualizada en Scryfall, se descargará de nuevo: {key}")
+                return False
+            if not entry['image_uri']:
+                self.image_manifest.record(key, entry['card_id'], image_uri, entry['path'])
+            return self.image_manifest.has(key)
+        blob = self.image_store.path_for(key)
+        if not blob.is_file():
+            return False
+        self.image_manifest.record(key, image_key_card_id(key), image_uri, blob)
+        return True
+
+    def backfill_image_manifest(self, force: bool = False) -> int:
+        """Index images stored before the manifest existed, returning how many
+
+        Hashes every blob, so it runs from the `images` command rather than on startup,
+        and only once per cache directory unless forced.
+        """
+        if not force and self.image_manifest.get_meta("backfilled_at") is not None:
+            return 0
+        count = 0
+        for key in self.image_store.iter_keys():
+            self.image_manifest.record(key, image_key_card_id(key), "", self.image_store.path_for(key))
+            count += 1
+        self.image_manifest.set_meta("backfilled_at", str(time.time()))
+        if count:
+            logger.info(f"🗂️ Manifest de imágenes reconstruido: {count} imágenes")
+        return count
+
+    def missing_images(self, card_names: List[str]) -> List[str]:
+        """Return the names, in input order, whose image is not stored
+
+        Answered from the local card tiers and the image manifest alone, without
+        network or per-file checks. Cards with no cached data count as missing.
+        """
+        names = list(dict.fromkeys(card_names))
+        records = self.get_local_cards(names)
+        stored = self.image_manifest.card_ids_with_images(record.id for record in records.values())
+        return [card_name for card_name in names
+                if card_name not in records or records[card_name].id not in stored]
+
+    def gc_images(self, max_age_days: float, keep_card_names: Optional[List[str]] = None) -> Dict:
+        """Delete stored images (and their variants) not used in max_age_days
+
+        Cards in keep_card_names (e.g. the current deck) are kept regardless of age.
+        Returns the number of images removed and the bytes freed.
+        """
+        keep_ids = [record.id for record in self.get_local_cards(keep_card_names or []).values()]
+        keys = self.image_manifest.unused_since(time.time() - max_age_days * 86400, keep_ids)
+        freed = sum(self.image_store.remove(key) for key in keys)
+        self.image_manifest.remove(keys)
+        if keys:
+            logger.info(f"🗑️ Imágenes eliminadas: {len(keys)} ({freed} B)")
+        return {'removed': len(keys), 'bytes': freed}
+
+    @staticmethod
+    def _image_request_headers(partial: Path, image_uri: str, validator: Optional[Dict]) -> Tuple[int, Dict[str, str]]:
+        """Return the bytes already downloaded and the headers requesting the rest
+
+        A partial file is resumed only with If-Range, so the server sends the whole image
+        again if it changed. Partials of another URI, or without a validator to send,
+        are discarded.
+        """
+        offset = partial.stat().st_size if partial.exists() else 0
+        # Lengths are checked against the bytes on disk, so ask for them uncompressed
+        headers = {'Accept-Encoding': 'identity'}
+        if offset:
+            if_range = ScryfallCache._if_range(validator) if validator and validator.get('uri') == image_uri else None
+            if if_range is None:
+                partial.unlink(missing_ok=True)
+                return 0, headers
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = if_range
+        return offset, headers
+
+    @staticmethod
+    def _if_range(validator: Dict) -> Optional[str]:
+        """If-Range value for a partial download: a strong ETag, else Last-Modified"""
+        etag = validator.get('etag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return validator.get('last_modified') or None
+
+    @staticmethod
+    def _image_validator(image_uri: str, headers) -> Dict[str, Optional[str]]:
+        """What identifies the bytes of a full image response, to resume it safely"""
+        return {'uri': image_uri, 'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified')}
+
+    @staticmethod
+    def _check_image_response(status_code: int, headers, offset: int, partial: Path) -> Tuple[str, Optional[int]]:
+        """Validate an image response before writing it: returns (file mode, expected final size)
+
+        Raises ValueError for error statuses, non-image content and ranges that don't
+        continue the partial file (which is then discarded so the next attempt restarts).
+        """
+        if status_code == 416 or (status_code == 206 and not offset):
+            partial.unlink(missing_ok=True)
+            raise ValueError(f"HTTP {status_code} for a range request, restarting next time")
+        if status_code not in (200, 206):
+            raise ValueError(f"HTTP {status_code}")
+        content_type = headers.get('Content-Type', '')
+        if content_type and not content_type.startswith('image/'):
+            raise ValueError(f"unexpected content type {content_type}")
+
+        if status_code == 206:
+            # Content-Range: bytes <first>-<last>/<total>
+            match = _CONTENT_RANGE.match(headers.get('Content-Range', ''))
+            if not match or int(match.group(1)) != offset:
+                partial.unlink(missing_ok=True)
+                raise ValueError(f"unexpected Content-Range {headers.get('Content-Range')!r}")
+            return 'ab', int(match.group(2)) if match.group(2) != '*' else None
+
+        # A full response replaces whatever was downloaded before
+        length = headers.get('Content-Length')
+        return 'wb', int(length) if length else None
+
+    def _image_target(self, card_name: str, card_info: Optional[CardRecord], dest_dir: str | None):
+        """Pick a card's image: returns (image URI, image store key, view path in dest_dir) or None"""
         if not card_info:
             logger.error(f"❌ No se puede descargar imagen - no hay información de la carta: {card_name}")
             return None
 
         image_uri = None
-        # Single-faced card
+        face_index = 0
+        variant = None
+        # Single-faced card: prefer large, then normal, then png, else first
         if isinstance(card_info.get('image_uris'), dict):
             image_uris = card_info['image_uris']
-            # Prefer large, then normal, then png, else first
-            image_uri = image_uris.get('large') or image_uris.get('normal') or image_uris.get('png') or next(iter(image_uris.values()))
-        # Multi-faced card
+            variant = next((v for v in ('large', 'normal', 'png') if image_uris.get(v)), None) or next(iter(image_uris), None)
+            image_uri = image_uris.get(variant) if variant else None
+        # Multi-faced card: the first face with an image
         elif isinstance(card_info.get('card_faces'), list):
-            for face in card_info['card_faces']:
+            for face_index, face in enumerate(card_info['card_faces']):
                 if isinstance(face.get('image_uris'), dict):
-                    image_uris = face['image_uris']
-                    image_uri = image_uris.get('large') or image_uris.get('normal') or image_uris.get('png')
-                    if image_uri:
+                    variant = next((v for v in ('large', 'normal', 'png') if face['image_uris'].get(v)), None)
+                    if variant:
+                        image_uri = face['image_uris'][variant]
                         break
 
         if not image_uri:
             logger.warning(f"⚠️ No se encontró imagen para: {card_name}")
             return None
 
+        # Only a path: the directory is created when a view is actually linked into it
         dest_dir_path = Path(__file__).parent.parent / (dest_dir or 'image_cache')
-        dest_dir_path.mkdir(exist_ok=True)
 
-        # Create a safe filename using the card name
+        # The view keeps a readable name based on the card name; the stored image is keyed by card id
         ext = Path(image_uri.split('?')[0]).suffix or '.png'
         safe_name = "".join(c for c in card_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        filename = dest_dir_path / f"{safe_name}{ext}"
-
-        if filename.exists():
-            logger.info(f"🖼️ Imagen ya en caché: {filename}")
-            return filename
-
-        try:
-            logger.info(f"⬇️ Descargando imagen: {card_name} -> {filename}")
-            resp = self.session.get(image_uri, stream=True, timeout=15)
-            if resp.status_code == 200:
-                with open(filename, 'wb') as f:
-                    for chunk in resp.iter_content(1024):
-                        f.write(chunk)
-                logger.info(f"💾 Imagen guardada: {filename}")
-                return filename
-            else:
-                logger.error(f"❌ Error descargando imagen ({resp.status_code}): {image_uri}")
-                return None
-        except Exception as e:
-            logger.error(f"❌ Excepción descargando imagen {card_name}: {e}")
-            return None
+        return image_uri, image_key(card_info['id'], face_index, variant, ext), dest_dir_path / f"{safe_name}{ext}"
 
 
 class ManaCurveCalculator:
     """Calculates the mana curve of a deck"""
     
-    def __init__(self, scryfall_cache: ScryfallCache):
+    def __init__(self, scryfall_cache: ScryfallCache, max_cached_curves: int = 256,
+                 max_cache_bytes: int = 16 * 1024 * 1024, cache_dir: str = ".cache"):
         self.cache = scryfall_cache
         # Directory for mana curve cache files (one per deck hash)
-        self.cache_dir = Path(__file__).parent.parent / ".cache"
+        self.cache_dir = Path(__file__).parent.parent / cache_dir
         self.cache_dir.mkdir(exist_ok=True)
+        # LRU bounds for the curve cache; every modify_deck_card produces a new deck hash
+        self.max_cached_curves = max_cached_curves
+        self.max_cache_bytes = max_cache_bytes
+        # deck hash -> file size, least recently used first (built lazily from one scan)
+        self._curve_index: Optional["OrderedDict[str, int]"] = None
+        self._curve_index_bytes = 0
+        self._curve_index_lock = threading.Lock()
+        self.curve_cache_evictions = 0
     
     def calculate_mana_curve(self, deck_lines: List[str]) -> Dict:
         """Calculate the mana curve of the deck"""
@@ -204,17 +1327,26 @@ class ManaCurveCalculator:
             'lands': 0,
             'nonlands': 0,
             'commander_cmc': 0,
-            'failed_cards': []
+            'failed_cards': [],
+            'unavailable_cards': [],
         }
         
-        # Process each deck line
+        parsed_lines = []
         for i, line in enumerate(deck_lines):
             card_data = self._process_deck_line(line, i == len(deck_lines) - 1)
-            if not card_data:
+            if card_data:
+                parsed_lines.append(card_data)
+
+        # Resolve every card of the deck in one bulk lookup
+        batch = self.cache.get_cards_info([card_name for _, card_name, _ in parsed_lines])
+        unavailable = set(batch.unavailable)
+
+        # Process each deck line
+        for quantity, card_name, is_commander in parsed_lines:
+            if card_name in unavailable:
+                stats['unavailable_cards'].append(card_name)
                 continue
-            
-            quantity, card_name, is_commander = card_data
-            self._update_curve_stats(curve, stats, quantity, card_name, is_commander)
+            self._update_curve_stats(curve, stats, quantity, card_name, is_commander, batch.found.get(card_name))
         
         stats['average_cmc'] = self._calculate_average_cmc(curve, stats['nonlands'])
         result = {
@@ -222,12 +1354,14 @@ class ManaCurveCalculator:
             **stats
         }
 
-        # Save to cache for future calls
-        try:
-            self._save_cached_curve(deck_hash, result)
-        except Exception:
-            # If cache saving fails, don't break the calculation
-            pass
+        # Save to cache for future calls; a curve missing cards that couldn't be looked up
+        # (offline, Scryfall unreachable) is recomputed next time instead
+        if not stats['unavailable_cards']:
+            try:
+                self._save_cached_curve(deck_hash, result)
+            except Exception:
+                # If cache saving fails, don't break the calculation
+                pass
 
         return result
 
@@ -240,6 +1374,57 @@ class ManaCurveCalculator:
         """Get path for cached mana curve for a given deck hash."""
         return self.cache_dir / f"mana_curve_{deck_hash}.json"
 
+    def _get_curve_index(self) -> "OrderedDict[str, int]":
+        """Return the LRU index of cached curves, scanning the directory only the first time.
+
+        Recency is the file modification time, which is bumped on every cache hit.
+        """
+        if self._curve_index is None:
+            entries = []
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.startswith("mana_curve_") and entry.name.endswith(".json"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name[len("mana_curve_"):-len(".json")], stat.st_size))
+            entries.sort()
+            self._curve_index = OrderedDict((deck_hash, size) for _, deck_hash, size in entries)
+            self._curve_index_bytes = sum(self._curve_index.values())
+        return self._curve_index
+
+    def _touch_cached_curve(self, deck_hash: str, size: int):
+        """Record a curve as most recently used"""
+        with self._curve_index_lock:
+            index = self._get_curve_index()
+            self._curve_index_bytes += size - index.pop(deck_hash, 0)
+            index[deck_hash] = size
+
+    def _evict_cached_curves(self):
+        """Delete least recently used curves until the cache fits its entry and byte limits"""
+        with self._curve_index_lock:
+            index = self._get_curve_index()
+            while len(index) > self.max_cached_curves or self._curve_index_bytes > self.max_cache_bytes:
+                deck_hash, size = index.popitem(last=False)
+                self._curve_index_bytes -= size
+                self.curve_cache_evictions += 1
+                try:
+                    self._get_cache_filepath(deck_hash).unlink()
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.warning(f"⚠️ Error evicting mana curve cache {deck_hash}: {e}")
+
+    def curve_cache_stats(self) -> Dict:
+        """Return the size of the mana curve cache and its limits"""
+        with self._curve_index_lock:
+            index = self._get_curve_index()
+            return {
+                'entries': len(index),
+                'bytes': self._curve_index_bytes,
+                'max_entries': self.max_cached_curves,
+                'max_bytes': self.max_cache_bytes,
+                'evictions': self.curve_cache_evictions,
+            }
+
     def _load_cached_curve(self, deck_hash: str) -> Optional[Dict]:
         """Load cached curve data if available and return it, otherwise None."""
         path = self._get_cache_filepath(deck_hash)
@@ -247,7 +1432,11 @@ class ManaCurveCalculator:
             return None
         try:
             with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                data = json.load(f)
+            # Bump recency for the LRU policy
+            os.utime(path)
+            self._touch_cached_curve(deck_hash, path.stat().st_size)
+            return data
         except Exception as e:
             logger.warning(f"⚠️ Error reading mana curve cache {path}: {e}")
             return None
@@ -259,6 +1448,8 @@ class ManaCurveCalculator:
             with open(path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
             logger.info(f"💾 Mana curve guardada en caché: {path}")
+            self._touch_cached_curve(deck_hash, path.stat().st_size)
+            self._evict_cached_curves()
         except Exception as e:
             logger.warning(f"⚠️ Error saving mana curve cache {path}: {e}")
 
@@ -279,14 +1470,15 @@ class ManaCurveCalculator:
         except ValueError:
             return None
     
-    def _update_curve_stats(self, curve, stats, quantity: int, card_name: str, is_commander: bool):
+    def _update_curve_stats(self, curve, stats, quantity: int, card_name: str, is_commander: bool,
+                            card_info: Optional[CardRecord]):
         """Update curve statistics with a card"""
-        cmc = self.cache.get_cmc(card_name)
-        type_line = self.cache.get_type_line(card_name)
-        
-        if cmc is None:
+        if card_info is None:
             stats['failed_cards'].append(card_name)
             return
+
+        cmc = card_info.get('cmc', 0)
+        type_line = card_info.get('type_line', '')
         
         is_land = type_line and 'Land' in type_line if type_line else False
         
@@ -349,10 +1541,45 @@ class ManaCurveCalculator:
                 result += f"• {card}\n"
             if len(curve_data['failed_cards']) > 5:
                 result += f"• ... and {len(curve_data['failed_cards']) - 5} more\n"
-        
+
+        # Cards that exist but couldn't be looked up right now
+        unavailable_cards = curve_data.get('unavailable_cards', [])
+        if unavailable_cards:
+            reason = "offline mode" if self.cache.offline else "Scryfall unreachable"
+            result += f"\n📴 **Cards unavailable ({reason}), not counted:** {len(unavailable_cards)}\n"
+            for card in unavailable_cards[:5]:
+                result += f"• {card}\n"
+            if len(unavailable_cards) > 5:
+                result += f"• ... and {len(unavailable_cards) - 5} more\n"
+
         return result
 
 
+class _LazyInstance:
+    """Stands in for a global object, building it on first use
+
+    Importing the module then creates no cache directories or databases; tests and
+    tools that never touch the globals leave the working tree alone.
+    """
+
+    def __init__(self, factory):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _get(self):
+        with self._lock:
+            if self._instance is None:
+                object.__setattr__(self, '_instance', self._factory())
+            return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._get(), name, value)
+
+
 # Global cache instance
-scryfall_cache = ScryfallCache()
-mana_curve_calculator = ManaCurveCalculator(scryfall_cache)
\ No newline at end of file
+scryfall_cache = _LazyInstance(ScryfallCache)
+mana_curve_calculator = _LazyInstance(lambda: ManaCurveCalculator(scryfall_cache))
\ No newline at end of file
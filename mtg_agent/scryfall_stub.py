@@ -0,0 +1,302 @@
+"""
+Fixture-backed stand-in for the Scryfall API, for benchmarks and offline integration tests
+
+Implements GET /cards/named (exact and fuzzy), POST /cards/collection, GET /cards/search
+and the image URLs of the cards it serves. Latency, server errors and 429 responses can be
+injected; the random source is seeded so runs are reproducible. Point ScryfallCache at it
+with MTG_AGENT_SCRYFALL_URL (or the api_url argument). A small card set ships with the
+package (BUNDLED_FIXTURES) for when no fixture file or local card store is at hand.
+"""
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from .bulk_import import iter_bulk_cards
+from .card_store import card_aliases, normalize_card_name
+
+logger = logging.getLogger("mtg_agent.scryfall_stub")
+
+# Staples, basic lands and split/adventure/double-faced cards in Scryfall's card format
+BUNDLED_FIXTURES = Path(__file__).parent / "fixtures" / "scryfall_cards.json"
+# Cards per /cards/search page, as on Scryfall
+SEARCH_PAGE_SIZE = 175
+COLLECTION_MAX_IDENTIFIERS = 75
+
+
+def _error(status: int, code: str, details: str) -> Dict:
+    return {'object': 'error', 'code': code, 'status': status, 'details': details}
+
+
+class ScryfallStub:
+    """In-memory card index answering Scryfall-shaped requests"""
+
+    def __init__(self, cards: Iterable[Dict], latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: float = 1.0,
+                 seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.base_url = ""
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._cards: Dict[str, Dict] = {}
+        self._names: Dict[str, str] = {}
+        for card in cards:
+            self.add_card(card)
+        # Metrics
+        self.requests: Dict[str, int] = {}
+        self.injected_errors = 0
+        self.injected_rate_limits = 0
+
+    def add_card(self, card: Dict):
+        """Index a Scryfall card payload by id, name and face names"""
+        self._cards[card['id']] = card
+        self._names[normalize_card_name(card['name'])] = card['id']
+        for alias in card_aliases(card):
+            self._names.setdefault(normalize_card_name(alias), card['id'])
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def _card_payload(self, card: Dict) -> Dict:
+        """Return a card with its image URIs pointing at this server"""
+        payload = dict(card)
+
+        def images(image_uris: Dict, suffix: str = "") -> Dict:
+            return {variant: f"{self.base_url}/images/{card['id']}{suffix}/{variant}"
+                    f"{'.png' if variant == 'png' else '.jpg'}" for variant in image_uris}
+
+        if isinstance(card.get('image_uris'), dict):
+            payload['image_uris'] = images(card['image_uris'])
+        if isinstance(card.get('card_faces'), list):
+            payload['card_faces'] = [
+                dict(face, image_uris=images(face['image_uris'], f"-{index}"))
+                if isinstance(face.get('image_uris'), dict) else face
+                for index, face in enumerate(card['card_faces'])
+            ]
+        return payload
+
+    def _find(self, name: str) -> Optional[Dict]:
+        card_id = self._names.get(normalize_card_name(name))
+        return self._cards[card_id] if card_id else None
+
+    def _fuzzy(self, name: str) -> Optional[Dict]:
+        card = self._find(name)
+        if card is not None:
+            return card
+        key = normalize_card_name(name)
+        matches = [card_id for name_key, card_id in self._names.items() if key in name_key]
+        return self._cards[matches[0]] if len(set(matches)) == 1 else None
+
+    def _inject(self):
+        """Sleep for the configured latency and maybe return an injected failure"""
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+        if delay > 0:
+            time.sleep(delay)
+        if roll < self.rate_limit_rate:
+            with self._lock:
+                self.injected_rate_limits += 1
+            return 429, _error(429, 'rate_limited', "Too many requests"), {'Retry-After': f"{self.retry_after:g}"}
+        if roll < self.rate_limit_rate + self.error_rate:
+            with self._lock:
+                self.injected_errors += 1
+            return 503, _error(503, 'unavailable', "Injected failure"), {}
+        return None
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: Optional[Dict]):
+        """Answer a request: returns (status, JSON body or bytes, extra headers)"""
+        endpoint = path if not path.startswith('/images/') else '/images'
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+        injected = self._inject()
+        if injected is not None:
+            return injected
+
+        if method == 'GET' and path == '/cards/named':
+            if 'exact' in query:
+                card = self._find(query['exact'][0])
+            elif 'fuzzy' in query:
+                card = self._fuzzy(query['fuzzy'][0])
+            else:
+                return 400, _error(400, 'bad_request', "exact or fuzzy is required"), {}
+            if card is None:
+                return 404, _error(404, 'not_found', "No cards found matching the name"), {}
+            return 200, self._card_payload(card), {}
+
+        if method == 'POST' and path == '/cards/collection':
+            if not isinstance(body, dict):
+                return 400, _error(400, 'bad_request', "The body must be a JSON object"), {}
+            identifiers = body.get('identifiers')
+            if not isinstance(identifiers, list) or len(identifiers) > COLLECTION_MAX_IDENTIFIERS:
+                return 422, _error(422, 'bad_request', f"1 to {COLLECTION_MAX_IDENTIFIERS} identifiers required"), {}
+            if not all(isinstance(identifier, dict) and (isinstance(identifier.get('id'), str)
+                                                         or isinstance(identifier.get('name'), str))
+                       for identifier in identifiers):
+                return 400, _error(400, 'bad_request', "Each identifier must be an object with an id or a name"), {}
+            data, not_found = [], []
+            for identifier in identifiers:
+                if isinstance(identifier.get('id'), str):
+                    card = self._cards.get(identifier['id'])
+                else:
+                    card = self._find(identifier.get('name', ''))
+                if card is None:
+                    not_found.append(identifier)
+                else:
+                    data.append(self._card_payload(card))
+            return 200, {'object': 'list', 'not_found': not_found, 'data': data}, {}
+
+        if method == 'GET' and path == '/cards/search':
+            return self._search(query)
+
+        if method == 'GET' and path.startswith('/images/'):
+            # Deterministic placeholder bytes, distinct per image
+            digest = hashlib.sha256(path.encode('utf-8')).digest()
+            content_type = 'image/png' if path.endswith('.png') else 'image/jpeg'
+            return 200, digest * 256, {'Content-Type': content_type}
+
+        return 404, _error(404, 'not_found', f"Unknown endpoint {path}"), {}
+
+    def _search(self, query: Dict[str, List[str]]):
+        """Every word of q must appear in the name, type line or oracle text"""
+        terms = (query.get('q') or [''])[0].casefold().split()
+        if not terms:
+            return 400, _error(400, 'bad_request', "q is required"), {}
+        matches = []
+        for card in self._cards.values():
+            text = " ".join(str(card.get(field) or '') for field in ('name', 'type_line', 'oracle_text')).casefold()
+            if all(term in text for term in terms):
+                matches.append(card)
+        if not matches:
+            return 404, _error(404, 'not_found', "Your query didn't match any cards"), {}
+        matches.sort(key=lambda card: card['name'])
+
+        try:
+            page = max(1, int((query.get('page') or ['1'])[0]))
+        except ValueError:
+            return 400, _error(400, 'bad_request', "page must be an integer"), {}
+        start = (page - 1) * SEARCH_PAGE_SIZE
+        data = [self._card_payload(card) for card in matches[start:start + SEARCH_PAGE_SIZE]]
+        result = {'object': 'list', 'total_cards': len(matches), 'has_more': start + SEARCH_PAGE_SIZE < len(matches),
+                  'data': data}
+        if result['has_more']:
+            next_query = urlencode({'q': query['q'][0], 'page': page + 1})
+            result['next_page'] = f"{self.base_url}/cards/search?{next_query}"
+        return 200, result, {}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'cards': len(self._cards),
+                'requests': dict(self.requests),
+                'injected_errors': self.injected_errors,
+                'injected_rate_limits': self.injected_rate_limits,
+            }
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    server_version = "ScryfallStub/1.0"
+
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        body = None
+        if method == 'POST':
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b'null')
+            except ValueError:
+                self._reply(400, _error(400, 'bad_request', "Invalid JSON body"), {})
+                return
+        try:
+            status, payload, headers = self.server.stub.handle(method, url.path, parse_qs(url.query), body)
+        except Exception as e:
+            # Whatever goes wrong, the client gets an answer rather than a dropped connection
+            logger.exception(f"❌ Stub failed on {method} {self.path}")
+            status, payload, headers = 500, _error(500, 'internal_error', str(e)), {}
+        self._reply(status, payload, headers)
+
+    def _reply(self, status: int, payload, headers: Dict[str, str]):
+        if isinstance(payload, bytes):
+            data = payload
+        else:
+            data = json.dumps(payload).encode('utf-8')
+            headers = {'Content-Type': 'application/json; charset=utf-8', **headers}
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class ScryfallStubServer:
+    """HTTP server for a ScryfallStub, run on a background thread
+
+        with ScryfallStubServer(ScryfallStub(cards)) as server:
+            cache = ScryfallCache(api_url=server.url)
+    """
+
+    def __init__(self, stub: ScryfallStub, host: str = "127.0.0.1", port: int = 0):
+        self.stub = stub
+        self._httpd = ThreadingHTTPServer((host, port), _StubRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = stub
+        self.stub.base_url = self.url
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ScryfallStubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="scryfall-stub", daemon=True)
+        self._thread.start()
+        logger.info(f"🧪 Scryfall stand-in listening on {self.url} ({len(self.stub)} cards)")
+        return self
+
+    def serve_forever(self):
+        logger.info(f"🧪 Scryfall stand-in listening on {self.url} ({len(self.stub)} cards)")
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "ScryfallStubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def load_fixture_cards(path: Optional[Path] = None) -> List[Dict]:
+    """Read fixture cards: a JSON array of Scryfall card objects (bulk-data files work too)
+
+    Without a path the bundled fixtures are read.
+    """
+    path = Path(path) if path else BUNDLED_FIXTURES
+    return [card for card in iter_bulk_cards(path) if card.get('id') and card.get('name')]
@@ -0,0 +1,190 @@
+"""
+Single-flight execution: concurrent calls for the same key share one in-flight call
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Deduplicates in-flight work by key, for threads (do) and coroutines (ado)
+
+    The first caller for a key runs the function; callers arriving while it runs wait
+    and receive the same result, or the same exception. Nothing is cached once the
+    call returns. Threads and coroutines are coalesced separately, coroutines per
+    event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Any, Dict[Hashable, asyncio.Future]] = {}
+        # Metrics
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the call already running for it"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def do_many(self, keys: Iterable[Hashable], fn: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> Dict[Hashable, Any]:
+        """Run fn once for the keys not already in flight, and wait for the others
+
+        fn receives the keys this caller leads and returns {key: result}; keys it leaves
+        out resolve to None. Single calls (do) for those keys join this one, and this one
+        joins theirs. Returns {key: result} for every key.
+        """
+        keys = list(dict.fromkeys(keys))
+        owned: Dict[Hashable, _Call] = {}
+        joined: Dict[Hashable, _Call] = {}
+        with self._lock:
+            for key in keys:
+                call = self._calls.get(key)
+                if call is None:
+                    owned[key] = self._calls[key] = _Call()
+                else:
+                    joined[key] = call
+            self.executed += len(owned)
+            self.coalesced += len(joined)
+
+        results: Dict[Hashable, Any] = {}
+        if owned:
+            try:
+                results = dict(fn(list(owned)))
+            except Exception as e:
+                for call in owned.values():
+                    call.error = e
+                raise
+            finally:
+                for key, call in owned.items():
+                    call.result = results.get(key)
+                with self._lock:
+                    for key in owned:
+                        del self._calls[key]
+                for call in owned.values():
+                    call.done.set()
+
+        for key, call in joined.items():
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            results[key] = call.result
+        return {key: results.get(key) for key in keys}
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn() for key, or the call already running for it on this event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            futures = self._futures.setdefault(loop, {})
+            future = futures.get(key)
+            leader = future is None
+            if leader:
+                future = futures[key] = loop.create_future()
+                # Followers may all be gone; don't warn about an unretrieved exception
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return await asyncio.shield(future)
+
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                futures.pop(key, None)
+                if not futures:
+                    self._futures.pop(loop, None)
+
+    async def ado_many(self, keys: Iterable[Hashable],
+                       fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]) -> Dict[Hashable, Any]:
+        """Async counterpart of do_many, coalescing with ado on this event loop"""
+        loop = asyncio.get_running_loop()
+        keys = list(dict.fromkeys(keys))
+        owned: Dict[Hashable, asyncio.Future] = {}
+        joined: Dict[Hashable, asyncio.Future] = {}
+        with self._lock:
+            futures = self._futures.setdefault(loop, {})
+            for key in keys:
+                future = futures.get(key)
+                if future is None:
+                    future = owned[key] = futures[key] = loop.create_future()
+                    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                else:
+                    joined[key] = future
+            self.executed += len(owned)
+            self.coalesced += len(joined)
+
+        results: Dict[Hashable, Any] = {}
+        if owned:
+            try:
+                results = dict(await fn(list(owned)))
+                for key, future in owned.items():
+                    future.set_result(results.get(key))
+            except asyncio.CancelledError:
+                for future in owned.values():
+                    future.cancel()
+                raise
+            except Exception as e:
+                for future in owned.values():
+                    future.set_exception(e)
+                raise
+            finally:
+                with self._lock:
+                    for key in owned:
+                        futures.pop(key, None)
+                    if not futures:
+                        self._futures.pop(loop, None)
+
+        for key, future in joined.items():
+            results[key] = await asyncio.shield(future)
+        return {key: results.get(key) for key in keys}
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many calls ran and how many callers joined one already running"""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls) + sum(len(futures) for futures in self._futures.values()),
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+            }
@@ -0,0 +1,118 @@
+"""
+HTTP transport settings shared by Scryfall card lookups and image downloads
+"""
+import importlib.util
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import __version__
+
+logger = logging.getLogger("mtg_agent.transport")
+
+SCRYFALL_API_URL = "https://api.scryfall.com"
+# Scryfall asks API clients to identify themselves and to accept JSON
+DEFAULT_USER_AGENT = f"MTGAgent/{__version__}"
+DEFAULT_ACCEPT = "application/json;q=0.9,*/*;q=0.8"
+
+
+class TransportConfig:
+    """Base URL, connection pools, timeouts and headers for the HTTP clients
+
+    One requests.Session (sync paths) and one httpx.AsyncClient per event loop (async
+    paths) are built from it and shared by card lookups and image downloads, so
+    keep-alive connections to api.scryfall.com and the image CDN are reused.
+    HTTP/2 applies to the async client and needs the optional h2 package
+    (pip install 'httpx[http2]'); requests only speaks HTTP/1.1.
+    """
+
+    def __init__(self, base_url: str = SCRYFALL_API_URL, pool_connections: int = 4,
+                 pool_maxsize: int = 16, connect_timeout: float = 5.0, read_timeout: float = 15.0,
+                 image_read_timeout: float = 30.0, compression: bool = True,
+                 user_agent: str = DEFAULT_USER_AGENT, headers: Optional[Dict[str, str]] = None,
+                 http2: bool = False):
+        self.base_url = base_url.rstrip("/")
+        # Hosts kept in the pool, and connections kept per host
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.image_read_timeout = image_read_timeout
+        self.compression = compression
+        self.user_agent = user_agent
+        self.headers = dict(headers or {})
+        self.http2 = http2
+
+    @classmethod
+    def from_env(cls, **overrides) -> "TransportConfig":
+        """Build a config from MTG_AGENT_* environment variables; explicit arguments win"""
+        settings = {
+            'base_url': os.getenv("MTG_AGENT_SCRYFALL_URL") or SCRYFALL_API_URL,
+            'pool_maxsize': int(os.getenv("MTG_AGENT_HTTP_POOL_SIZE", 16)),
+            'connect_timeout': float(os.getenv("MTG_AGENT_HTTP_CONNECT_TIMEOUT", 5)),
+            'read_timeout': float(os.getenv("MTG_AGENT_HTTP_READ_TIMEOUT", 15)),
+            'compression': os.getenv("MTG_AGENT_HTTP_COMPRESSION", "1") == "1",
+            'user_agent': os.getenv("MTG_AGENT_USER_AGENT") or DEFAULT_USER_AGENT,
+            'http2': os.getenv("MTG_AGENT_HTTP2", "0") == "1",
+        }
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**settings)
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout for API requests, in the form requests expects"""
+        return self.connect_timeout, self.read_timeout
+
+    @property
+    def image_timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout for image downloads"""
+        return self.connect_timeout, self.image_read_timeout
+
+    def default_headers(self) -> Dict[str, str]:
+        headers = {
+            'User-Agent': self.user_agent,
+            'Accept': DEFAULT_ACCEPT,
+            'Accept-Encoding': "gzip, deflate" if self.compression else "identity",
+        }
+        headers.update(self.headers)
+        return headers
+
+    def build_session(self) -> requests.Session:
+        """Return a requests session with sized keep-alive pools and the default headers"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self.default_headers())
+        return session
+
+    def httpx_timeout(self, read_timeout: Optional[float] = None) -> httpx.Timeout:
+        return httpx.Timeout(read_timeout or self.read_timeout, connect=self.connect_timeout)
+
+    def build_async_client(self) -> httpx.AsyncClient:
+        """Return an httpx client with the same pool size, timeouts and headers"""
+        http2 = self.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("⚠️ HTTP/2 requested but h2 is not installed (pip install 'httpx[http2]'), using HTTP/1.1")
+            http2 = False
+        limits = httpx.Limits(max_connections=self.pool_connections * self.pool_maxsize,
+                              max_keepalive_connections=self.pool_maxsize)
+        return httpx.AsyncClient(http2=http2, limits=limits, timeout=self.httpx_timeout(),
+                                 headers=self.default_headers(), follow_redirects=True)
+
+    def describe(self) -> Dict:
+        """Return the settings for cache_stats"""
+        return {
+            'base_url': self.base_url,
+            'pool_connections': self.pool_connections,
+            'pool_maxsize': self.pool_maxsize,
+            'timeout': self.timeout,
+            'image_timeout': self.image_timeout,
+            'compression': self.compression,
+            'user_agent': self.user_agent,
+            'http2': self.http2,
+        }
@@ -0,0 +1,105 @@
+"""
+Cache warm-up: resolve every card of one or more decks before the first prompt
+"""
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .scryfall_integration import ScryfallCache, scryfall_cache
+
+logger = logging.getLogger("mtg_agent.warmup")
+
+
+def collect_deck_files(paths: Iterable[str]) -> List[Path]:
+    """Expand deck files and directories (every *.txt inside, recursively) into deck files"""
+    deck_files = []
+    for raw_path in paths:
+        path = Path(raw_path)
+        if path.is_dir():
+            deck_files.extend(sorted(path.rglob("*.txt")))
+        elif path.is_file():
+            deck_files.append(path)
+        else:
+            logger.warning(f"⚠️ Deck path not found: {path}")
+    return deck_files
+
+
+def read_deck_card_names(deck_file: Path) -> List[str]:
+    """Return the card names of an MTGO-format deck file ("quantity name" per line)"""
+    names = []
+    with open(deck_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.strip().split(' ', 1)
+            if len(parts) != 2:
+                continue
+            try:
+                int(parts[0])
+            except ValueError:
+                continue
+            names.append(parts[1].strip())
+    return names
+
+
+def warm_decks(paths: Iterable[str], cache: Optional[ScryfallCache] = None) -> Dict:
+    """Resolve every card of the given decks, local tiers first, and report timings"""
+    cache = cache or scryfall_cache
+    started_at = time.perf_counter()
+
+    deck_files = collect_deck_files(paths)
+    card_names: List[str] = []
+    for deck_file in deck_files:
+        card_names.extend(read_deck_card_names(deck_file))
+    unique_names = list(dict.fromkeys(card_names))
+
+    # One bulk lookup over memory, archive and store
+    local_started_at = time.perf_counter()
+    local = cache.get_local_cards(unique_names)
+    local_seconds = time.perf_counter() - local_started_at
+
+    # Whatever is left is fetched in /cards/collection batches
+    remote_names = [name for name in unique_names if name not in local]
+    network_started_at = time.perf_counter()
+    batch = cache.get_cards_info(remote_names)
+    fetched = len(batch.found)
+    not_found = batch.not_found
+    unavailable = batch.unavailable
+    network_seconds = time.perf_counter() - network_started_at
+
+    report = {
+        'decks': len(deck_files),
+        'cards': len(unique_names),
+        'local_hits': len(local),
+        'fetched': fetched,
+        'not_found': not_found,
+        'unavailable': unavailable,
+        'local_seconds': local_seconds,
+        'network_seconds': network_seconds,
+        'total_seconds': time.perf_counter() - started_at,
+    }
+    logger.info(
+        f"🔥 Warm-up: {report['cards']} cards from {report['decks']} decks "
+        f"({report['local_hits']} local, {fetched} fetched, {len(not_found)} not found, "
+        f"{len(unavailable)} unavailable) "
+        f"in {report['total_seconds']:.2f}s"
+    )
+    return report
+
+
+def format_warm_report(report: Dict) -> str:
+    """Format a warm-up report for the command line"""
+    result = "🔥 **CACHE WARM-UP**\n"
+    result += f"• Decks: {report['decks']}\n"
+    result += f"• Unique cards: {report['cards']}\n"
+    result += f"• Local hits: {report['local_hits']} ({report['local_seconds'] * 1000:.1f} ms)\n"
+    result += f"• Fetched from Scryfall: {report['fetched']} ({report['network_seconds']:.2f} s)\n"
+    result += f"• Total: {report['total_seconds']:.2f} s\n"
+    if report['not_found']:
+        result += f"\n⚠️ Cards not found in Scryfall: {len(report['not_found'])}\n"
+        for card in report['not_found'][:10]:
+            result += f"• {card}\n"
+    if report['unavailable']:
+        result += f"\n📴 Cards unavailable (offline or Scryfall unreachable): {len(report['unavailable'])}\n"
+        for card in report['unavailable'][:10]:
+            result += f"• {card}\n"
+    return result
@@ -0,0 +1,26 @@
+import pytest
+
+from mtg_agent.rate_limit import TokenBucketRateLimiter
+from mtg_agent.scryfall_integration import ScryfallCache
+from mtg_agent.scryfall_stub import ScryfallStub, ScryfallStubServer, load_fixture_cards
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    """Build ScryfallCaches on a private directory, pointed at a stand-in server"""
+    caches = []
+    servers = []
+
+    def make(latency: float = 0.0, **options):
+        server = ScryfallStubServer(ScryfallStub(load_fixture_cards(), latency=latency)).start()
+        servers.append(server)
+        cache = ScryfallCache(cache_dir=str(tmp_path / f"cache-{len(caches)}"), api_url=server.url,
+                              rate_limiter=TokenBucketRateLimiter(rate=1000, burst=100), **options)
+        caches.append(cache)
+        return cache, server.stub
+
+    yield make
+    for cache in caches:
+        cache.close()
+    for server in servers:
+        server.stop()
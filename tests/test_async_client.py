@@ -0,0 +1,38 @@
+import asyncio
+
+
+def test_one_client_per_event_loop(make_cache):
+    cache, stub = make_cache()
+
+    async def lookups():
+        client = cache._get_async_client()
+        cards = await asyncio.gather(*(cache.aget_card_info(name) for name in ("Sol Ring", "Counterspell")))
+        assert [card.name for card in cards] == ["Sol Ring", "Counterspell"]
+        assert cache._get_async_client() is client
+        return client
+
+    first = asyncio.run(lookups())
+    second = asyncio.run(lookups())
+    assert second is not first
+
+    async def count_clients():
+        cache._get_async_client()
+        return len(cache._async_clients)
+
+    # Clients of loops that ended without aclose() are not kept around
+    assert asyncio.run(count_clients()) == 1
+
+
+def test_aclose_closes_the_loop_client(make_cache):
+    cache, _ = make_cache()
+
+    async def lookup_and_close():
+        await cache.aget_card_info("Sol Ring")
+        client = cache._get_async_client()
+        await cache.aclose()
+        assert client.is_closed
+        assert cache._get_async_client() is not client
+        await cache.aclose()
+
+    asyncio.run(lookup_and_close())
+    assert len(cache._async_clients) == 0
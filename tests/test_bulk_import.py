@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from mtg_agent.bulk_import import import_bulk_file, iter_bulk_cards
+from mtg_agent.card_store import SQLiteCardStore
+
+
+def _card(index):
+    return {'id': f"id-{index}", 'name': f"Card {index}", 'oracle_text': "Draw a card. " * 20}
+
+
+@pytest.fixture
+def bulk_file(tmp_path):
+    path = tmp_path / "oracle-cards.json"
+    cards = [_card(index) for index in range(50)]
+    path.write_text(json.dumps(cards, indent=2), encoding='utf-8')
+    return path, cards
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1024 * 1024])
+def test_iter_bulk_cards_across_chunk_boundaries(bulk_file, chunk_size):
+    path, cards = bulk_file
+    assert list(iter_bulk_cards(path, chunk_size=chunk_size)) == cards
+
+
+def test_iter_bulk_cards_is_lazy(bulk_file):
+    path, cards = bulk_file
+    cards_iter = iter_bulk_cards(path, chunk_size=16)
+    assert next(cards_iter) == cards[0]
+    assert next(cards_iter) == cards[1]
+
+
+def test_iter_bulk_cards_empty_array(tmp_path):
+    path = tmp_path / "empty.json"
+    path.write_text(" [ ] ", encoding='utf-8')
+    assert list(iter_bulk_cards(path)) == []
+
+
+def test_iter_bulk_cards_rejects_non_arrays(tmp_path):
+    path = tmp_path / "object.json"
+    path.write_text('{"object": "list"}', encoding='utf-8')
+    with pytest.raises(ValueError):
+        list(iter_bulk_cards(path))
+
+
+def test_iter_bulk_cards_truncated_file(tmp_path):
+    path = tmp_path / "truncated.json"
+    path.write_text(json.dumps([_card(1), _card(2)])[:-40], encoding='utf-8')
+    with pytest.raises(ValueError):
+        list(iter_bulk_cards(path, chunk_size=8))
+
+
+def test_import_bulk_file_skips_tokens(tmp_path, bulk_file):
+    path, cards = bulk_file
+    token = {'id': "token-1", 'name': "Card 1", 'layout': 'token'}
+    path.write_text(json.dumps(cards + [token, {'object': 'card'}]), encoding='utf-8')
+    store = SQLiteCardStore(tmp_path / "cards.sqlite3")
+    try:
+        assert import_bulk_file(path, store, batch_size=8) == len(cards)
+        assert store.count() == len(cards)
+        assert store.get("card 1").id == "id-1"
+    finally:
+        store.close()
@@ -0,0 +1,69 @@
+import asyncio
+
+from mtg_agent.rate_limit import TokenBucketRateLimiter
+from mtg_agent.resilience import RetryPolicy
+from mtg_agent.scryfall_integration import COLLECTION_BATCH_SIZE, ScryfallCache
+
+CARDS = ["Lightning Bolt", "Sol Ring", "Counterspell"]
+
+
+def test_misses_go_out_in_collection_batches(make_cache):
+    cache, stub = make_cache()
+    unknown = [f"Unknown Card {number}" for number in range(COLLECTION_BATCH_SIZE + 5)]
+    result = cache.get_cards_info(CARDS + unknown)
+    assert set(result.found) == set(CARDS)
+    assert sorted(result.not_found) == sorted(unknown)
+    assert result.unavailable == []
+    assert stub.stats()['requests'] == {'/cards/collection': 2}
+
+    # Cached and known-missing names are answered without another request
+    again = cache.get_cards_info(CARDS + unknown)
+    assert set(again.found) == set(CARDS) and len(again.not_found) == len(unknown)
+    assert stub.stats()['requests'] == {'/cards/collection': 2}
+
+
+def test_async_batches_match_sync(make_cache):
+    cache, stub = make_cache()
+    unknown = [f"Unknown Card {number}" for number in range(2 * COLLECTION_BATCH_SIZE)]
+    result = asyncio.run(cache.aget_cards_info(CARDS + unknown))
+    assert set(result.found) == set(CARDS)
+    assert len(result.not_found) == len(unknown)
+    assert stub.stats()['requests'] == {'/cards/collection': 3}
+
+
+def test_failed_batches_are_not_retried_card_by_card(make_cache):
+    cache, stub = make_cache(retry_policy=RetryPolicy(max_attempts=2, base_delay=0.01))
+    stub.error_rate = 1.0
+    result = cache.get_cards_info(CARDS)
+    assert result.found == {}
+    assert sorted(result.unavailable) == sorted(CARDS)
+    assert stub.stats()['requests'] == {'/cards/collection': 2}
+
+    result = asyncio.run(cache.aget_cards_info(CARDS))
+    assert sorted(result.unavailable) == sorted(CARDS)
+    assert stub.stats()['requests'] == {'/cards/collection': 4}
+
+
+def test_unreachable_scryfall_reports_cards_unavailable(tmp_path):
+    cache = ScryfallCache(cache_dir=str(tmp_path / "cache"), api_url="http://127.0.0.1:9",
+                          rate_limiter=TokenBucketRateLimiter(rate=1000, burst=100),
+                          retry_policy=RetryPolicy(max_attempts=1))
+    try:
+        for result in (cache.get_cards_info(CARDS), asyncio.run(cache.aget_cards_info(CARDS))):
+            assert result.found == {} and result.not_found == []
+            assert sorted(result.unavailable) == sorted(CARDS)
+        assert cache.list_missing_cards() == []
+    finally:
+        cache.close()
+
+
+def test_offline_lookups_split_cached_missing_and_unavailable(make_cache):
+    cache, stub = make_cache()
+    cache.get_cards_info(["Lightning Bolt", "Unknown Card"])
+    cache.offline = True
+
+    result = cache.get_cards_info(["Lightning Bolt", "Unknown Card", "Sol Ring"])
+    assert list(result.found) == ["Lightning Bolt"]
+    assert result.not_found == ["Unknown Card"]
+    assert result.unavailable == ["Sol Ring"]
+    assert stub.stats()['requests'] == {'/cards/collection': 1}
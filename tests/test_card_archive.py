@@ -0,0 +1,74 @@
+import pytest
+
+from mtg_agent.card_archive import PackedCardStore, write_card_archive
+from mtg_agent.card_record import CardRecord
+from mtg_agent.card_store import SQLiteCardStore
+
+
+def _record(index, **fields):
+    return CardRecord.from_dict({'id': f"id-{index:04d}", 'name': f"Card {index}", 'cmc': index % 7, **fields})
+
+
+@pytest.fixture
+def archive(tmp_path):
+    records = [(_record(index), []) for index in range(500)]
+    records.append((CardRecord.from_dict({'id': "fire-ice", 'name': "Fire // Ice",
+                                          'card_faces': [{'name': "Fire"}, {'name': "Ice"}]}), ["fireice"]))
+    records.append((CardRecord.from_dict({'id': "ice", 'name': "Ice"}), []))
+    path = tmp_path / "cards.pack"
+    assert write_card_archive(path, records) == len(records)
+    store = PackedCardStore(path)
+    yield store
+    store.close()
+
+
+def test_every_record_is_found_by_name_and_id(archive):
+    for index in range(500):
+        record = archive.get(f"card {index}")
+        assert record.id == f"id-{index:04d}"
+        assert record.cmc == index % 7
+        assert archive.get_by_id(f"id-{index:04d}").name == f"Card {index}"
+
+
+def test_missing_keys(archive):
+    assert archive.get("Card 500") is None
+    assert archive.get_by_id("id-9999") is None
+
+
+def test_extra_name_keys_and_faces(archive):
+    assert archive.get("fireice").id == "fire-ice"
+    assert archive.get("Fire").id == "fire-ice"
+    # A face name never shadows the card that really has that name
+    assert archive.get("Ice").id == "ice"
+
+
+def test_iter_records_yields_each_card_once(archive):
+    names = [record.name for record, _ in archive.iter_records()]
+    assert len(names) == archive.count() == 502
+    assert names[0] == "Card 0"
+
+
+def test_archive_is_read_only(archive):
+    with pytest.raises(IOError):
+        archive.put_many([("Card 1", _record(1))])
+
+
+def test_export_from_store(tmp_path):
+    store = SQLiteCardStore(tmp_path / "cards.sqlite3")
+    store.put_many([("Bolt", _record(1).to_dict())])
+    write_card_archive(tmp_path / "cards.pack", store.iter_records())
+    store.close()
+
+    archive = PackedCardStore(tmp_path / "cards.pack")
+    try:
+        assert archive.get("Bolt").id == "id-0001"
+        assert archive.get("Card 1").id == "id-0001"
+    finally:
+        archive.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "cards.pack"
+    path.write_bytes(b"not an archive" * 4)
+    with pytest.raises(ValueError):
+        PackedCardStore(path)
@@ -0,0 +1,174 @@
+import json
+
+import pytest
+
+from mtg_agent.card_store import JsonFileCardStore, SQLiteCardStore, create_card_store
+
+
+def _card(card_id, name, **fields):
+    return {'id': card_id, 'name': name, 'type_line': "Instant", **fields}
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def store(request, tmp_path):
+    store = create_card_store(tmp_path, backend=request.param)
+    yield store
+    store.close()
+
+
+def test_put_and_get(store):
+    assert store.put_many([("Lightning Bolt", _card("bolt", "Lightning Bolt", mana_cost="{R}"))]) == 1
+    record = store.get("lightning bolt")
+    assert record.id == "bolt"
+    assert record['mana_cost'] == "{R}"
+    assert store.get("Shock") is None
+
+
+def test_delete(store):
+    store.put_many([("Lightning Bolt", _card("bolt", "Lightning Bolt"))])
+    assert store.delete("Lightning Bolt")
+    assert store.get("Lightning Bolt") is None
+    assert not store.delete("Lightning Bolt")
+
+
+def test_misses(store):
+    store.record_miss("Lightnig Bolt")
+    store.record_miss("Lightnig Bolt")
+    assert store.get_miss("lightnig bolt")['count'] == 2
+    assert store.count_misses() == 1
+    assert store.clear_misses() == 1
+    assert store.get_miss("Lightnig Bolt") is None
+
+
+def test_sqlite_imports_json_cache_once(tmp_path):
+    legacy = JsonFileCardStore(tmp_path)
+    legacy.put_many([("Lightning Bolt", _card("bolt", "Lightning Bolt")),
+                     ("Counterspell", _card("counter", "Counterspell"))])
+
+    store = create_card_store(tmp_path, backend="sqlite")
+    try:
+        assert store.count() == 2
+        assert store.get("Counterspell").id == "counter"
+        assert store.migrate_from_json_dir(tmp_path) == 0
+        assert store.migrate_from_json_dir(tmp_path, force=True) == 2
+    finally:
+        store.close()
+
+
+def test_unknown_backend(tmp_path):
+    with pytest.raises(ValueError):
+        create_card_store(tmp_path, backend="redis")
+
+
+def _legacy_database(path, cards):
+    """A cards.sqlite3 as written before slim records: full payloads, no raw column, no meta"""
+    import sqlite3
+
+    conn = sqlite3.connect(str(path))
+    conn.executescript("""
+    CREATE TABLE cards (id TEXT PRIMARY KEY, name TEXT NOT NULL, data TEXT NOT NULL, fetched_at REAL NOT NULL);
+    CREATE TABLE card_names (name_key TEXT PRIMARY KEY, card_id TEXT NOT NULL REFERENCES cards(id) ON DELETE CASCADE);
+    CREATE TABLE misses (name_key TEXT PRIMARY KEY, name TEXT NOT NULL, first_seen REAL NOT NULL,
+                         last_checked REAL NOT NULL, count INTEGER NOT NULL);
+    """)
+    for card in cards:
+        conn.execute("INSERT INTO cards VALUES (?, ?, ?, ?)", (card['id'], card['name'], json.dumps(card), 1.0))
+        conn.execute("INSERT INTO card_names VALUES (?, ?)", (card['name'].lower(), card['id']))
+    conn.commit()
+    conn.close()
+
+
+def test_sqlite_upgrades_full_payloads_to_slim_records(tmp_path):
+    payload = _card("bolt", "Lightning Bolt", legalities={'modern': 'legal'}, prices={'usd': "1.00"})
+    _legacy_database(tmp_path / "cards.sqlite3", [payload])
+
+    store = SQLiteCardStore(tmp_path / "cards.sqlite3", keep_raw=True)
+    try:
+        columns = {row[1] for row in store._conn.execute("PRAGMA table_info(cards)")}
+        assert 'raw' in columns
+        (data,) = store._conn.execute("SELECT data FROM cards WHERE id = 'bolt'").fetchone()
+        assert 'legalities' not in json.loads(data)
+        assert store.get("Lightning Bolt").type_line == "Instant"
+        # The full payload survives in the raw column
+        assert store.get_raw("bolt")['prices'] == {'usd': "1.00"}
+        assert store.get_meta("records_compacted_at")
+    finally:
+        store.close()
+
+    # Reopening does not compact again
+    store = SQLiteCardStore(tmp_path / "cards.sqlite3")
+    try:
+        assert store.get_raw("bolt")['prices'] == {'usd': "1.00"}
+    finally:
+        store.close()
+
+
+def test_sqlite_drops_raw_payloads_unless_asked(tmp_path):
+    store = SQLiteCardStore(tmp_path / "cards.sqlite3")
+    try:
+        store.put_many([("Lightning Bolt", _card("bolt", "Lightning Bolt", prices={'usd': "1.00"}))])
+        assert store.get_raw("bolt") is None
+        assert 'prices' not in store.get("Lightning Bolt").to_dict()
+    finally:
+        store.close()
+
+
+def test_sqlite_rekeys_names_from_older_versions(tmp_path):
+    split = _card("fire-ice", "Fire // Ice", card_faces=[{'name': "Fire"}, {'name': "Ice"}])
+    _legacy_database(tmp_path / "cards.sqlite3", [_card("lim-dul", "Lim-Dûl the Necromancer"), split])
+
+    store = SQLiteCardStore(tmp_path / "cards.sqlite3")
+    try:
+        assert store.get("Lim-Dul the Necromancer").id == "lim-dul"
+        assert store.get("fire//ice").id == "fire-ice"
+        assert store.get("Ice").id == "fire-ice"
+        assert store.get_meta("name_keys_version") == "2"
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize("spelling", ["LIGHTNING BOLT", "Lightning  Bolt", "lightning bolt"])
+def test_spellings_share_one_record(store, spelling):
+    store.put_many([("Lightning Bolt", _card("bolt", "Lightning Bolt"))])
+    assert store.get(spelling).id == "bolt"
+
+
+def test_face_names_resolve_to_their_card(store):
+    store.put_many([("Fire // Ice", _card("fire-ice", "Fire // Ice", card_faces=[{'name': "Fire"}, {'name': "Ice"}]))])
+    assert store.get("Fire").id == "fire-ice"
+    assert store.get("Fire/Ice").id == "fire-ice"
+
+
+def test_face_names_never_take_over_another_card(store):
+    store.put_many([("Ice", _card("ice-card", "Ice"))])
+    store.put_many([("Fire // Ice", _card("fire-ice", "Fire // Ice", card_faces=[{'name': "Fire"}, {'name': "Ice"}]))])
+    assert store.get("Ice").id == "ice-card"
+    assert store.get("Fire").id == "fire-ice"
+
+
+def test_requested_names_alias_their_card(store):
+    store.put_many([("Bolt", _card("bolt", "Lightning Bolt"))])
+    assert store.get("Bolt").id == "bolt"
+    assert store.get("Lightning Bolt").id == "bolt"
+
+
+def test_shared_face_names_stay_with_the_first_card(store):
+    store.put_many([("Fire // Ice", _card("fire-ice", "Fire // Ice", card_faces=[{'name': "Fire"}, {'name': "Ice"}]))])
+    store.put_many([("Ice // Water", _card("ice-water", "Ice // Water", card_faces=[{'name': "Ice"}, {'name': "Water"}]))])
+    assert store.get("Ice").id == "fire-ice"
+    assert store.get("Water").id == "ice-water"
+
+
+def test_importing_the_package_creates_no_cache():
+    import os
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    import mtg_agent
+
+    code = ("import mtg_agent.deck_tools, mtg_agent.scryfall_integration as s; "
+            "print(s.scryfall_cache._instance is None and s.mana_curve_calculator._instance is None)")
+    env = dict(os.environ, PYTHONPATH=str(Path(mtg_agent.__file__).parents[1]))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    assert result.stdout.strip() == "True"
@@ -0,0 +1,48 @@
+import pytest
+
+from mtg_agent import deck_tools
+
+
+@pytest.fixture
+def deck(tmp_path, monkeypatch):
+    """A small deck file, with the module pointed at it"""
+    deck_file = tmp_path / "deck.txt"
+    deck_file.write_text("4 Lightning Bolt\n1 Counterspell\n\n1 Atraxa, Praetors' Voice\n", encoding="utf-8")
+    monkeypatch.setattr(deck_tools, "_get_deck_file_path", lambda: deck_file)
+    return deck_file
+
+
+@pytest.fixture
+def deck_cache(make_cache, monkeypatch):
+    def make(**options):
+        cache, stub = make_cache(**options)
+        monkeypatch.setattr(deck_tools, "scryfall_cache", cache)
+        return cache, stub
+    return make
+
+
+def test_added_cards_are_fetched_in_the_background(deck, deck_cache):
+    cache, stub = deck_cache()
+    result = deck_tools.modify_deck_card.invoke({"card_name": "Sol Ring", "quantity_change": 1})
+    assert "Sol Ring" in result
+    assert "1 Sol Ring\n" in deck.read_text(encoding="utf-8")
+
+    assert cache.prefetcher.join(timeout=5)
+    assert cache.prefetcher.stats()['completed'] == 1
+    assert stub.stats()['requests'] == {'/cards/named': 1}
+    assert cache._lookup_local("Sol Ring") is not None
+
+
+def test_offline_image_summary_names_the_missing_images(deck, deck_cache, tmp_path):
+    cache, stub = deck_cache()
+    cache.get_cards_info(["Lightning Bolt", "Counterspell", "Atraxa, Praetors' Voice"])
+    cache.download_card_image("Lightning Bolt", str(tmp_path / "views"))
+    with open(deck, "a", encoding="utf-8") as f:
+        f.write("1 Sol Ring\n")
+    cache.offline = True
+
+    summary = deck_tools.download_deck_images.invoke({"dest_dir": str(tmp_path / "views")})
+    assert "Imágenes procesadas: 1 (0 descargadas, 1 en caché). Fallos: 0" in summary
+    assert "Imágenes no cacheadas (modo offline): 2 cartas: Atraxa, Praetors' Voice, Counterspell" in summary
+    assert "Sin datos (modo offline): 1 cartas: Sol Ring" in summary
+    assert stub.stats()['requests']['/images'] == 1
@@ -0,0 +1,137 @@
+import pytest
+
+from mtg_agent import deck_tools
+from mtg_agent.fuzzy import AUTO_RESOLVE_SCORE, SUGGESTION_MIN_SCORE, FuzzyNameIndex
+
+NAMES = ["Lightning Bolt", "Lightning Helix", "Sol Ring", "Llanowar Elves", "Counterspell",
+         "Atraxa, Praetors' Voice", "Fire // Ice"]
+
+
+@pytest.fixture
+def index():
+    return FuzzyNameIndex(NAMES)
+
+
+def test_exact_spellings_score_one(index):
+    assert index.suggest("lightning  BOLT") == [("Lightning Bolt", 1.0)]
+    assert index.best_match("atraxa praetors voice") == ("Atraxa, Praetors' Voice", ["Atraxa, Praetors' Voice"])
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Lightnig Bolt", "Lightning Bolt"),
+    ("Llanowar Elfs", "Llanowar Elves"),
+    ("Counterspel", "Counterspell"),
+])
+def test_typos_resolve_confidently(index, query, expected):
+    match, suggestions = index.best_match(query)
+    assert match == expected
+    assert suggestions[0] == expected
+
+
+def test_close_calls_are_only_suggestions(index):
+    # Both Lightnings are equally close: neither is taken as the card
+    match, suggestions = index.best_match("Lightning")
+    assert match == ""
+    assert set(suggestions[:2]) == {"Lightning Bolt", "Lightning Helix"}
+
+
+def test_short_names_stay_below_auto_resolve(index):
+    # Too weak to be taken as the card on its own; Scryfall decides (see match_card)
+    (name, score), = index.suggest("Atraxa")
+    assert name == "Atraxa, Praetors' Voice"
+    assert SUGGESTION_MIN_SCORE <= score < AUTO_RESOLVE_SCORE
+    assert index.best_match("Atraxa") == ("", ["Atraxa, Praetors' Voice"])
+
+
+def test_unrelated_queries_have_no_candidates(index):
+    assert index.suggest("Xyzzy Qux") == []
+    assert index.best_match("") == ("", [])
+
+
+def test_scores_respect_min_score(index):
+    assert all(score >= 0.9 for _, score in index.suggest("Lightnig Bolt", min_score=0.9))
+
+
+def test_add_ignores_other_spellings(index):
+    assert not index.add("LIGHTNING BOLT")
+    assert index.add("Shock")
+    assert len(index) == len(NAMES) + 1
+
+
+@pytest.fixture
+def cache(make_cache):
+    cache, stub = make_cache()
+    for card_name in ("Lightning Bolt", "Llanowar Elves", "Counterspell"):
+        cache.get_card_info(card_name)
+    return cache
+
+
+@pytest.mark.parametrize("card_name", ["Lightning Helix", "Llanowar Wastes", "Counterflux"])
+def test_real_cards_are_not_mistaken_for_cached_neighbours(cache, card_name):
+    match = cache.match_card(card_name)
+    assert match.name == card_name
+    assert match.card.name == card_name
+
+
+def test_scryfall_fuzzy_resolves_short_names(cache):
+    match = cache.match_card("Atraxa")
+    assert match.name == "Atraxa, Praetors' Voice"
+    # Cached under its real name only
+    assert cache.match_card("Atraxa, Praetors' Voice", fetch=False).card is not None
+
+
+def test_confident_local_matches_skip_the_network(make_cache):
+    cache, stub = make_cache()
+    cache.get_card_info("Counterspell")
+    match = cache.match_card("Counterspel")
+    assert match.name == "Counterspell"
+    assert stub.stats()['requests'] == {'/cards/named': 1}
+    assert cache.list_missing_cards() == []
+
+
+def test_local_fallback_without_scryfall(cache):
+    match = cache.match_card("Lightning Helx", fetch=False)
+    assert match.card is None
+    assert match.suggestions == ["Lightning Bolt"]
+
+    cache.offline = True
+    match = cache.match_card("Lightnig Bolt")
+    assert match.name == "Lightning Bolt"
+
+
+def test_unknown_names_are_asked_once(make_cache):
+    cache, stub = make_cache()
+    assert cache.match_card("Xyzzy Qux") == (None, None, [])
+    assert cache.match_card("Xyzzy Qux") == (None, None, [])
+    assert stub.stats()['requests'] == {'/cards/named': 1}
+
+
+def test_adding_an_uncached_card_to_a_deck(cache, monkeypatch):
+    monkeypatch.setattr(deck_tools, "scryfall_cache", cache)
+    deck_lines = ["4 Lightning Bolt\n", "1 Counterspell\n"]
+    assert deck_tools._resolve_card_name(deck_lines, "Lightning Helix", 1) == ("Lightning Helix", None)
+    assert deck_tools._resolve_card_name(deck_lines, "Lightnig Bolt", 1) == ("Lightning Bolt", None)
+    # Removals only look at the deck
+    assert deck_tools._resolve_card_name(deck_lines, "Counterspel", -1) == ("Counterspell", None)
+
+
+def test_index_includes_archive_names(make_cache, tmp_path):
+    source, _ = make_cache()
+    source.get_cards_info(["Lightning Helix", "Sol Ring"])
+    source.export_archive(str(tmp_path / "cards.pack"))
+
+    cache, _ = make_cache(offline=True)
+    cache.load_archive(str(tmp_path / "cards.pack"))
+    assert cache.match_card("Lightnig Helix").name == "Lightning Helix"
+    assert "Sol Ring" in cache.suggest_card_names("Sol Rnig")
+
+
+def test_cache_built_with_an_archive(make_cache, tmp_path):
+    source, _ = make_cache()
+    source.get_cards_info(["Lightning Helix", "Sol Ring"])
+    source.export_archive(str(tmp_path / "cards.pack"))
+
+    cache, stub = make_cache(archive_path=str(tmp_path / "cards.pack"))
+    assert cache.cache_stats()['archived_cards'] == 2
+    assert cache.match_card("Lightnig Helix").name == "Lightning Helix"
+    assert stub.stats()['requests'] == {}
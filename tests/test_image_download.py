@@ -0,0 +1,161 @@
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mtg_agent import image_store
+from mtg_agent.image_store import ImageStore
+from mtg_agent.scryfall_integration import ScryfallCache
+
+check = ScryfallCache._check_image_response
+request_headers = ScryfallCache._image_request_headers
+
+IMAGE = bytes(range(256)) * 64
+URI = "https://cards.scryfall.io/large/front/a/b/ab.jpg?1700000000"
+
+
+@pytest.fixture
+def partial(tmp_path):
+    path = tmp_path / "ab-0-large.jpg.part"
+    path.write_bytes(IMAGE[:1000])
+    return path
+
+
+def test_full_response_replaces_the_partial(partial):
+    assert check(200, {'Content-Type': "image/jpeg", 'Content-Length': "16384"}, 1000, partial) == ('wb', 16384)
+    assert check(200, {'Content-Type': "image/jpeg"}, 0, partial) == ('wb', None)
+
+
+def test_range_response_appends(partial):
+    headers = {'Content-Type': "image/jpeg", 'Content-Range': "bytes 1000-16383/16384"}
+    assert check(206, headers, 1000, partial) == ('ab', 16384)
+    headers['Content-Range'] = "bytes 1000-16383/*"
+    assert check(206, headers, 1000, partial) == ('ab', None)
+
+
+@pytest.mark.parametrize("content_range", ["bytes 0-16383/16384", "bytes 999-16383/16384", "", "garbage"])
+def test_mismatched_content_range_discards_the_partial(partial, content_range):
+    with pytest.raises(ValueError):
+        check(206, {'Content-Type': "image/jpeg", 'Content-Range': content_range}, 1000, partial)
+    assert not partial.exists()
+
+
+def test_unrequested_range_response(partial):
+    with pytest.raises(ValueError):
+        check(206, {'Content-Range': "bytes 0-99/16384"}, 0, partial)
+    assert not partial.exists()
+
+
+def test_range_not_satisfiable_restarts(partial):
+    with pytest.raises(ValueError):
+        check(416, {}, 1000, partial)
+    assert not partial.exists()
+
+
+def test_errors_and_non_images_keep_the_partial(partial):
+    with pytest.raises(ValueError):
+        check(503, {}, 1000, partial)
+    with pytest.raises(ValueError):
+        check(200, {'Content-Type': "text/html"}, 1000, partial)
+    assert partial.exists()
+
+
+def test_resume_sends_if_range(partial):
+    offset, headers = request_headers(partial, URI, {'uri': URI, 'etag': '"abc"', 'last_modified': None})
+    assert offset == 1000
+    assert headers['Range'] == "bytes=1000-"
+    assert headers['If-Range'] == '"abc"'
+
+
+def test_weak_etags_fall_back_to_last_modified(partial):
+    validator = {'uri': URI, 'etag': 'W/"abc"', 'last_modified': "Wed, 01 Jan 2025 00:00:00 GMT"}
+    _, headers = request_headers(partial, URI, validator)
+    assert headers['If-Range'] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+@pytest.mark.parametrize("validator", [
+    None,
+    {'uri': URI, 'etag': None, 'last_modified': None},
+    {'uri': URI.replace("1700000000", "1800000000"), 'etag': '"abc"'},
+])
+def test_unverifiable_partials_restart(partial, validator):
+    assert request_headers(partial, URI, validator) == (0, {'Accept-Encoding': 'identity'})
+    assert not partial.exists()
+
+
+@pytest.mark.skipif(image_store.fcntl is None, reason="needs fcntl")
+def test_partial_lock_excludes_other_holders(tmp_path):
+    store = ImageStore(tmp_path)
+    key = "ab-0-large.jpg"
+    with store.partial_lock(key):
+        fd = store._open_partial_lock(key)
+        try:
+            with pytest.raises(BlockingIOError):
+                image_store.fcntl.flock(fd, image_store.fcntl.LOCK_EX | image_store.fcntl.LOCK_NB)
+        finally:
+            os.close(fd)
+    with store.partial_lock(key):
+        pass
+
+
+class _RangeServer(BaseHTTPRequestHandler):
+    """Serves IMAGE with ETag "v1", honouring Range only with a matching If-Range"""
+    seen = []
+
+    def do_GET(self):
+        range_header, if_range = self.headers.get('Range'), self.headers.get('If-Range')
+        self.seen.append((range_header, if_range))
+        if range_header and if_range == '"v1"':
+            start = int(re.match(r"bytes=(\d+)-", range_header).group(1))
+            body = IMAGE[start:]
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{len(IMAGE) - 1}/{len(IMAGE)}")
+        else:
+            body = IMAGE
+            self.send_response(200)
+        self.send_header('Content-Type', "image/jpeg")
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def image_server():
+    _RangeServer.seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeServer)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/ab.jpg"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ScryfallCache(cache_dir=str(tmp_path / "cache"))
+    yield cache
+    cache.close()
+
+
+@pytest.mark.parametrize("etag, expected_request", [
+    ('"v1"', ("bytes=1000-", '"v1"')),
+    # The image changed since the partial was written: the server sends all of it
+    ('"v0"', ("bytes=1000-", '"v0"')),
+])
+def test_download_resumes_only_the_same_image(cache, image_server, etag, expected_request):
+    key = "ab-0-large.jpg"
+    store = cache.image_store
+    store.partial_path(key).write_bytes(IMAGE[:1000] if etag == '"v1"' else b"x" * 1000)
+    store.save_partial_validator(key, {'uri': image_server, 'etag': etag, 'last_modified': None})
+
+    assert cache._download_image("Ab", image_server, key) == ("downloaded", None)
+    assert _RangeServer.seen == [expected_request]
+    assert store.path_for(key).read_bytes() == IMAGE
+    assert not store.partial_path(key).exists()
+    assert store.partial_validator(key) is None
@@ -0,0 +1,66 @@
+import time
+
+from mtg_agent.image_manifest import ImageManifest, file_checksum
+
+
+def test_record_and_lookup(tmp_path):
+    image = tmp_path / "ab-0-large.jpg"
+    image.write_bytes(b"image bytes")
+    manifest = ImageManifest(tmp_path / "images.db")
+    manifest.record("ab-0-large.jpg", "ab", "https://example/ab.jpg", image)
+
+    entry = manifest.get("ab-0-large.jpg")
+    assert (entry['card_id'], entry['size'], entry['checksum']) == ("ab", 11, file_checksum(image))
+    assert manifest.card_ids_with_images(["ab", "cd"]) == {"ab"}
+    assert manifest.stats() == {'images': 1, 'bytes': 11}
+    assert manifest.remove(["ab-0-large.jpg"]) == 1
+    assert not manifest.has("ab-0-large.jpg")
+    manifest.close()
+
+
+def test_has_touches_last_used_at_most_once_per_interval(tmp_path):
+    image = tmp_path / "ab-0-large.jpg"
+    image.write_bytes(b"image bytes")
+    manifest = ImageManifest(tmp_path / "images.db", touch_interval=3600)
+    manifest.record("ab-0-large.jpg", "ab", "", image)
+    recorded = manifest.get("ab-0-large.jpg")['last_used']
+    assert manifest.has("ab-0-large.jpg")
+    assert manifest.get("ab-0-large.jpg")['last_used'] == recorded
+
+    manifest.touch_interval = 0
+    assert manifest.has("ab-0-large.jpg")
+    assert manifest.get("ab-0-large.jpg")['last_used'] > recorded
+    assert manifest.unused_since(time.time() + 1) == ["ab-0-large.jpg"]
+    assert manifest.unused_since(time.time() + 1, keep_card_ids=["ab"]) == []
+    manifest.close()
+
+
+def test_gc_keeps_requested_cards(make_cache, tmp_path):
+    cache, _ = make_cache()
+    for card_name in ("Sol Ring", "Counterspell"):
+        cache.download_card_image(card_name, str(tmp_path / "views"))
+    assert cache.missing_images(["Sol Ring", "Counterspell", "Lightning Bolt"]) == ["Lightning Bolt"]
+
+    assert cache.gc_images(max_age_days=1) == {'removed': 0, 'bytes': 0}
+    # Everything is older than a cutoff in the future
+    result = cache.gc_images(max_age_days=-1, keep_card_names=["Sol Ring"])
+    assert result['removed'] == 1 and result['bytes'] > 0
+    assert cache.missing_images(["Sol Ring", "Counterspell"]) == ["Counterspell"]
+    assert cache.image_manifest.stats()['images'] == 1
+
+
+def test_backfill_indexes_images_stored_before_the_manifest(make_cache, tmp_path):
+    cache, stub = make_cache()
+    cache.download_card_image("Sol Ring", str(tmp_path / "views"))
+    key = cache._stored_image_key("Sol Ring")
+    uri = cache.image_manifest.get(key)['image_uri']
+    cache.image_manifest.remove([key])
+
+    assert cache.backfill_image_manifest() == 1
+    assert cache.image_manifest.get(key)['image_uri'] == ""
+    assert cache.backfill_image_manifest() == 0
+    # The next request adopts the blob instead of downloading it again
+    assert cache.download_card_image("Sol Ring", str(tmp_path / "views")) is not None
+    assert cache.image_manifest.get(key)['image_uri'] == uri
+    assert stub.stats()['requests']['/images'] == 1
+    assert cache.backfill_image_manifest(force=True) == 1
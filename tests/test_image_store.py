@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from mtg_agent.image_store import ImageStore, image_key, image_key_card_id
+
+KEY = image_key("0000579f-7b35-4ed3-b44c-db2a538066fe", 0, "large", ".jpg")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ImageStore(tmp_path / "images")
+    partial = store.partial_path(KEY)
+    partial.write_bytes(b"image bytes")
+    store.commit(KEY, 11)
+    return store
+
+
+def test_image_key_card_id():
+    assert image_key_card_id(KEY) == "0000579f-7b35-4ed3-b44c-db2a538066fe"
+
+
+def test_views_share_the_stored_blob(store, tmp_path):
+    first = store.link(KEY, tmp_path / "a" / "Sol Ring.jpg")
+    second = store.link(KEY, tmp_path / "b" / "Sol Ring.jpg")
+    assert os.path.samefile(first, store.path_for(KEY))
+    assert os.path.samefile(second, store.path_for(KEY))
+    # Linking again is a no-op
+    store.link(KEY, first)
+    assert store.stats() == {'link_mode': "hardlink", 'views': {'hardlink': 2, 'symlink': 0, 'copy': 0}}
+
+
+def test_link_falls_back_when_links_fail(store, tmp_path, monkeypatch):
+    def refuse(*args):
+        raise OSError("not supported")
+
+    monkeypatch.setattr(os, "link", refuse)
+    view = store.link(KEY, tmp_path / "Sol Ring.jpg")
+    assert view.is_symlink()
+    monkeypatch.setattr(os, "symlink", refuse)
+    copy = store.link(KEY, tmp_path / "copy" / "Sol Ring.jpg")
+    assert not copy.is_symlink() and copy.read_bytes() == b"image bytes"
+    assert store.stats()['views'] == {'hardlink': 0, 'symlink': 1, 'copy': 1}
+
+
+def test_link_requires_a_stored_blob(store, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        store.link(image_key("missing", 0, "large", ".jpg"), tmp_path / "Missing.jpg")
+    assert not (tmp_path / "Missing.jpg").exists()
+
+
+def test_commit_drops_stale_variants(store):
+    variant = store.path_for(KEY).with_name(f"{store.path_for(KEY).stem}@thumb-146x204-q85.webp")
+    variant.write_bytes(b"old thumbnail")
+    store.partial_path(KEY).write_bytes(b"new image bytes")
+    store.commit(KEY)
+    assert not variant.exists()
+    assert list(store.iter_keys()) == [KEY]
+
+
+def test_invalid_link_mode(tmp_path):
+    with pytest.raises(ValueError):
+        ImageStore(tmp_path, link_mode="reflink")
+
+
+def test_cache_downloads_each_image_once(make_cache, tmp_path):
+    cache, stub = make_cache()
+    first = cache.download_card_image("Sol Ring", str(tmp_path / "a"))
+    second = cache.download_card_image("Sol Ring", str(tmp_path / "b"))
+    assert os.path.samefile(first, second)
+    assert stub.stats()['requests']['/images'] == 1
+
+
+def test_cache_refetches_images_with_a_new_uri(make_cache, tmp_path):
+    cache, stub = make_cache()
+    view = cache.download_card_image("Sol Ring", str(tmp_path / "views"))
+    key = cache._stored_image_key("Sol Ring")
+    entry = cache.image_manifest.get(key)
+    # As if Scryfall had published a new version of the image since it was stored
+    cache.image_manifest.record(key, entry['card_id'], entry['image_uri'] + "?1", entry['path'])
+
+    assert cache.download_card_image("Sol Ring", str(tmp_path / "views")) == view
+    assert stub.stats()['requests']['/images'] == 2
+    assert cache.image_manifest.get(key)['image_uri'] == entry['image_uri']
+
+
+def test_cache_ignores_an_invalid_link_mode(make_cache, monkeypatch):
+    monkeypatch.setenv("MTG_AGENT_IMAGE_LINK_MODE", "reflink")
+    cache, _ = make_cache()
+    assert cache.image_store.link_mode == "hardlink"
@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import pytest
+
+from mtg_agent.image_store import ImageStore, image_key
+from mtg_agent.image_variants import ImageVariantPipeline, parse_sizes
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _write_card_image(path: Path, size=(488, 680)):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, (200, 40, 40)).save(path, "JPEG")
+
+
+def test_parse_sizes():
+    assert parse_sizes("thumb:146x204, small:244x340,") == {'thumb': (146, 204), 'small': (244, 340)}
+
+
+def test_variant_names_carry_box_format_and_quality(tmp_path):
+    pipeline = ImageVariantPipeline(ImageStore(tmp_path), sizes={'thumb': (146, 204)}, fmt="jpeg", quality=70)
+    key = image_key("abc", 0, "large", ".jpg")
+    assert pipeline.variant_path(key, "thumb").name.endswith("thumb-146x204-q70.jpeg")
+
+
+def test_pool_renders_each_variant_once(tmp_path):
+    store = ImageStore(tmp_path)
+    pipeline = ImageVariantPipeline(store, sizes={'thumb': (146, 204), 'small': (244, 340)}, fmt="jpeg",
+                                    max_workers=2)
+    keys = [image_key(card_id, 0, "large", ".jpg") for card_id in ("abc", "def")]
+    for key in keys:
+        _write_card_image(store.path_for(key))
+    try:
+        rendered = pipeline.render(keys + [image_key("missing", 0, "large", ".jpg")])
+        assert set(rendered) == {(key, size) for key in keys for size in ("thumb", "small")}
+        with Image.open(rendered[(keys[0], "thumb")]) as img:
+            assert img.width <= 146 and img.height <= 204
+        assert pipeline.render(keys) == rendered
+        assert pipeline.stats()['rendered'] == 4
+    finally:
+        pipeline.close()
+
+
+def test_unknown_sizes_are_rejected(tmp_path):
+    pipeline = ImageVariantPipeline(ImageStore(tmp_path), sizes={'thumb': (146, 204)})
+    with pytest.raises(ValueError):
+        pipeline.render([], ["huge"])
+
+
+def test_card_image_sizes_without_a_view_directory(make_cache):
+    views = Path(__file__).parent.parent / "image_cache"
+    if views.exists():
+        pytest.skip("image_cache/ already exists at the project root")
+    cache, stub = make_cache()
+    key = cache._stored_image_key("Sol Ring")
+    # The stand-in serves placeholder bytes; put a real image in their place
+    _write_card_image(cache.image_store.path_for(key))
+
+    thumb = cache.get_card_image("Sol Ring", size="thumb")
+    assert thumb is not None and thumb.is_file()
+    assert cache.get_card_image("Sol Ring", size="thumb") == thumb
+    assert cache.render_image_variants(["Sol Ring"], ["thumb"]) == {"Sol Ring": {"thumb": thumb}}
+    assert cache.image_variants.stats()['rendered'] == 1
+    assert stub.stats()['requests']['/images'] == 1
+    assert not views.exists()
@@ -0,0 +1,60 @@
+import pytest
+
+from mtg_agent.scryfall_integration import ManaCurveCalculator
+
+DECK = ["4 Lightning Bolt\n", "1 Counterspell\n", "1 Sol Ring\n", "\n", "1 Atraxa, Praetors' Voice\n"]
+
+
+@pytest.fixture
+def make_calculator(make_cache, tmp_path):
+    def make(**options):
+        cache, stub = make_cache()
+        return ManaCurveCalculator(cache, cache_dir=str(tmp_path / "curves"), **options), stub
+    return make
+
+
+def test_curves_are_cached_per_deck(make_calculator):
+    calculator, stub = make_calculator()
+    curve = calculator.calculate_mana_curve(DECK)
+    assert curve['total_cards'] == 7 and curve['commander_cmc'] == 4
+    assert '_cached' not in curve
+
+    cached = calculator.calculate_mana_curve(DECK)
+    assert cached['_cached'] is True
+    assert cached['curve'] == {str(cmc): count for cmc, count in curve['curve'].items()}
+    assert stub.stats()['requests'] == {'/cards/collection': 1}
+
+
+def test_curve_cache_evicts_least_recently_used(make_calculator):
+    calculator, _ = make_calculator(max_cached_curves=2)
+    decks = [DECK[:1], DECK[:2], DECK[:3]]
+    calculator.calculate_mana_curve(decks[0])
+    calculator.calculate_mana_curve(decks[1])
+    # A cache hit on the first deck leaves the second as the oldest when the third arrives
+    assert calculator.calculate_mana_curve(decks[0])['_cached']
+    calculator.calculate_mana_curve(decks[2])
+
+    stats = calculator.curve_cache_stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+    assert not calculator._get_cache_filepath(calculator._deck_hash(decks[1])).exists()
+    assert calculator.calculate_mana_curve(decks[0])['_cached']
+
+
+def test_curve_cache_respects_its_byte_bound(make_calculator):
+    calculator, _ = make_calculator(max_cache_bytes=1)
+    calculator.calculate_mana_curve(DECK)
+    assert calculator.curve_cache_stats()['entries'] == 0
+    assert '_cached' not in calculator.calculate_mana_curve(DECK)
+
+
+def test_curves_with_unavailable_cards_are_not_cached(make_calculator):
+    calculator, stub = make_calculator()
+    calculator.cache.offline = True
+    curve = calculator.calculate_mana_curve(DECK)
+    assert sorted(curve['unavailable_cards']) == sorted(["Lightning Bolt", "Counterspell", "Sol Ring",
+                                                         "Atraxa, Praetors' Voice"])
+    assert calculator.curve_cache_stats()['entries'] == 0
+
+    calculator.cache.offline = False
+    assert calculator.calculate_mana_curve(DECK)['unavailable_cards'] == []
+    assert calculator.curve_cache_stats()['entries'] == 1
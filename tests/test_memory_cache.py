@@ -0,0 +1,50 @@
+from mtg_agent.memory_cache import MemoryCache
+
+
+def test_evicts_least_recently_used_entries():
+    cache = MemoryCache(max_entries=2, max_bytes=1000)
+    cache.put("a", 1, 10)
+    cache.put("b", 2, 10)
+    assert cache.get("a") == 1
+    cache.put("c", 3, 10)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_byte_bound():
+    cache = MemoryCache(max_entries=100, max_bytes=25)
+    for key in "abc":
+        cache.put(key, key, 10)
+    stats = cache.stats()
+    assert stats['entries'] == 2
+    assert stats['bytes'] == 20
+    assert cache.get("a") is None
+
+
+def test_oversized_values_are_not_cached():
+    cache = MemoryCache(max_entries=10, max_bytes=10)
+    cache.put("big", "value", 11)
+    assert cache.get("big") is None
+    assert cache.stats()['bytes'] == 0
+
+
+def test_replacing_a_key_updates_its_size():
+    cache = MemoryCache(max_entries=10, max_bytes=100)
+    cache.put("a", 1, 40)
+    cache.put("a", 2, 10)
+    assert cache.get("a") == 2
+    assert cache.stats()['bytes'] == 10
+    assert cache.invalidate("a")
+    assert not cache.invalidate("a")
+
+
+def test_cache_keeps_the_memory_tier_bounded(make_cache):
+    cache, stub = make_cache(memory_max_entries=4)
+    names = ["Lightning Bolt", "Counterspell", "Sol Ring", "Llanowar Elves", "Lightning Helix", "Counterflux"]
+    for card_name in names:
+        cache.get_card_info(card_name)
+    assert cache.memory.stats()['entries'] <= 4
+    # Evicted cards come back from the store, not the network
+    assert cache.get_card_info("Lightning Bolt").name == "Lightning Bolt"
+    assert stub.stats()['requests'] == {'/cards/named': len(names)}
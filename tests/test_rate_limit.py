@@ -0,0 +1,95 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from mtg_agent import rate_limit
+from mtg_agent.rate_limit import TokenBucketRateLimiter
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "time", clock)
+    return clock
+
+
+def test_burst_then_steady_rate(clock):
+    limiter = TokenBucketRateLimiter(rate=10, burst=3)
+    assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Callers queue up behind each other
+    assert limiter.reserve() == pytest.approx(0.1)
+    assert limiter.reserve() == pytest.approx(0.2)
+
+
+def test_refill_is_capped_at_burst(clock):
+    limiter = TokenBucketRateLimiter(rate=10, burst=2)
+    limiter.reserve()
+    limiter.reserve()
+    clock.now += 60
+    assert [limiter.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(0.1)
+
+
+def test_stats(clock):
+    limiter = TokenBucketRateLimiter(rate=10, burst=1)
+    limiter.reserve()
+    limiter.reserve()
+    stats = limiter.stats()
+    assert stats['acquired'] == 2
+    assert stats['delayed'] == 1
+    assert stats['max_wait'] == pytest.approx(0.1)
+    assert not stats['shared']
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        TokenBucketRateLimiter(rate=0)
+    with pytest.raises(ValueError):
+        TokenBucketRateLimiter(burst=0)
+
+
+@pytest.mark.skipif(rate_limit.fcntl is None, reason="needs fcntl")
+def test_state_file_shares_one_bucket(tmp_path, clock):
+    state_file = tmp_path / ".rate_limit"
+    first = TokenBucketRateLimiter(rate=10, burst=2, state_file=state_file)
+    second = TokenBucketRateLimiter(rate=10, burst=2, state_file=state_file)
+    try:
+        assert first.reserve() == 0.0
+        assert second.reserve() == 0.0
+        assert first.reserve() == pytest.approx(0.1)
+        assert second.reserve() == pytest.approx(0.2)
+        assert first.stats()['shared']
+    finally:
+        first.close()
+        second.close()
+
+
+@pytest.mark.skipif(rate_limit.fcntl is None, reason="needs fcntl")
+def test_state_file_is_shared_between_processes(tmp_path):
+    state_file = tmp_path / ".rate_limit"
+    # One token per 1000 s: whoever goes second has to wait for the refill
+    child = (
+        "import sys; from mtg_agent.rate_limit import TokenBucketRateLimiter; "
+        "print(TokenBucketRateLimiter(rate=0.001, burst=1, state_file=sys.argv[1]).reserve())"
+    )
+    env = dict(os.environ, PYTHONPATH=str(Path(rate_limit.__file__).parents[1]))
+    result = subprocess.run([sys.executable, "-c", child, str(state_file)], capture_output=True, text=True,
+                            env=env, check=True)
+    assert float(result.stdout) == 0.0
+
+    limiter = TokenBucketRateLimiter(rate=0.001, burst=1, state_file=state_file)
+    try:
+        assert limiter.reserve() > 900
+    finally:
+        limiter.close()
@@ -0,0 +1,126 @@
+import asyncio
+import email.utils
+import time
+
+import pytest
+
+from mtg_agent import resilience
+from mtg_agent.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, parse_retry_after
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_successful_trial_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=5, cooldown=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.stats()['opened'] == 2
+    clock[0] += 29
+    assert not breaker.allow()
+
+
+def test_released_trial_lets_the_next_one_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30)
+    assert breaker.check() is False
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.check() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    # The trial ended without an outcome (cancelled): the slot is free again
+    breaker.release_trial()
+    assert breaker.state == "half-open"
+    assert breaker.check() is True
+
+
+def test_cancelled_trial_does_not_wedge_the_breaker(make_cache):
+    cache, stub = make_cache(latency=0.5, circuit_breaker=CircuitBreaker(failure_threshold=1, cooldown=0))
+    cache.circuit_breaker.record_failure()
+    assert cache.circuit_breaker.state == "half-open"
+
+    async def cancelled_lookup():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cache.aget_card_info("Sol Ring"), timeout=0.1)
+
+    asyncio.run(cancelled_lookup())
+    stub.latency = 0.0
+    assert cache.get_card_info("Sol Ring").name == "Sol Ring"
+    assert cache.circuit_breaker.state == "closed"
+
+
+def test_retry_policy_gives_up_after_max_attempts():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=8.0)
+    assert 0 <= policy.delay(1) <= 0.5
+    assert 0 <= policy.delay(2) <= 1.0
+    assert policy.delay(3) is None
+
+
+def test_retry_policy_honours_retry_after():
+    policy = RetryPolicy(max_attempts=3, max_retry_after=60)
+    assert policy.delay(1, retry_after=5) == 5
+    assert policy.delay(1, retry_after=120) is None
+
+
+def test_retry_statuses():
+    policy = RetryPolicy()
+    assert policy.should_retry_status(429)
+    assert policy.should_retry_status(503)
+    assert not policy.should_retry_status(404)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    http_date = email.utils.formatdate(time.time() + 10, usegmt=True)
+    assert 8 <= parse_retry_after(http_date) <= 10
@@ -0,0 +1,65 @@
+import time
+
+from mtg_agent.card_store import normalize_card_name
+from mtg_agent.resilience import RetryPolicy
+
+
+def _expire(cache, card_name):
+    """Serve the card from the store again, with its fetch time pushed past the TTL"""
+    cache.store.mark_stale(card_name)
+    cache._forget(card_name)
+
+
+def test_stale_cards_are_served_and_refreshed_in_the_background(make_cache):
+    cache, stub = make_cache(ttl=60)
+    assert cache.get_card_info("Sol Ring").name == "Sol Ring"
+    _expire(cache, "Sol Ring")
+
+    assert cache.get_card_info("Sol Ring").name == "Sol Ring"
+    assert cache.revalidator.join(timeout=5)
+    assert stub.stats()['requests'] == {'/cards/named': 2}
+    # The refreshed copy is fresh, so the next lookup stays local
+    assert not cache._is_stale(cache.get_card_info("Sol Ring"))
+    assert stub.stats()['requests'] == {'/cards/named': 2}
+
+
+def test_failed_revalidation_backs_off(make_cache):
+    cache, stub = make_cache(ttl=60, retry_policy=RetryPolicy(max_attempts=2, base_delay=0.01))
+    cache.get_card_info("Sol Ring")
+    _expire(cache, "Sol Ring")
+    stub.error_rate = 1.0
+
+    for _ in range(3):
+        assert cache.get_card_info("Sol Ring").name == "Sol Ring"
+        assert cache.revalidator.join(timeout=10)
+    # One failed revalidation (with its retries), then no more until the back-off expires
+    requests = stub.stats()['requests']['/cards/named']
+    assert requests == 1 + cache.retry_policy.max_attempts
+    assert cache.revalidator.stats()['completed'] == 1
+
+
+def test_revalidation_404_keeps_serving_without_a_miss(make_cache):
+    cache, stub = make_cache(ttl=60)
+    cache.get_card_info("Sol Ring")
+    _expire(cache, "Sol Ring")
+    del stub._names[normalize_card_name("Sol Ring")]
+
+    for _ in range(3):
+        assert cache.get_card_info("Sol Ring").name == "Sol Ring"
+        assert cache.revalidator.join(timeout=5)
+    assert stub.stats()['requests'] == {'/cards/named': 2}
+    assert cache.list_missing_cards() == []
+
+
+def test_refresh_clears_the_back_off(make_cache):
+    cache, stub = make_cache(ttl=60)
+    cache.get_card_info("Sol Ring")
+    _expire(cache, "Sol Ring")
+    del stub._names[normalize_card_name("Sol Ring")]
+    cache.get_card_info("Sol Ring")
+    assert cache.revalidator.join(timeout=5)
+
+    stub.add_card(next(card for card in stub._cards.values() if card['name'] == "Sol Ring"))
+    card = cache.refresh_card("Sol Ring", wait=True)
+    assert card is not None and card.fetched_at > time.time() - 5
+    assert stub.stats()['requests'] == {'/cards/named': 3}
@@ -0,0 +1,93 @@
+import pytest
+
+from mtg_agent.benchmark import benchmark_fetch_paths, format_benchmark_report, percentile
+from mtg_agent.scryfall_stub import COLLECTION_MAX_IDENTIFIERS, ScryfallStub, load_fixture_cards
+
+
+@pytest.fixture(scope="module")
+def cards():
+    return load_fixture_cards()
+
+
+@pytest.fixture
+def stub(cards):
+    return ScryfallStub(cards)
+
+
+def test_bundled_fixtures_load(cards):
+    assert len(cards) == len({card['id'] for card in cards}) > 0
+    assert any(card['name'] == "Sol Ring" for card in cards)
+
+
+def test_named_lookups(stub):
+    status, card, _ = stub.handle("GET", "/cards/named", {'exact': ["sol ring"]}, None)
+    assert status == 200 and card['name'] == "Sol Ring"
+    status, card, _ = stub.handle("GET", "/cards/named", {'fuzzy': ["Atraxa"]}, None)
+    assert status == 200 and card['name'] == "Atraxa, Praetors' Voice"
+    assert stub.handle("GET", "/cards/named", {'exact': ["Unknown Card"]}, None)[0] == 404
+    assert stub.handle("GET", "/cards/named", {}, None)[0] == 400
+
+
+def test_collection_validates_its_body(stub):
+    status, body, _ = stub.handle("POST", "/cards/collection", {},
+                                  {'identifiers': [{'name': "Sol Ring"}, {'name': "Unknown Card"}]})
+    assert status == 200
+    assert [card['name'] for card in body['data']] == ["Sol Ring"]
+    assert body['not_found'] == [{'name': "Unknown Card"}]
+
+    too_many = {'identifiers': [{'name': "Sol Ring"}] * (COLLECTION_MAX_IDENTIFIERS + 1)}
+    assert stub.handle("POST", "/cards/collection", {}, too_many)[0] == 422
+    assert stub.handle("POST", "/cards/collection", {}, None)[0] == 400
+    assert stub.handle("POST", "/cards/collection", {}, {'identifiers': [{'set': "lea"}]})[0] == 400
+
+
+def test_search_pages(stub):
+    status, body, _ = stub.handle("GET", "/cards/search", {'q': ["lightning"]}, None)
+    assert status == 200 and body['has_more'] is False
+    assert all("lightning" in card['name'].casefold() or "lightning" in card.get('oracle_text', '').casefold()
+               for card in body['data'])
+    assert stub.handle("GET", "/cards/search", {'q': ["lightning"], 'page': ["x"]}, None)[0] == 400
+    assert stub.handle("GET", "/cards/search", {}, None)[0] == 400
+    assert stub.handle("GET", "/cards/search", {'q': ["zzzz"]}, None)[0] == 404
+
+
+def test_images_are_deterministic(stub):
+    status, first, headers = stub.handle("GET", "/images/abc/large.jpg", {}, None)
+    assert status == 200 and headers['Content-Type'] == "image/jpeg"
+    assert stub.handle("GET", "/images/abc/large.jpg", {}, None)[1] == first
+    assert stub.handle("GET", "/images/def/large.jpg", {}, None)[1] != first
+
+
+def test_injected_failures_are_seeded(cards):
+    def statuses(stub):
+        return [stub.handle("GET", "/cards/named", {'exact': ["Sol Ring"]}, None)[0] for _ in range(50)]
+
+    first = ScryfallStub(cards, error_rate=0.2, rate_limit_rate=0.1, retry_after=2, seed=7)
+    runs = statuses(first)
+    assert runs == statuses(ScryfallStub(cards, error_rate=0.2, rate_limit_rate=0.1, retry_after=2, seed=7))
+    assert {200, 429, 503} <= set(runs)
+    stats = first.stats()
+    assert stats['injected_errors'] == runs.count(503)
+    assert stats['injected_rate_limits'] == runs.count(429)
+    assert stats['requests'] == {'/cards/named': 50}
+
+    stub = ScryfallStub(cards, rate_limit_rate=1.0, retry_after=2)
+    assert stub.handle("GET", "/cards/named", {'exact': ["Sol Ring"]}, None)[2] == {'Retry-After': "2"}
+
+
+def test_percentile():
+    samples = [float(value) for value in range(1, 101)]
+    assert percentile(samples, 0.5) == 50.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile(samples, 1.0) == 100.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_benchmark_runs_every_path(cards):
+    report = benchmark_fetch_paths(cards[:5], rounds=1, rate=1000, burst=100)
+    assert report['named']['calls'] == 5 and report['async']['calls'] == 5
+    assert report['collection']['calls'] == 1
+    assert report['stub']['requests'] == {'/cards/named': 10, '/cards/collection': 1}
+    assert "collection" in format_benchmark_report(report)
+    with pytest.raises(ValueError):
+        benchmark_fetch_paths(cards[:1], paths=["bogus"], rounds=1)
@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mtg_agent.singleflight import SingleFlight
+
+
+def _run_while_blocked(flight, key, callers):
+    """Start a leader blocked on an event, then `callers` more calls for the same key"""
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(threading.get_ident())
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=callers + 1) as pool:
+        leader = pool.submit(flight.do, key, fn)
+        while flight.stats()['in_flight'] == 0:
+            time.sleep(0.001)
+        followers = [pool.submit(flight.do, key, fn) for _ in range(callers)]
+        while flight.stats()['coalesced'] < callers:
+            time.sleep(0.001)
+        release.set()
+        results = [leader.result()] + [future.result() for future in followers]
+    return calls, results
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls, results = _run_while_blocked(flight, "bolt", callers=4)
+    assert len(calls) == 1
+    assert results == ["result"] * 5
+    assert flight.stats() == {'in_flight': 0, 'executed': 1, 'coalesced': 4}
+
+
+def test_results_are_not_cached():
+    flight = SingleFlight()
+    assert flight.do("bolt", lambda: 1) == 1
+    assert flight.do("bolt", lambda: 2) == 2
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "bolt", fail)
+        while flight.stats()['in_flight'] == 0:
+            time.sleep(0.001)
+        follower = pool.submit(flight.do, "bolt", fail)
+        while flight.stats()['coalesced'] == 0:
+            time.sleep(0.001)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result()
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_do_many_runs_only_the_keys_not_in_flight():
+    flight = SingleFlight()
+    release = threading.Event()
+    batches = []
+
+    def single():
+        release.wait(5)
+        return "single"
+
+    def batch(keys):
+        batches.append(keys)
+        return {key: f"batch {key}" for key in keys if key != "missing"}
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(flight.do, "a", single)
+        while flight.stats()['in_flight'] == 0:
+            time.sleep(0.001)
+        threading.Timer(0.05, release.set).start()
+        results = flight.do_many(["a", "b", "missing", "b"], batch)
+        assert leader.result() == "single"
+    assert batches == [["b", "missing"]]
+    assert results == {'a': "single", 'b': "batch b", 'missing': None}
+
+
+def test_single_calls_join_a_batch():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def batch(keys):
+        release.wait(5)
+        return {key: key.upper() for key in keys}
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        bulk = pool.submit(flight.do_many, ["a", "b"], batch)
+        while flight.stats()['in_flight'] < 2:
+            time.sleep(0.001)
+        threading.Timer(0.05, release.set).start()
+        assert flight.do("b", lambda: "own call") == "B"
+        assert bulk.result() == {'a': "A", 'b': "B"}
+
+
+def test_async_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("bolt", fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["result"] * 5
+    assert len(calls) == 1
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_ado_many_joins_ado():
+    flight = SingleFlight()
+    batches = []
+
+    async def single():
+        await asyncio.sleep(0.01)
+        return "single"
+
+    async def batch(keys):
+        batches.append(keys)
+        return {key: "batch" for key in keys}
+
+    async def main():
+        first = asyncio.ensure_future(flight.ado("a", single))
+        await asyncio.sleep(0)
+        results = await flight.ado_many(["a", "b"], batch)
+        return await first, results
+
+    assert asyncio.run(main()) == ("single", {'a': "single", 'b': "batch"})
+    assert batches == [["b"]]
+
+
+def test_cache_fetches_a_card_once_for_concurrent_lookups(make_cache):
+    cache, stub = make_cache(latency=0.05)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        records = list(pool.map(lambda _: cache.get_card_info("Lightning Bolt"), range(8)))
+    assert {record.name for record in records} == {"Lightning Bolt"}
+    assert stub.stats()['requests'] == {'/cards/named': 1}
+
+
+def test_single_lookups_join_a_bulk_lookup(make_cache):
+    cache, stub = make_cache(latency=0.1)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        bulk = pool.submit(cache.get_cards_info, ["Lightning Bolt", "Counterspell"])
+        while cache.flights.stats()['in_flight'] < 2:
+            time.sleep(0.001)
+        assert cache.get_card_info("Counterspell").name == "Counterspell"
+        assert sorted(bulk.result().found) == ["Counterspell", "Lightning Bolt"]
+    assert stub.stats()['requests'] == {'/cards/collection': 1}
@@ -0,0 +1,49 @@
+from mtg_agent.warmup import collect_deck_files, format_warm_report, read_deck_card_names, warm_decks
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_collect_deck_files(tmp_path):
+    first = _write(tmp_path / "decks" / "a.txt", "")
+    second = _write(tmp_path / "decks" / "more" / "b.txt", "")
+    _write(tmp_path / "decks" / "notes.md", "")
+    single = _write(tmp_path / "single.txt", "")
+    assert collect_deck_files([str(tmp_path / "decks"), str(single), str(tmp_path / "missing")]) == [
+        first, second, single,
+    ]
+
+
+def test_read_deck_card_names(tmp_path):
+    deck = _write(tmp_path / "deck.txt", "4 Lightning Bolt\nSideboard\n\n1 Atraxa, Praetors' Voice \nx Sol Ring\n")
+    assert read_deck_card_names(deck) == ["Lightning Bolt", "Atraxa, Praetors' Voice"]
+
+
+def test_warm_decks_fetches_only_what_is_not_local(make_cache, tmp_path):
+    cache, stub = make_cache()
+    cache.get_card_info("Lightning Bolt")
+    _write(tmp_path / "decks" / "a.txt", "4 Lightning Bolt\n1 Sol Ring\n1 Unknown Card\n")
+    _write(tmp_path / "decks" / "b.txt", "1 Sol Ring\n1 Counterspell\n")
+
+    report = warm_decks([str(tmp_path / "decks")], cache=cache)
+    assert (report['decks'], report['cards'], report['local_hits'], report['fetched']) == (2, 4, 1, 2)
+    assert report['not_found'] == ["Unknown Card"] and report['unavailable'] == []
+    assert stub.stats()['requests'] == {'/cards/named': 1, '/cards/collection': 1}
+    assert "Cards not found in Scryfall: 1" in format_warm_report(report)
+
+    # A second pass is answered locally
+    report = warm_decks([str(tmp_path / "decks")], cache=cache)
+    assert (report['local_hits'], report['fetched'], report['not_found']) == (3, 0, ["Unknown Card"])
+    assert stub.stats()['requests'] == {'/cards/named': 1, '/cards/collection': 1}
+
+
+def test_warm_decks_offline(make_cache, tmp_path):
+    cache, stub = make_cache(offline=True)
+    deck = _write(tmp_path / "deck.txt", "1 Sol Ring\n")
+    report = warm_decks([str(deck)], cache=cache)
+    assert report['unavailable'] == ["Sol Ring"]
+    assert "Cards unavailable (offline or Scryfall unreachable): 1" in format_warm_report(report)
+    assert stub.stats()['requests'] == {}